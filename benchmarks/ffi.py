@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+#
+# Benchmark the Python layer on top of the realm-ffi entry points. The benchmarks run against
+# benchmarks/shim/realm_shim.c, a stand-in library that implements every function bound by
+# pyrealm without doing any storage work, so the results only depend on pyrealm and ctypes.
+# The shim is built with the C compiler (CC, default cc) the first time it is needed.
+#
+#   python benchmarks/ffi.py [--count N] [--repeat N] [--output results.json] [--filter NAME]
+#
+# The results are written as JSON with sorted keys: the time per operation of each benchmark
+# is the best of --repeat runs, which is the most stable number between runs.
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import timeit
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+SHIM_SOURCE = os.path.join(BENCHMARKS_DIR, "shim", "realm_shim.c")
+
+sys.path.insert(0, os.path.join(BENCHMARKS_DIR, "..", "src"))
+
+import pyrealm
+
+from pyrealm.config import RealmConfig
+from pyrealm.property import (Nullable, RealmDouble, RealmInt, RealmString)
+from pyrealm.realm import Realm
+from pyrealm.schema import RealmObject
+
+RESULTS_FORMAT = 1
+
+
+class Person(RealmObject):
+    name = RealmString()
+    age = RealmInt()
+    score = Nullable(RealmDouble())
+
+
+def build_shim(build_dir: str) -> str:
+    # Compile the shim unless an up-to-date build exists
+    library = os.path.join(build_dir, "librealm_shim.dylib" if sys.platform == "darwin" else "librealm_shim.so")
+    if os.path.exists(library) and os.path.getmtime(library) >= os.path.getmtime(SHIM_SOURCE):
+        return library
+    os.makedirs(build_dir, exist_ok=True)
+    compiler = os.environ.get("CC", "cc")
+    subprocess.run([compiler, "-O2", "-shared", "-fPIC", "-o", library, SHIM_SOURCE], check=True)
+    return library
+
+
+def _forget_realms():
+    # Close the realms left open by a benchmark
+    pyrealm.close_realms()
+
+
+def _new_config() -> RealmConfig:
+    return RealmConfig(path="bench.realm", read_only=False)
+
+
+def bench_realm_init(library: str, count: int):
+    def run():
+        for _ in range(count):
+            pyrealm.realm_init(library)
+    return run
+
+
+def bench_config_new(_library: str, count: int):
+    def run():
+        for _ in range(count):
+            _new_config()
+    return run
+
+
+def bench_realm_open_close(_library: str, count: int):
+    config = _new_config()
+
+    def run():
+        for _ in range(count):
+            Realm(config).close()
+        _forget_realms()
+    return run
+
+
+def bench_schema_load(_library: str, count: int):
+    realm = Realm(_new_config())
+
+    def run():
+        for _ in range(count):
+            realm._load_schema((0, None))
+    return run
+
+
+def bench_schema_cached(_library: str, count: int):
+    realm = Realm(_new_config())
+
+    def run():
+        for _ in range(count):
+            realm.schema.find_class("Person")
+    return run
+
+
+def bench_class_introspection(_library: str, count: int):
+    # The per-call introspection API: class keys, then each class and its properties
+    realm = Realm(_new_config())
+
+    def run():
+        for _ in range(count):
+            for key in realm.get_class_keys():
+                info = realm.get_class(key)
+                realm.get_class_properties(key, info.num_properties)
+    return run
+
+
+def bench_write_transaction(_library: str, count: int):
+    realm = Realm(_new_config())
+
+    def run():
+        for _ in range(count):
+            with realm.write():
+                pass
+    return run
+
+
+def bench_read_transaction(_library: str, count: int):
+    realm = Realm(_new_config())
+
+    def run():
+        for _ in range(count):
+            with realm.read():
+                pass
+    return run
+
+
+def bench_object_construct(_library: str, count: int):
+    def run():
+        for i in range(count):
+            Person("person", i, 1.5)
+    return run
+
+
+def bench_bulk_insert(_library: str, count: int):
+    realm = Realm(_new_config())
+    rows = [{"name": f"person{i}", "age": i % 90, "score": i * 1.5} for i in range(count)]
+
+    def run():
+        realm.bulk_insert("Person", rows)
+    return run
+
+
+def bench_results_iterate(_library: str, count: int):
+    realm = Realm(_new_config())
+
+    def run():
+        remaining = count
+        while remaining > 0:
+            results = realm.objects("Person")
+            for _ in results:
+                remaining -= 1
+                if remaining <= 0:
+                    break
+            results.close()
+    return run
+
+
+BENCHMARKS = {
+    "realm_init": bench_realm_init,
+    "config_new": bench_config_new,
+    "realm_open_close": bench_realm_open_close,
+    "schema_load": bench_schema_load,
+    "schema_cached": bench_schema_cached,
+    "class_introspection": bench_class_introspection,
+    "write_transaction": bench_write_transaction,
+    "read_transaction": bench_read_transaction,
+    "object_construct": bench_object_construct,
+    "bulk_insert": bench_bulk_insert,
+    "results_iterate": bench_results_iterate,
+}
+
+
+def run_benchmark(func, library: str, count: int, repeat: int) -> dict:
+    timings = timeit.repeat(func(library, count), number=1, repeat=repeat)
+    best = min(timings)
+    return {
+        "count": count,
+        "repeat": repeat,
+        "best_ns_per_op": round(best / count * 1e9, 1),
+        "median_ns_per_op": round(statistics.median(timings) / count * 1e9, 1),
+        "ops_per_sec": round(count / best, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="pyrealm FFI layer benchmarks against a stand-in library")
+    parser.add_argument("--count", type=int, default=10_000, help="operations per run")
+    parser.add_argument("--repeat", type=int, default=5, help="number of timing runs (best is reported)")
+    parser.add_argument("--output", help="write the JSON results to this file instead of stdout")
+    parser.add_argument("--filter", action="append", help="only run the benchmarks with this name (repeatable)")
+    parser.add_argument("--build-dir", default=os.path.join(tempfile.gettempdir(), "pyrealm-bench"), help="where to build the shim")
+    args = parser.parse_args()
+
+    library = build_shim(args.build_dir)
+    pyrealm.realm_init(library)
+
+    names = [x for x in BENCHMARKS if not args.filter or x in args.filter]
+    unknown = set(args.filter or []) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    results = {
+        "format": RESULTS_FORMAT,
+        "environment": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+        },
+        "benchmarks": {},
+    }
+    for name in names:
+        results["benchmarks"][name] = run_benchmark(BENCHMARKS[name], library, args.count, args.repeat)
+        _forget_realms()
+
+    output = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+#
+# Compare the slot-based RealmObject classes with the previous representation, where each
+# instance held an OrderedDict of PropertyValue wrappers read through __getattr__
+#
+#   python benchmarks/objects.py [--count N] [--repeat N]
+
+import argparse
+import os
+import sys
+import timeit
+import tracemalloc
+
+from collections import OrderedDict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from pyrealm.property import (Nullable, RealmDouble, RealmInt, RealmString)
+from pyrealm.schema import RealmObject
+
+
+class Person(RealmObject):
+    name = RealmString()
+    age = RealmInt()
+    score = Nullable(RealmDouble())
+
+
+class LegacyPerson():
+    # The per-instance OrderedDict of PropertyValue objects used before the slot-based layout
+    _properties = Person._properties
+
+    def __init__(self, *args):
+        property_values = OrderedDict()
+        props = list(self._properties)
+        for i in range(len(args)):
+            x = props.pop(0)
+            property_values[x] = self._properties[x].new(args[i])
+        while props:
+            x = props.pop(0)
+            property_values[x] = self._properties[x].new(None)
+        object.__setattr__(self, '_property_values', property_values)
+
+    def __getattr__(self, name):
+        property_values = self.__dict__.get('_property_values')
+        if property_values is not None and name in property_values:
+            return property_values[name].value
+        raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        property_values = self.__dict__.get('_property_values')
+        if property_values is not None and name in property_values:
+            property_values[name].value = value
+        else:
+            super().__setattr__(name, value)
+
+
+def measure_memory(cls, count: int) -> float:
+    # Bytes allocated per instance - the values are created first so only the objects are counted
+    names = [f"person{i}" for i in range(count)]
+    scores = [i * 0.5 for i in range(count)]
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [cls(names[i], i, scores[i]) for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return (after - before) / count
+
+
+def measure_speed(cls, count: int, repeat: int) -> dict:
+    obj = cls("person", 42, 1.5)
+
+    def construct():
+        for i in range(count):
+            cls("person", i, 1.5)
+
+    def read():
+        for _ in range(count):
+            obj.name
+            obj.age
+            obj.score
+
+    def write():
+        for i in range(count):
+            obj.age = i
+
+    return {
+        name: count / min(timeit.repeat(func, number=1, repeat=repeat))
+        for name, func in (("construct", construct), ("read", read), ("write", write))
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RealmObject memory and throughput benchmark")
+    parser.add_argument("--count", type=int, default=100_000, help="number of objects/operations")
+    parser.add_argument("--repeat", type=int, default=5, help="number of timing runs (best is reported)")
+    args = parser.parse_args()
+
+    results = {}
+    for label, cls in (("legacy", LegacyPerson), ("slots", Person)):
+        results[label] = {"bytes_per_object": measure_memory(cls, args.count)}
+        results[label].update(measure_speed(cls, args.count, args.repeat))
+
+    print(f"{'':12}{'bytes/object':>14}{'construct/s':>14}{'read/s':>14}{'write/s':>14}")
+    for label, values in results.items():
+        print(
+            f"{label:12}{values['bytes_per_object']:>14.0f}{values['construct']:>14,.0f}"
+            f"{values['read']:>14,.0f}{values['write']:>14,.0f}"
+        )
+    legacy, slots = results["legacy"], results["slots"]
+    print(
+        f"{'ratio':12}{legacy['bytes_per_object'] / slots['bytes_per_object']:>13.1f}x"
+        f"{slots['construct'] / legacy['construct']:>13.1f}x"
+        f"{slots['read'] / legacy['read']:>13.1f}x"
+        f"{slots['write'] / legacy['write']:>13.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,720 @@
+/*
+ * Stand-in for librealm-ffi used by the benchmarks and the smoke checks. It exports every required
+ * entry point bound by pyrealm/bindings.py and the optional scheduler functions with the same
+ * signatures, but keeps all state in memory and does no storage work, so the benchmarks measure
+ * the Python layer and the ctypes calls only.
+ *
+ * The schema is fixed: a "Person" class (name, age, score) and a "Dog" class (name, owner), and
+ * every class reports SHIM_NUM_OBJECTS objects with generated values (the last digit of the
+ * property key selects the value: 1 string, 2 int, 3 double, anything else null).
+ *
+ *   cc -O2 -shared -fPIC -o librealm_shim.so realm_shim.c
+ */
+
+#include <stdbool.h>
+#include <stdint.h>
+#include <stdlib.h>
+#include <string.h>
+
+#define SHIM_NUM_OBJECTS 1000
+#define SHIM_PATH_MAX 1024
+
+#ifdef _WIN32
+#define SHIM_API __declspec(dllexport)
+#else
+#define SHIM_API __attribute__((visibility("default")))
+#endif
+
+/* Types mirrored from realm.h */
+
+typedef struct {
+    const char* data;
+    size_t size;
+} shim_string_t;
+
+typedef struct {
+    const uint8_t* data;
+    size_t size;
+} shim_binary_t;
+
+typedef struct {
+    union {
+        int64_t integer;
+        bool boolean;
+        shim_string_t string;
+        shim_binary_t binary;
+        float fnum;
+        double dnum;
+        char data[16];
+    };
+    int type;
+} shim_value_t;
+
+typedef struct {
+    size_t nb_args;
+    bool is_list;
+    shim_value_t* arg;
+} shim_query_arg_t;
+
+typedef struct {
+    int error;
+    const char* message;
+    void* usercode_error;
+    union {
+        int code;
+        int logic_error_kind;
+    } kind;
+} shim_error_t;
+
+typedef struct {
+    uint64_t version;
+    uint64_t index;
+} shim_version_id_t;
+
+typedef struct {
+    const char* name;
+    const char* primary_key;
+    size_t num_properties;
+    size_t num_computed_properties;
+    uint32_t key;
+    int flags;
+} shim_class_info_t;
+
+typedef struct {
+    const char* name;
+    const char* public_name;
+    int type;
+    int collection_type;
+    const char* link_target;
+    const char* link_origin_property_name;
+    int64_t key;
+    int flags;
+} shim_property_info_t;
+
+enum { VALUE_NULL = 0, VALUE_INT = 1, VALUE_STRING = 3, VALUE_DOUBLE = 7 };
+enum { PROPERTY_INT = 0, PROPERTY_STRING = 2, PROPERTY_DOUBLE = 10 };
+enum { PROPERTY_NULLABLE = 1 };
+
+/* Fixed schema */
+
+static const shim_class_info_t shim_classes[] = {
+    {"Person", "", 3, 0, 1, 0},
+    {"Dog", "", 2, 0, 2, 0},
+};
+#define SHIM_NUM_CLASSES (sizeof(shim_classes) / sizeof(shim_classes[0]))
+
+static const shim_property_info_t shim_person_properties[] = {
+    {"name", "", PROPERTY_STRING, 0, "", "", 11, 0},
+    {"age", "", PROPERTY_INT, 0, "", "", 12, 0},
+    {"score", "", PROPERTY_DOUBLE, 0, "", "", 13, PROPERTY_NULLABLE},
+};
+
+static const shim_property_info_t shim_dog_properties[] = {
+    {"name", "", PROPERTY_STRING, 0, "", "", 21, 0},
+    {"owner", "", PROPERTY_STRING, 0, "", "", 24, PROPERTY_NULLABLE},
+};
+
+static const shim_class_info_t* find_class(uint32_t key)
+{
+    for (size_t i = 0; i < SHIM_NUM_CLASSES; i++) {
+        if (shim_classes[i].key == key)
+            return &shim_classes[i];
+    }
+    return NULL;
+}
+
+static const shim_property_info_t* class_properties(uint32_t key)
+{
+    return key == 1 ? shim_person_properties : key == 2 ? shim_dog_properties : NULL;
+}
+
+/* Handles - every handle starts with its kind so realm_release can free any of them */
+
+enum handle_kind { HANDLE_CONFIG = 1, HANDLE_REALM, HANDLE_SCHEMA, HANDLE_OBJECT, HANDLE_RESULTS, HANDLE_QUERY, HANDLE_SCHEDULER };
+
+typedef struct {
+    int kind;
+    char path[SHIM_PATH_MAX];
+    char fifo_path[SHIM_PATH_MAX];
+    char encryption_key[64];
+    size_t encryption_key_size;
+    uint64_t schema_version;
+    int schema_mode;
+    bool disable_format_upgrade;
+    bool force_sync_history;
+    bool automatic_change_notifications;
+    uint64_t max_number_of_active_versions;
+    bool in_memory;
+    bool cached;
+    const void* scheduler;
+} shim_config_t;
+
+typedef struct {
+    int kind;
+    bool closed;
+    bool frozen;
+    int transaction;
+    uint64_t version;
+    uint64_t schema_version;
+} shim_realm_t;
+
+typedef struct {
+    int kind;
+    uint32_t class_key;
+    int64_t index;
+} shim_object_t;
+
+typedef struct {
+    int kind;
+    uint32_t class_key;
+    size_t count;
+} shim_results_t;
+
+typedef struct {
+    int kind;
+} shim_handle_t;
+
+typedef void (*shim_free_userdata_t)(void*);
+typedef void (*shim_scheduler_notify_t)(void*);
+typedef bool (*shim_scheduler_is_on_thread_t)(void*);
+typedef bool (*shim_scheduler_is_same_as_t)(const void*, const void*);
+typedef bool (*shim_scheduler_can_deliver_t)(void*);
+
+typedef struct {
+    int kind;
+    void* userdata;
+    shim_free_userdata_t free_userdata;
+    shim_scheduler_notify_t notify;
+    shim_scheduler_is_on_thread_t is_on_thread;
+    shim_scheduler_is_same_as_t is_same_as;
+    shim_scheduler_can_deliver_t can_deliver;
+} shim_scheduler_t;
+
+static shim_error_t last_error;
+static bool has_error = false;
+static uint64_t db_version = 1;
+
+static void set_error(int code, const char* message)
+{
+    last_error.error = code;
+    last_error.message = message;
+    last_error.usercode_error = NULL;
+    last_error.kind.code = 0;
+    has_error = true;
+}
+
+static void* new_handle(size_t size, int kind)
+{
+    shim_handle_t* handle = calloc(1, size);
+    if (handle)
+        handle->kind = kind;
+    return handle;
+}
+
+static void copy_string(char* dest, const char* src)
+{
+    if (!src)
+        src = "";
+    strncpy(dest, src, SHIM_PATH_MAX - 1);
+    dest[SHIM_PATH_MAX - 1] = '\0';
+}
+
+/* Library / error functions */
+
+SHIM_API const char* realm_get_library_version(void)
+{
+    return "12.0.0-shim";
+}
+
+SHIM_API void realm_get_library_version_numbers(int* major, int* minor, int* patch, const char** extra)
+{
+    *major = 12;
+    *minor = 0;
+    *patch = 0;
+    *extra = "shim";
+}
+
+SHIM_API bool realm_get_last_error(shim_error_t* err)
+{
+    if (!has_error)
+        return false;
+    *err = last_error;
+    return true;
+}
+
+SHIM_API bool realm_clear_last_error(void)
+{
+    bool had_error = has_error;
+    has_error = false;
+    return had_error;
+}
+
+SHIM_API void realm_release(void* handle)
+{
+    shim_handle_t* h = handle;
+    if (h && h->kind == HANDLE_SCHEDULER) {
+        shim_scheduler_t* scheduler = handle;
+        if (scheduler->free_userdata)
+            scheduler->free_userdata(scheduler->userdata);
+    }
+    free(handle);
+}
+
+/* Config functions */
+
+SHIM_API shim_config_t* realm_config_new(void)
+{
+    shim_config_t* config = new_handle(sizeof(shim_config_t), HANDLE_CONFIG);
+    config->automatic_change_notifications = true;
+    config->max_number_of_active_versions = UINT64_MAX;
+    config->cached = true;
+    return config;
+}
+
+SHIM_API const char* realm_config_get_path(const shim_config_t* config) { return config->path; }
+SHIM_API void realm_config_set_path(shim_config_t* config, const char* path) { copy_string(config->path, path); }
+
+SHIM_API size_t realm_config_get_encryption_key(const shim_config_t* config, uint8_t* out)
+{
+    if (out)
+        memcpy(out, config->encryption_key, config->encryption_key_size);
+    return config->encryption_key_size;
+}
+
+SHIM_API bool realm_config_set_encryption_key(shim_config_t* config, const uint8_t* key, size_t size)
+{
+    if (size != 0 && size != 64) {
+        set_error(17, "Encryption key must be 64 bytes");
+        return false;
+    }
+    memcpy(config->encryption_key, key, size);
+    config->encryption_key_size = size;
+    return true;
+}
+
+SHIM_API uint64_t realm_config_get_schema_version(const shim_config_t* config) { return config->schema_version; }
+SHIM_API void realm_config_set_schema_version(shim_config_t* config, uint64_t version) { config->schema_version = version; }
+SHIM_API int realm_config_get_schema_mode(const shim_config_t* config) { return config->schema_mode; }
+SHIM_API void realm_config_set_schema_mode(shim_config_t* config, int mode) { config->schema_mode = mode; }
+SHIM_API bool realm_config_get_disable_format_upgrade(const shim_config_t* config) { return config->disable_format_upgrade; }
+SHIM_API void realm_config_set_disable_format_upgrade(shim_config_t* config, bool value) { config->disable_format_upgrade = value; }
+SHIM_API bool realm_config_get_force_sync_history(const shim_config_t* config) { return config->force_sync_history; }
+SHIM_API void realm_config_set_force_sync_history(shim_config_t* config, bool value) { config->force_sync_history = value; }
+
+SHIM_API bool realm_config_get_automatic_change_notifications(const shim_config_t* config)
+{
+    return config->automatic_change_notifications;
+}
+
+SHIM_API void realm_config_set_automatic_change_notifications(shim_config_t* config, bool value)
+{
+    config->automatic_change_notifications = value;
+}
+
+SHIM_API uint64_t realm_config_get_max_number_of_active_versions(const shim_config_t* config)
+{
+    return config->max_number_of_active_versions;
+}
+
+SHIM_API void realm_config_set_max_number_of_active_versions(shim_config_t* config, uint64_t value)
+{
+    config->max_number_of_active_versions = value;
+}
+
+SHIM_API bool realm_config_get_in_memory(const shim_config_t* config) { return config->in_memory; }
+SHIM_API void realm_config_set_in_memory(shim_config_t* config, bool value) { config->in_memory = value; }
+SHIM_API const char* realm_config_get_fifo_path(const shim_config_t* config) { return config->fifo_path; }
+SHIM_API void realm_config_set_fifo_path(shim_config_t* config, const char* path) { copy_string(config->fifo_path, path); }
+SHIM_API bool realm_config_get_cached(const shim_config_t* config) { return config->cached; }
+SHIM_API void realm_config_set_cached(shim_config_t* config, bool value) { config->cached = value; }
+
+/* Realm functions */
+
+SHIM_API shim_realm_t* realm_open(const shim_config_t* config)
+{
+    if (!config->path[0] && !config->in_memory) {
+        set_error(32, "Realm path cannot be empty");
+        return NULL;
+    }
+    shim_realm_t* realm = new_handle(sizeof(shim_realm_t), HANDLE_REALM);
+    realm->version = db_version;
+    realm->schema_version = config->schema_version;
+    return realm;
+}
+
+SHIM_API bool realm_get_version_id(const shim_realm_t* realm, bool* found, shim_version_id_t* out)
+{
+    *found = true;
+    out->version = realm->version;
+    out->index = 0;
+    return true;
+}
+
+SHIM_API bool realm_get_num_versions(const shim_realm_t* realm, uint64_t* out)
+{
+    (void)realm;
+    *out = 1;
+    return true;
+}
+
+SHIM_API bool realm_convert_with_config(const shim_realm_t* realm, const shim_config_t* config, bool merge)
+{
+    (void)realm; (void)config; (void)merge;
+    return true;
+}
+
+SHIM_API bool realm_convert_with_path(const shim_realm_t* realm, const char* path, shim_binary_t key, bool merge)
+{
+    (void)realm; (void)path; (void)key; (void)merge;
+    return true;
+}
+
+SHIM_API bool realm_delete_files(const char* path, bool* did_delete)
+{
+    (void)path;
+    if (did_delete)
+        *did_delete = false;
+    return true;
+}
+
+SHIM_API bool realm_is_closed(const shim_realm_t* realm) { return realm->closed; }
+SHIM_API bool realm_is_writable(const shim_realm_t* realm) { return !realm->frozen; }
+
+SHIM_API bool realm_close(shim_realm_t* realm)
+{
+    realm->closed = true;
+    return true;
+}
+
+SHIM_API bool realm_begin_read(shim_realm_t* realm)
+{
+    realm->version = db_version;
+    return true;
+}
+
+SHIM_API bool realm_begin_write(shim_realm_t* realm)
+{
+    if (realm->frozen) {
+        set_error(40, "Cannot write to a frozen realm");
+        return false;
+    }
+    if (realm->transaction) {
+        set_error(18, "The realm is already in a write transaction");
+        return false;
+    }
+    realm->transaction = 1;
+    realm->version = db_version;
+    return true;
+}
+
+SHIM_API bool realm_commit(shim_realm_t* realm)
+{
+    if (!realm->transaction) {
+        set_error(5, "Not in a write transaction");
+        return false;
+    }
+    realm->transaction = 0;
+    realm->version = ++db_version;
+    return true;
+}
+
+SHIM_API bool realm_rollback(shim_realm_t* realm)
+{
+    realm->transaction = 0;
+    return true;
+}
+
+SHIM_API bool realm_refresh(shim_realm_t* realm, bool* did_refresh)
+{
+    bool changed = realm->version != db_version;
+    realm->version = db_version;
+    if (did_refresh)
+        *did_refresh = changed;
+    return true;
+}
+
+SHIM_API shim_realm_t* realm_freeze(const shim_realm_t* realm)
+{
+    shim_realm_t* frozen = new_handle(sizeof(shim_realm_t), HANDLE_REALM);
+    *frozen = *realm;
+    frozen->frozen = true;
+    frozen->transaction = 0;
+    return frozen;
+}
+
+SHIM_API bool realm_compact(shim_realm_t* realm, bool* did_compact)
+{
+    (void)realm;
+    if (did_compact)
+        *did_compact = false;
+    return true;
+}
+
+SHIM_API uint64_t realm_get_schema_version(const shim_realm_t* realm) { return realm->schema_version; }
+SHIM_API size_t realm_get_num_classes(const shim_realm_t* realm) { (void)realm; return SHIM_NUM_CLASSES; }
+
+SHIM_API void* realm_get_schema(const shim_realm_t* realm)
+{
+    (void)realm;
+    return new_handle(sizeof(shim_handle_t), HANDLE_SCHEMA);
+}
+
+SHIM_API bool realm_get_class_keys(const shim_realm_t* realm, uint32_t* out, size_t max, size_t* out_n)
+{
+    (void)realm;
+    size_t n = 0;
+    for (; n < SHIM_NUM_CLASSES && n < max; n++)
+        out[n] = shim_classes[n].key;
+    if (out_n)
+        *out_n = out ? n : SHIM_NUM_CLASSES;
+    return true;
+}
+
+SHIM_API bool realm_get_class(const shim_realm_t* realm, uint32_t key, shim_class_info_t* out)
+{
+    (void)realm;
+    const shim_class_info_t* info = find_class(key);
+    if (!info) {
+        set_error(19, "No such class");
+        return false;
+    }
+    *out = *info;
+    return true;
+}
+
+SHIM_API bool realm_get_class_properties(
+    const shim_realm_t* realm, uint32_t key, shim_property_info_t* out, size_t max, size_t* out_n)
+{
+    (void)realm;
+    const shim_class_info_t* info = find_class(key);
+    if (!info) {
+        set_error(19, "No such class");
+        return false;
+    }
+    const shim_property_info_t* properties = class_properties(key);
+    size_t n = 0;
+    for (; n < info->num_properties && n < max; n++)
+        out[n] = properties[n];
+    if (out_n)
+        *out_n = out ? n : info->num_properties;
+    return true;
+}
+
+/* Object and results functions */
+
+static shim_results_t* new_results(uint32_t class_key, size_t count)
+{
+    shim_results_t* results = new_handle(sizeof(shim_results_t), HANDLE_RESULTS);
+    results->class_key = class_key;
+    results->count = count;
+    return results;
+}
+
+static shim_object_t* new_object(uint32_t class_key, int64_t index)
+{
+    shim_object_t* obj = new_handle(sizeof(shim_object_t), HANDLE_OBJECT);
+    obj->class_key = class_key;
+    obj->index = index;
+    return obj;
+}
+
+SHIM_API bool realm_get_num_objects(const shim_realm_t* realm, uint32_t key, size_t* out)
+{
+    (void)realm; (void)key;
+    *out = SHIM_NUM_OBJECTS;
+    return true;
+}
+
+SHIM_API shim_results_t* realm_object_find_all(const shim_realm_t* realm, uint32_t key)
+{
+    (void)realm;
+    if (!find_class(key)) {
+        set_error(19, "No such class");
+        return NULL;
+    }
+    return new_results(key, SHIM_NUM_OBJECTS);
+}
+
+SHIM_API int64_t realm_object_get_key(const shim_object_t* obj) { return obj->index; }
+
+static shim_object_t* create_object(shim_realm_t* realm, uint32_t key)
+{
+    if (!realm->transaction) {
+        set_error(5, "Not in a write transaction");
+        return NULL;
+    }
+    return new_object(key, SHIM_NUM_OBJECTS);
+}
+
+SHIM_API shim_object_t* realm_object_create(shim_realm_t* realm, uint32_t key)
+{
+    return create_object(realm, key);
+}
+
+SHIM_API shim_object_t* realm_object_create_with_primary_key(shim_realm_t* realm, uint32_t key, shim_value_t pk)
+{
+    (void)pk;
+    return create_object(realm, key);
+}
+
+SHIM_API shim_object_t* realm_object_get_or_create_with_primary_key(
+    shim_realm_t* realm, uint32_t key, shim_value_t pk, bool* did_create)
+{
+    (void)pk;
+    if (did_create)
+        *did_create = true;
+    return create_object(realm, key);
+}
+
+SHIM_API bool realm_set_values(shim_object_t* obj, size_t n, const int64_t* keys, const shim_value_t* values, bool is_default)
+{
+    (void)obj; (void)n; (void)keys; (void)values; (void)is_default;
+    return true;
+}
+
+SHIM_API bool realm_get_values(const shim_object_t* obj, size_t n, const int64_t* keys, shim_value_t* out)
+{
+    static const char name[] = "object";
+    for (size_t i = 0; i < n; i++) {
+        memset(&out[i], 0, sizeof(shim_value_t));
+        switch (keys[i] % 10) {
+            case 1:
+                out[i].type = VALUE_STRING;
+                out[i].string.data = name;
+                out[i].string.size = sizeof(name) - 1;
+                break;
+            case 2:
+                out[i].type = VALUE_INT;
+                out[i].integer = obj->index % 90;
+                break;
+            case 3:
+                out[i].type = VALUE_DOUBLE;
+                out[i].dnum = obj->index * 1.5;
+                break;
+            default:
+                out[i].type = VALUE_NULL;
+        }
+    }
+    return true;
+}
+
+SHIM_API bool realm_results_count(const shim_results_t* results, size_t* out)
+{
+    *out = results->count;
+    return true;
+}
+
+SHIM_API shim_object_t* realm_results_get_object(const shim_results_t* results, size_t index)
+{
+    if (index >= results->count) {
+        set_error(34, "Index out of bounds");
+        return NULL;
+    }
+    return new_object(results->class_key, (int64_t)index);
+}
+
+/* The core wraps the descriptors in SORT() / DISTINCT() itself: reject wrapped or empty ones */
+
+static size_t key_path_length(const char* descriptor)
+{
+    size_t n = strcspn(descriptor, " ()");
+    return descriptor[n] == '(' || descriptor[n] == ')' ? 0 : n;
+}
+
+SHIM_API shim_results_t* realm_results_sort(const shim_results_t* results, const char* sort)
+{
+    size_t n = key_path_length(sort);
+    if (!n || (strcmp(sort + n, " ASCENDING") != 0 && strcmp(sort + n, " DESCENDING") != 0)) {
+        set_error(35, "Invalid sort descriptor");
+        return NULL;
+    }
+    return new_results(results->class_key, results->count);
+}
+
+SHIM_API shim_results_t* realm_results_distinct(const shim_results_t* results, const char* distinct)
+{
+    size_t n = key_path_length(distinct);
+    if (!n || distinct[n] != '\0') {
+        set_error(35, "Invalid distinct descriptor");
+        return NULL;
+    }
+    return new_results(results->class_key, results->count);
+}
+
+SHIM_API shim_results_t* realm_results_limit(const shim_results_t* results, size_t max)
+{
+    return new_results(results->class_key, results->count < max ? results->count : max);
+}
+
+SHIM_API shim_results_t* realm_results_freeze(const shim_results_t* results, const shim_realm_t* realm)
+{
+    (void)realm;
+    return new_results(results->class_key, results->count);
+}
+
+static bool aggregate(const shim_results_t* results, int64_t key, shim_value_t* out, bool* found)
+{
+    (void)results; (void)key;
+    memset(out, 0, sizeof(shim_value_t));
+    if (found)
+        *found = false;
+    return true;
+}
+
+SHIM_API bool realm_results_min(const shim_results_t* r, int64_t k, shim_value_t* out, bool* found) { return aggregate(r, k, out, found); }
+SHIM_API bool realm_results_max(const shim_results_t* r, int64_t k, shim_value_t* out, bool* found) { return aggregate(r, k, out, found); }
+SHIM_API bool realm_results_sum(const shim_results_t* r, int64_t k, shim_value_t* out, bool* found) { return aggregate(r, k, out, found); }
+SHIM_API bool realm_results_average(const shim_results_t* r, int64_t k, shim_value_t* out, bool* found) { return aggregate(r, k, out, found); }
+
+/* Query functions */
+
+typedef struct {
+    int kind;
+    uint32_t class_key;
+} shim_query_t;
+
+SHIM_API shim_query_t* realm_query_parse(
+    const shim_realm_t* realm, uint32_t key, const char* query, size_t num_args, const shim_query_arg_t* args)
+{
+    (void)realm; (void)query; (void)num_args; (void)args;
+    shim_query_t* q = new_handle(sizeof(shim_query_t), HANDLE_QUERY);
+    q->class_key = key;
+    return q;
+}
+
+SHIM_API shim_results_t* realm_query_find_all(const shim_query_t* query)
+{
+    return new_results(query->class_key, SHIM_NUM_OBJECTS / 2);
+}
+
+/* Scheduler functions - the shim has no background work, so perform_work only checks that it is
+   called on the scheduler thread */
+
+SHIM_API shim_scheduler_t* realm_scheduler_new(
+    void* userdata, shim_free_userdata_t free_userdata, shim_scheduler_notify_t notify,
+    shim_scheduler_is_on_thread_t is_on_thread, shim_scheduler_is_same_as_t is_same_as,
+    shim_scheduler_can_deliver_t can_deliver)
+{
+    if (!notify || !is_on_thread || !is_same_as || !can_deliver) {
+        set_error(17, "Missing scheduler callback");
+        return NULL;
+    }
+    shim_scheduler_t* scheduler = new_handle(sizeof(shim_scheduler_t), HANDLE_SCHEDULER);
+    scheduler->userdata = userdata;
+    scheduler->free_userdata = free_userdata;
+    scheduler->notify = notify;
+    scheduler->is_on_thread = is_on_thread;
+    scheduler->is_same_as = is_same_as;
+    scheduler->can_deliver = can_deliver;
+    return scheduler;
+}
+
+SHIM_API void realm_scheduler_perform_work(shim_scheduler_t* scheduler)
+{
+    (void)scheduler->is_on_thread(scheduler->userdata);
+}
+
+SHIM_API void realm_config_set_scheduler(shim_config_t* config, const shim_scheduler_t* scheduler)
+{
+    config->scheduler = scheduler;
+}
@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+#
+# Smoke checks of pyrealm against the stand-in library used by the benchmarks
+# (benchmarks/shim/realm_shim.c). They exercise the Python layer end to end - bindings, argument
+# conversion and the documented usage - without a realm-core build.
+#
+#   python benchmarks/smoke.py [--filter NAME] [--build-dir DIR]
+#
+# Every check is run and the failures are reported with their traceback; the exit status is 1 if
+# any check failed.
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import traceback
+
+from ffi import build_shim
+
+import pyrealm
+
+from pyrealm.async_realm import AsyncRealm
+from pyrealm.changes import _KeyList
+from pyrealm.coalescer import WriteCoalescer
+from pyrealm.config import RealmConfig
+from pyrealm.error import RealmException
+from pyrealm.pool import RealmPool
+from pyrealm.property import (Nullable, PropertyType, RealmPropertyType, RealmTimestamp)
+from pyrealm.realm import Realm
+from pyrealm.registry import RealmRegistry
+from pyrealm.scan import parallel_scan
+from pyrealm.scheduler import RealmScheduler
+
+CHECKS = {}
+
+
+def check(func):
+    CHECKS[func.__name__[len("check_"):]] = func
+    return func
+
+
+def _new_config() -> RealmConfig:
+    return RealmConfig(path="smoke.realm", read_only=False)
+
+
+@check
+def check_scheduler():
+    # The scheduler is created with the argument list of `realm_scheduler_new`
+    work = []
+    scheduler = RealmScheduler(work.append, threading.get_ident())
+    try:
+        assert scheduler.handle, "no scheduler handle"
+        config = _new_config()
+        scheduler.set_on_config(config)
+        assert config.scheduler is scheduler
+        scheduler.perform_work()
+    finally:
+        scheduler.close()
+    assert scheduler.handle is None
+
+
+@check
+def check_bulk_insert_rollback():
+    # A row failing at the start of a chunk must not leave the chunk's write transaction open
+    realm = Realm(_new_config())
+    for chunk_size in (1, 2):
+        try:
+            realm.bulk_insert("Person", [{"name": "a", "age": 1}, {"age": 1}], chunk_size=chunk_size)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("bulk_insert() accepted a row without a name")
+        assert realm._transaction == Realm._TransactionType.NONE, "write transaction left open"
+    result = realm.bulk_insert("Person", [{"name": "b", "age": 2}])
+    assert result.inserted == 1, result
+
+
+@check
+def check_coalescer_example():
+    # The usage documented by WriteCoalescer
+    rows = [{"name": f"event{i}", "age": i} for i in range(10)]
+    with WriteCoalescer(_new_config(), max_batch=4) as coalescer:
+        futures = [coalescer.submit(lambda realm, row: realm.insert("Person", [row]), row) for row in rows]
+        assert [x.result(timeout=5) for x in futures] == [1] * len(rows)
+        assert coalescer.stats()["writes"] == len(rows), coalescer.stats()
+
+
+@check
+def check_coalescer_rollback_failure():
+    # A failing rollback fails the batch without stopping the writer thread
+    with WriteCoalescer(_new_config(), max_batch=2, max_delay=0.5) as coalescer:
+        realm = coalescer._realm
+        rollback = realm.rollback
+
+        def fail_rollback():
+            rollback()
+            raise RealmException(message="rollback failed")
+        realm.rollback = fail_rollback
+
+        def fail(realm):
+            raise KeyError("write failed")
+        failed = coalescer.submit(fail)
+        skipped = coalescer.submit(lambda realm: realm.insert("Person", [{"name": "skipped", "age": 1}]))
+        for future, error in ((failed, KeyError), (skipped, RealmException)):
+            try:
+                future.result(timeout=5)
+            except error:
+                pass
+            else:
+                raise AssertionError(f"expected {error.__name__}")
+        realm.rollback = rollback
+        assert coalescer.write(lambda realm: realm.insert("Person", [{"name": "after", "age": 1}])) == 1
+
+
+@check
+def check_async_realm_example():
+    # The usage documented by AsyncRealm - the shim has no async transactions, so writes run in
+    # a regular write transaction on the realm thread
+    rows = [{"name": f"person{i}", "age": i} for i in range(10)]
+
+    async def run():
+        realm = await AsyncRealm.open(_new_config())
+        try:
+            assert not realm.uses_async_transactions
+            assert await realm.write(lambda r: r.insert("Person", rows)) == len(rows)
+            return await realm.read(lambda r: len(r.objects("Person")))
+        finally:
+            await realm.close()
+
+    assert asyncio.run(run()) > 0
+
+
+@check
+def check_async_realm_scheduler():
+    # The scheduler of the realm thread is set on a copy of the config, not on the caller's config
+    config = _new_config()
+
+    async def run():
+        realm = AsyncRealm(config, use_async_transactions=False)
+        # The shim has no async transactions - only the scheduler setup is exercised
+        realm._use_async_transactions = True
+        try:
+            await realm._run(realm._open)
+            assert config.scheduler is None, config.scheduler
+            assert realm.realm.config is not config and realm.realm.config.scheduler is not None
+        finally:
+            realm_config = realm._realm_config
+            await realm.close()
+        assert realm_config.closed and not config.closed
+
+    asyncio.run(run())
+
+
+@check
+def check_sort_distinct():
+    # The shim rejects descriptors that are not in the form taken by the core
+    realm = Realm(_new_config())
+    results = realm.objects("Person")
+    for derived in (results.sort("age"), results.sort("age", ascending=False), results.distinct("name")):
+        assert len(derived) == len(results)
+        derived.close()
+    try:
+        realm._lib.realm_results_sort(results._handle(), b"SORT(age ASC)")
+    except RealmException:
+        pass
+    else:
+        raise AssertionError("the shim accepted a wrapped sort descriptor")
+    results.close()
+
+
+@check
+def check_iter_range():
+    # A range only reads its own objects, whatever the chunk size
+    realm = Realm(_new_config())
+    with realm.write():
+        realm.insert("Person", [{"name": f"range{i}", "age": i} for i in range(10)])
+    results = realm.objects("Person", 4)
+    read = []
+    read_object = results._read_object
+    results._read_object = lambda index: read.append(index) or read_object(index)
+    count = len(results)
+    assert len(list(results.iter_range(3, 9))) == 6
+    assert read == list(range(3, 9)), read
+    assert len(list(results.iter_range(count - 2, count + 5))) == 2
+    results.close()
+    try:
+        parallel_scan(realm.config, "Person", list, workers=0)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("parallel_scan() accepted 0 workers")
+    assert len(parallel_scan(realm.config, "Person", list, workers=2)) == count
+
+
+@check
+def check_change_journal_keys():
+    # The keys of a change journal stay in results order while blocks are split and emptied
+    expected = list(range(10))
+    keys = _KeyList(expected, block_size=3)
+    for index, key in ((0, 100), (5, 101), (12, 102), (7, 103), (7, 104), (7, 105)):
+        keys.insert(index, key)
+        expected.insert(index, key)
+    for index in (0, 0, 0, 10, 5):
+        del keys[index]
+        del expected[index]
+    assert list(keys) == expected and len(keys) == len(expected), list(keys)
+    assert [keys[i] for i in range(len(keys))] == expected
+
+
+@check
+def check_pool_refresh_failure():
+    # An idle realm that fails to refresh is closed and replaced by a new one
+    with RealmPool(_new_config()) as pool:
+        stale = pool.acquire()
+        pool.release(stale)
+
+        def refresh():
+            raise RealmException(message="refresh failed")
+        stale.refresh = refresh
+        realm = pool.acquire()
+        assert realm is not stale and stale.closed and not realm.closed
+        pool.release(realm)
+
+
+@check
+def check_pool_finished_thread_close_failure():
+    # A realm of a finished thread failing to close doesn't stop the next thread from using the pool
+    with RealmPool(_new_config()) as pool:
+        left_behind = []
+
+        def use_pool():
+            realm = pool.acquire()
+            pool.release(realm)
+            left_behind.append(realm)
+
+        thread = threading.Thread(target=use_pool)
+        thread.start()
+        thread.join()
+        stale = left_behind[0]
+        close = stale.close
+
+        def fail_close():
+            raise RealmException(message="close failed")
+        stale.close = fail_close
+        acquired = []
+
+        def next_thread():
+            realm = pool.acquire()
+            acquired.append((realm.closed, threading.get_ident() in pool._threads))
+            pool.release(realm)
+            pool.evict_idle()
+
+        thread = threading.Thread(target=next_thread)
+        thread.start()
+        thread.join()
+        assert acquired == [(False, True)], acquired
+        stale.close = close
+        stale.close()
+
+
+@check
+def check_config_closed_before_realm():
+    # A realm keeps reading its config after the config is closed
+    pyrealm.enable_handle_tracking()
+    try:
+        with _new_config() as config:
+            realm = Realm(config)
+        assert config.closed
+        assert "smoke.realm" in str(realm)
+        realm.delete_files()
+        assert pyrealm.handle_counts().get("config") == 1, pyrealm.handle_counts()
+        realm.close()
+        assert "config" not in pyrealm.handle_counts(), pyrealm.handle_counts()
+    finally:
+        pyrealm.disable_handle_tracking()
+
+
+@check
+def check_registry_collected_under_lock():
+    # A realm collected while the registry lock is held by the same thread doesn't deadlock it
+    class Collectable():
+        pass
+
+    registry = RealmRegistry()
+    done = []
+
+    def collect():
+        obj = Collectable()
+        registry.add(obj, "collected.realm")
+        with registry._lock:
+            del obj
+        done.append(registry.stats())
+
+    thread = threading.Thread(target=collect, daemon=True)
+    thread.start()
+    thread.join(5)
+    assert done, "the registry deadlocked"
+    assert done[0]["collected"] == 1 and done[0]["open"] == 0, done[0]
+    assert len(registry) == 0
+
+
+@check
+def check_config_copy():
+    config = _new_config()
+    config.schema_version = 3
+    config.disable_format_upgrade = True
+    config.force_sync_history = True
+    config.automatic_change_notifications = False
+    config.max_number_of_active_versions = 8
+    config.in_memory = True
+    config.cached = False
+    config.fifo_path = "fifo"
+    copy = config.copy()
+    for name in (
+        "path", "schema_version", "schema_mode", "disable_format_upgrade", "force_sync_history",
+        "automatic_change_notifications", "max_number_of_active_versions", "in_memory", "cached", "fifo_path",
+    ):
+        assert getattr(copy, name) == getattr(config, name), name
+
+
+@check
+def check_query_cache_variants():
+    # Predicates with changing arguments only cache `max_variants` argument sets and don't evict
+    # the other predicates
+    realm = Realm(_new_config())
+    cache = realm.query_cache
+    realm.query("Person", "name == $0", "fixed").close()
+    for i in range(cache.max_size * 2):
+        realm.query("Person", "age == $0", i).close()
+    realm.query("Person", "name == $0", "fixed").close()
+    stats = cache.stats()
+    assert stats["size"] == 1 + cache.max_variants, stats
+    assert stats["hits"] == 1 and stats["evictions"] == 0, stats
+    assert stats["uncached"] == cache.max_size * 2 - cache.max_variants, stats
+
+
+@check
+def check_property_conversion():
+    import numpy as np
+    int_type = RealmPropertyType.RLM_PROPERTY_TYPE_INT
+    timestamp_type = RealmPropertyType.RLM_PROPERTY_TYPE_TIMESTAMP
+    assert PropertyType.convert_many(int_type, np.array([1, 2], dtype=np.uint64)).dtype == np.int64
+    for func in (
+        lambda: PropertyType.convert_many(int_type, np.array([2 ** 63], dtype=np.uint64)),
+        lambda: PropertyType.convert_value(int_type, 2 ** 63),
+    ):
+        try:
+            func()
+        except OverflowError:
+            pass
+        else:
+            raise AssertionError("int64 overflow not detected")
+    # NaT is stored as null
+    timestamps = PropertyType.convert_many(timestamp_type, np.array(["2024-01-01", "NaT"], dtype="datetime64[ns]"))
+    assert timestamps[1] is None and timestamps[0] is not None, timestamps
+    value = Nullable(RealmTimestamp()).new(np.datetime64("NaT"))
+    assert value.value is None
+    # Values out of the range of the column dtype are not wrapped
+    far = np.array(["2024-01-01", "3000-01-01"], dtype="datetime64[D]")
+    timestamps = PropertyType.convert_many(timestamp_type, far)
+    assert timestamps[1] == PropertyType.convert_value(timestamp_type, far[1]), timestamps
+    assert timestamps[1].year == 3000, timestamps
+    try:
+        PropertyType.convert_many(RealmPropertyType.RLM_PROPERTY_TYPE_FLOAT, np.array([1.0, 1e300]))
+    except OverflowError:
+        pass
+    else:
+        raise AssertionError("float32 overflow not detected")
+    doubles = PropertyType.convert_many(RealmPropertyType.RLM_PROPERTY_TYPE_DOUBLE, np.array([1.0, 1e300]))
+    assert doubles[1] == 1e300, doubles
+
+
+def main():
+    parser = argparse.ArgumentParser(description="pyrealm smoke checks against a stand-in library")
+    parser.add_argument("--filter", action="append", help="only run the checks with this name (repeatable)")
+    parser.add_argument("--build-dir", default=os.path.join(tempfile.gettempdir(), "pyrealm-bench"), help="where to build the shim")
+    args = parser.parse_args()
+
+    unknown = set(args.filter or []) - set(CHECKS)
+    if unknown:
+        parser.error(f"Unknown checks: {', '.join(sorted(unknown))}")
+
+    pyrealm.realm_init(build_shim(args.build_dir))
+
+    failed = 0
+    for name, func in CHECKS.items():
+        if args.filter and name not in args.filter:
+            continue
+        try:
+            func()
+        except Exception:
+            failed += 1
+            print(f"FAIL {name}")
+            traceback.print_exc()
+        else:
+            print(f"ok   {name}")
+        pyrealm.close_realms()
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
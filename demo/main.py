@@ -14,13 +14,29 @@ from pyrealm import (
     num_realms,
     num_open_realms,
     close_realms,
-    _opened_realms,
+    open_realms,
 )
 
 from pyrealm.config import RealmConfig
 from pyrealm.realm import Realm
-from pyrealm.property import (RealmCollectionType, RealmPropertyInfo, RealmPropertyFlags, RealmPropertyType)
-from pyrealm.schema import (RealmClassInfo, RealmClassFlags)
+from pyrealm.property import (RealmCollectionType, RealmPropertyFlags, RealmPropertyType)
+from pyrealm.schema import (RealmClassFlags, RealmSchemaClass, RealmSchemaProperty)
+
+_PROPERTY_TYPE_NAMES = {
+    RealmPropertyType.RLM_PROPERTY_TYPE_INT: "int",
+    RealmPropertyType.RLM_PROPERTY_TYPE_BOOL: "bool",
+    RealmPropertyType.RLM_PROPERTY_TYPE_STRING: "string",
+    RealmPropertyType.RLM_PROPERTY_TYPE_BINARY: "binary",
+    RealmPropertyType.RLM_PROPERTY_TYPE_MIXED: "mixed",
+    RealmPropertyType.RLM_PROPERTY_TYPE_TIMESTAMP: "timestamp",
+    RealmPropertyType.RLM_PROPERTY_TYPE_FLOAT: "float",
+    RealmPropertyType.RLM_PROPERTY_TYPE_DOUBLE: "double",
+    RealmPropertyType.RLM_PROPERTY_TYPE_DECIMAL128: "decimal128",
+    RealmPropertyType.RLM_PROPERTY_TYPE_OBJECT: "object",
+    RealmPropertyType.RLM_PROPERTY_TYPE_LINKING_OBJECTS: "linked_objects",
+    RealmPropertyType.RLM_PROPERTY_TYPE_OBJECT_ID: "objectID",
+    RealmPropertyType.RLM_PROPERTY_TYPE_UUID: "UUID",
+}
 
 #if __name__ == "__main__":
 #
@@ -60,12 +76,11 @@ class RealmDemoShell(cmd.Cmd):
     # ----- basic turtle commands -----
     def do_info(self, arg):
         'Display information about the Realm Python Library'
-        global _opened_realms
         print("Realm Python Library")
         print(f"- Realm version: {Realm.get_version()}")
         print(f"- Lib path: {get_lib_path()}")
         print(f"- All realms: {num_open_realms()} currently open")
-        self.print_realms(_opened_realms, active=self.active_realm, prepend="  ")
+        self.print_realms(open_realms(), active=self.active_realm, prepend="  ")
         print()
 
     def do_realm(self, arg):
@@ -128,38 +143,42 @@ class RealmDemoShell(cmd.Cmd):
         elif arg == "config":
             print(self.active_realm.config.info())
         elif arg == "schema":
-            class_keys = self.active_realm.get_class_keys()
-            if not class_keys:
+            schema = self.active_realm.schema
+            if not schema:
                 print("No classes found")
             else:
-                print(f"Schema classes: {len(class_keys)}")
-                for key in class_keys:
-                    info = self.active_realm.get_class(key)
-                    if info:
-                        print(f"- Name: {info.name.decode('ASCII')} [{RealmClassFlags(info.flags).name}]")
-                        properties = self.active_realm.get_class_properties(key, info.num_properties)
-                        if not properties:
-                            print("  * No properties")
-                        else:
-                            for prop in properties:
-                                print(f"  * {prop.name.decode('ASCII')}: {self.property_type(prop)}")
+                print(f"Schema classes: {len(schema)}")
+                for info in schema:
+                    self.print_class(info)
 
         elif arg.startswith("schema."):
-            _, class_name = arg.split(".", 2)
-            print(f"Schema class information for '{class_name}' is on the way")
+            _, class_name = arg.split(".", 1)
+            info = self.active_realm.schema.find_class(class_name)
+            if info is None:
+                print(f"*** Class not found: '{class_name}'")
+            else:
+                self.print_class(info)
         else:
             print(f"*** Invalid argument: '{arg}'")
 
     @classmethod
-    def property_type(cls, prop: RealmPropertyInfo):
+    def print_class(cls, info: RealmSchemaClass):
+        print(f"- Name: {info.name} [{RealmClassFlags(info.flags).name}]")
+        if not info.properties:
+            print("  * No properties")
+        else:
+            for prop in info.properties:
+                print(f"  * {prop.name}: {cls.property_type(prop)}")
+
+    @classmethod
+    def property_type(cls, prop: RealmSchemaProperty):
         type_stg = cls.txt_property_type(prop.type)
         if prop.type in [
             RealmPropertyType.RLM_PROPERTY_TYPE_LINKING_OBJECTS,
             RealmPropertyType.RLM_PROPERTY_TYPE_OBJECT
         ]:
-            type_stg += f"({prop.link_target.decode('ASCII') if prop.link_target else ''}"
-            type_stg += f":{prop.link_origin_property_name.decode('ASCII') if prop.link_origin_property_name else ''})"
-        flags = RealmPropertyFlags(prop.flags)
+            type_stg += f"({prop.link_target}:{prop.link_origin_property_name})"
+        flags = prop.flags
         if flags & RealmPropertyFlags.RLM_PROPERTY_NULLABLE:
             type_stg += "?"
         if prop.collection_type == RealmCollectionType.RLM_COLLECTION_TYPE_LIST:
@@ -172,34 +191,10 @@ class RealmDemoShell(cmd.Cmd):
 
     @classmethod
     def txt_property_type(cls, rtype: RealmPropertyType):
-        if rtype == RealmPropertyType.RLM_PROPERTY_TYPE_INT:
-            return "int"
-        elif rtype == RealmPropertyType.RLM_PROPERTY_TYPE_BOOL:
-            return "bool"
-        elif rtype == RealmPropertyType.RLM_PROPERTY_TYPE_STRING:
-            return "string"
-        elif rtype == RealmPropertyType.RLM_PROPERTY_TYPE_BINARY:
-            return "binary"
-        elif rtype == RealmPropertyType.RLM_PROPERTY_TYPE_MIXED:
-            return "mixed"
-        elif rtype == RealmPropertyType.RLM_PROPERTY_TYPE_TIMESTAMP:
-            return "timestamp"
-        elif rtype == RealmPropertyType.RLM_PROPERTY_TYPE_FLOAT:
-            return "float"
-        elif rtype == RealmPropertyType.RLM_PROPERTY_TYPE_DOUBLE:
-            return "double"
-        elif rtype == RealmPropertyType.RLM_PROPERTY_TYPE_DECIMAL128:
-            return "decimal128"
-        elif rtype == RealmPropertyType.RLM_PROPERTY_TYPE_OBJECT:
-            return "object"
-        elif rtype == RealmPropertyType.RLM_PROPERTY_TYPE_LINKING_OBJECTS:
-            return "linked_objects"
-        elif rtype == RealmPropertyType.RLM_PROPERTY_TYPE_OBJECT_ID:
-            return "objectID"
-        elif rtype == RealmPropertyType.RLM_PROPERTY_TYPE_UUID:
-            return "UUID"
-        else:
+        type_name = _PROPERTY_TYPE_NAMES.get(rtype)
+        if type_name is None:
             raise ValueError(f"Property type '{rtype}' is invalid")
+        return type_name
 
     def do_exit(self, _):
         'Close the realm and exit'
@@ -2,12 +2,17 @@ import atexit
 import ctypes
 
 from os.path import exists
-from typing import List
+from typing import (Any, Dict, List, Optional)
 
 from .realm import Realm
+from .bindings import RealmBindings
+from .registry import RealmRegistry
+from . import (handles, instrumentation)
 
 _realm_lib = None
-_opened_realms: List[Realm] = []
+_bindings: RealmBindings = None
+# The open realms - closed and garbage collected realms are dropped from the registry
+_opened_realms = RealmRegistry()
 _lib_path: str = ""
 _initialized: bool = False
 
@@ -16,12 +21,16 @@ def realm_init(path: str):
     global _initialized
     global _lib_path
     global _realm_lib
+    global _bindings
     if path:
         if not exists(path):
             raise ValueError(f"Could not find library: {path}")
         else:
             # Load the dynamic lib
             _realm_lib = ctypes.CDLL(path)
+            # Bind the C functions once and share the table with every realm and config
+            _bindings = RealmBindings(_realm_lib)
+            instrumentation.bindings_created(_bindings)
             _lib_path = str(path)
             _initialized = True
     else:
@@ -33,22 +42,84 @@ def get_lib_path() -> str:
 def is_initialized() -> bool:
     return _initialized
 
+def get_bindings() -> RealmBindings:
+    if _bindings is None:
+        raise RuntimeError("Realm library has not been initialized - call realm_init() first")
+    return _bindings
+
+# Number of realms opened since the process started
 def num_realms() -> int:
-    return len(_opened_realms)
+    return _opened_realms.num_opened
 
 def num_open_realms() -> int:
-    return len([x for x in _opened_realms if not x.closed])
+    return len(_opened_realms)
+
+# The open realms, optionally only the ones of a path and/or opened by a thread
+def open_realms(path: Optional[str] = None, thread_id: Optional[int] = None) -> List[Realm]:
+    if path is None and thread_id is None:
+        return _opened_realms.realms()
+    if thread_id is None:
+        return _opened_realms.realms_for_path(path)
+    realms = _opened_realms.realms_for_thread(thread_id)
+    return realms if path is None else [x for x in realms if x.config.path == path]
+
+# Open, opened, closed and collected realm counts, and the open realms by path and thread
+def realm_stats() -> Dict[str, Any]:
+    return _opened_realms.stats()
 
 # Make sure all the open realms are closed when exiting
 def close_realms():
     for realm in _opened_realms:
-        if not realm.closed:
-            realm.close()
+        realm.close()
 
 atexit.register(close_realms)
 
 # Reload all the open realms
 def refresh_realms():
     for realm in _opened_realms:
-        if not realm.closed:
-            realm.refresh()
+        realm.refresh()
+
+# Time every realm-ffi call - the bound functions are swapped for timed wrappers in the shared
+# bindings table while enabled, and the originals are put back when disabled
+def enable_instrumentation():
+    instrumentation.enable(get_bindings())
+
+def disable_instrumentation():
+    instrumentation.disable()
+
+def instrumentation_enabled() -> bool:
+    return instrumentation.is_enabled()
+
+# Call count, cumulative time, p50/p99 latency and errors of each realm-ffi function called while
+# instrumented
+def stats() -> Dict[str, Dict[str, Any]]:
+    return instrumentation.snapshot()
+
+def reset_stats():
+    instrumentation.reset()
+
+# The stats in the Prometheus text format
+def prometheus_metrics(prefix: str = "pyrealm") -> str:
+    return instrumentation.export_prometheus(prefix)
+
+# Debug mode recording the native handles (realms, configs, results, queries and schedulers)
+# allocated while enabled, with the stack that allocated them, until they are released
+def enable_handle_tracking(stack_depth: int = handles.DEFAULT_STACK_DEPTH):
+    handles.enable(stack_depth)
+
+def disable_handle_tracking():
+    handles.disable()
+
+def handle_tracking_enabled() -> bool:
+    return handles.is_enabled()
+
+def live_handles(kind: Optional[str] = None) -> List[handles.HandleRecord]:
+    return handles.live_handles(kind)
+
+# Number of live tracked handles by type, e.g. {"realm": 2, "results": 10}
+def handle_counts() -> Dict[str, int]:
+    return handles.counts()
+
+# The live tracked handles at least `min_age` seconds old with their allocation stacks
+def handle_report(min_age: float = 0.0) -> str:
+    return handles.report(min_age)
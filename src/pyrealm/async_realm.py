@@ -0,0 +1,245 @@
+import asyncio
+import itertools
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import (Any, Callable, Dict, Optional, TypeVar)
+
+import pyrealm
+
+from .config import RealmConfig
+from .error import (RealmException, get_last_error)
+from .realm import Realm
+from .scheduler import (RealmAsyncBeginWriteFunc, RealmAsyncCommitFunc, RealmScheduler, _free_userdata)
+
+T = TypeVar("T")
+
+_write_ids = itertools.count(1)
+# Write id -> pending async write, used to route the C callbacks back to the Python object
+_pending_writes: Dict[int, '_AsyncWrite'] = {}
+
+
+def _resolve(loop: asyncio.AbstractEventLoop, future: asyncio.Future, result: Any = None, error: BaseException = None):
+    # Complete an asyncio future from the realm thread
+    def complete():
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+    loop.call_soon_threadsafe(complete)
+
+
+def _last_error(message: str) -> RealmException:
+    # Like `throw_last_error()`, but the exception is returned so it can be passed to a future
+    return get_last_error(clear_error=True) or RealmException(message=message)
+
+
+class _AsyncWrite():
+    # A write transaction started with `realm_async_begin_write` - the function runs once the core
+    # has acquired the write lock and the future completes when the commit has been persisted
+    def __init__(self, realm: Realm, func: Callable, args: tuple, loop: asyncio.AbstractEventLoop, future: asyncio.Future):
+        self.id = next(_write_ids)
+        self.realm = realm
+        self.func = func
+        self.args = args
+        self.loop = loop
+        self.future = future
+        self.result = None
+
+    def begin(self):
+        realm = self.realm
+        with realm._lock:
+            if realm._transaction != Realm._TransactionType.NONE:
+                raise RealmException(message="Another transaction is already in progress")
+            _pending_writes[self.id] = self
+            token = realm._lib.realm_async_begin_write(realm._handle(), _on_write_ready, self.id, _free_userdata, False)
+        if not token:
+            _pending_writes.pop(self.id, None)
+            raise _last_error("Error beginning async write transaction")
+
+    def ready(self):
+        # Called on the realm thread with the write lock held
+        realm = self.realm
+        with realm._lock:
+            realm._transaction = Realm._TransactionType.WRITE
+            realm._version_changed()
+        try:
+            self.result = self.func(realm, *self.args)
+        except BaseException as e:
+            _pending_writes.pop(self.id, None)
+            realm.rollback()
+            _resolve(self.loop, self.future, error=e)
+            return
+        with realm._lock:
+            token = realm._lib.realm_async_commit(realm._handle(), _on_commit_done, self.id, _free_userdata, False)
+            realm._transaction = Realm._TransactionType.NONE
+            realm._version_changed()
+        if not token:
+            _pending_writes.pop(self.id, None)
+            _resolve(self.loop, self.future, error=_last_error("Error committing async write transaction"))
+
+    def committed(self, error: bool, description: Optional[bytes]):
+        if error:
+            message = description.decode('utf-8') if description else "unknown error"
+            _resolve(self.loop, self.future, error=RealmException(message=f"Error committing async write transaction: {message}"))
+        else:
+            _resolve(self.loop, self.future, self.result)
+
+
+@RealmAsyncBeginWriteFunc
+def _on_write_ready(userdata):
+    write = _pending_writes.get(userdata)
+    if write is not None:
+        write.ready()
+
+
+@RealmAsyncCommitFunc
+def _on_commit_done(userdata, error, description):
+    write = _pending_writes.pop(userdata, None)
+    if write is not None:
+        write.committed(error, description)
+
+
+class AsyncRealm():
+    # asyncio front end for a realm. The realm is confined to a dedicated thread that runs every
+    # operation, so waiting for the write lock never blocks the event loop. When the library supports
+    # async transactions, writes use `realm_async_begin_write`/`realm_async_commit` and the realm
+    # thread keeps serving reads while a write waits for the lock. Otherwise the write blocks the
+    # realm thread only. Write functions run inside the write transaction, so they create objects
+    # with `Realm.insert()`/`Realm.upsert()`:
+    #
+    #   realm = await AsyncRealm.open(config)
+    #   await realm.write(lambda r: r.insert("Person", rows))
+    #   count = await realm.read(lambda r: len(r.objects("Person")))
+
+    def __init__(self, config: RealmConfig, use_async_transactions: Optional[bool] = None):
+        # Use `await AsyncRealm.open(config)` - the realm is opened on the realm thread
+        if config is None:
+            raise ValueError("config cannot be None")
+        lib = pyrealm.get_bindings()
+        supported = all(
+            lib.has_function(x) for x in (
+                "realm_async_begin_write", "realm_async_commit", "realm_scheduler_new", "realm_config_set_scheduler"
+            )
+        )
+        if use_async_transactions and not supported:
+            raise RuntimeError("The realm library does not support async transactions")
+        self._config = config
+        self._use_async_transactions = supported if use_async_transactions is None else use_async_transactions
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pyrealm-async")
+        self._thread_id = self._executor.submit(threading.get_ident).result()
+        self._scheduler = None
+        # Config the realm is opened with - a copy of `config` holding the scheduler when async
+        # transactions are used, so the scheduler of the realm thread isn't left on the caller's config
+        self._realm_config = None
+        self._realm = None
+
+    @classmethod
+    async def open(cls, config: RealmConfig, use_async_transactions: Optional[bool] = None) -> 'AsyncRealm':
+        async_realm = cls(config, use_async_transactions)
+        try:
+            await async_realm._run(async_realm._open)
+        except BaseException:
+            async_realm._executor.shutdown(wait=False)
+            raise
+        return async_realm
+
+    def _open(self):
+        self._realm_config = self._config
+        if self._use_async_transactions:
+            self._realm_config = self._config.copy()
+            self._scheduler = RealmScheduler(self._submit, self._thread_id)
+            self._scheduler.set_on_config(self._realm_config)
+        self._realm = Realm(self._realm_config)
+
+    def _submit(self, func: Callable[[], None]):
+        try:
+            self._executor.submit(func)
+        except RuntimeError:
+            # The executor has been shut down
+            pass
+
+    async def _run(self, func: Callable[..., T], *args) -> T:
+        return await asyncio.wrap_future(self._executor.submit(func, *args))
+
+    @property
+    def config(self) -> RealmConfig:
+        return self._config
+
+    @property
+    def realm(self) -> Realm:
+        # The underlying realm - it can only be used from functions run on the realm thread
+        return self._realm
+
+    @property
+    def uses_async_transactions(self) -> bool:
+        return self._use_async_transactions
+
+    async def run(self, func: Callable[..., T], *args) -> T:
+        # Run `func(realm, *args)` on the realm thread outside of a transaction
+        return await self._run(lambda: func(self._realm, *args))
+
+    def _read(self, func: Callable[..., T], args: tuple) -> T:
+        with self._realm.read():
+            return func(self._realm, *args)
+
+    async def read(self, func: Callable[..., T], *args) -> T:
+        # Run `func(realm, *args)` in a read transaction
+        return await self._run(self._read, func, args)
+
+    def _write(self, func: Callable[..., T], args: tuple) -> T:
+        with self._realm.write():
+            return func(self._realm, *args)
+
+    def _begin_async_write(self, write: _AsyncWrite):
+        try:
+            write.begin()
+        except BaseException as e:
+            _resolve(write.loop, write.future, error=e)
+
+    async def write(self, func: Callable[..., T], *args) -> T:
+        # Run `func(realm, *args)` in a write transaction - the result is returned once committed
+        if not self._use_async_transactions:
+            return await self._run(self._write, func, args)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._executor.submit(self._begin_async_write, _AsyncWrite(self._realm, func, args, loop, future))
+        return await future
+
+    async def refresh(self) -> bool:
+        return await self._run(lambda: self._realm.refresh())
+
+    async def compact(self) -> bool:
+        return await self._run(lambda: self._realm.compact())
+
+    def _close(self):
+        try:
+            if self._realm is not None and not self._realm.closed:
+                self._realm.close()
+        finally:
+            try:
+                if self._scheduler is not None:
+                    self._scheduler.close()
+            finally:
+                if self._realm_config is not None and self._realm_config is not self._config:
+                    self._realm_config.close()
+
+    async def close(self):
+        try:
+            await self._run(self._close)
+        finally:
+            self._executor.shutdown(wait=False)
+
+    async def __aenter__(self) -> 'AsyncRealm':
+        return self
+
+    async def __aexit__(self, _exc_type, _exc_value, _trace):
+        await self.close()
+
+    def __str__(self):
+        return f"AsyncRealm: '{self._config.path}'"
+
+    def __repr__(self):
+        return f"<{str(self)}>"
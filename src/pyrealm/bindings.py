@@ -0,0 +1,228 @@
+import ctypes
+
+from .config import RealmConfig
+from .error import (RealmError, error_check, reports_errors)
+from .property import RealmPropertyInfo
+from .realm import Realm
+from .schema import RealmClassInfo
+from .scheduler import (
+    RealmAsyncBeginWriteFunc,
+    RealmAsyncCommitFunc,
+    RealmFreeUserdataFunc,
+    RealmOnCollectionChangeFunc,
+    RealmOnRealmChangeFunc,
+    RealmSchedulerCanDeliverFunc,
+    RealmSchedulerIsOnThreadFunc,
+    RealmSchedulerIsSameAsFunc,
+    RealmSchedulerNotifyFunc,
+    RealmShouldCompactOnLaunchFunc,
+)
+from .value import (RealmQueryArg, RealmValue)
+
+
+_realm_p = ctypes.POINTER(Realm._RealmObject)
+_config_p = ctypes.POINTER(RealmConfig._ConfigObject)
+
+# C function name -> (restype, argtypes) for every realm-ffi entry point used by pyrealm
+_FUNCTIONS = {
+    # Library / error functions
+    "realm_get_library_version": (ctypes.c_char_p, []),
+    "realm_get_library_version_numbers": (None, [
+        ctypes.POINTER(ctypes.c_int),
+        ctypes.POINTER(ctypes.c_int),
+        ctypes.POINTER(ctypes.c_int),
+        ctypes.POINTER(ctypes.c_char_p),
+    ]),
+    "realm_get_last_error": (ctypes.c_bool, [ctypes.POINTER(RealmError)]),
+    "realm_clear_last_error": (ctypes.c_bool, []),
+    "realm_release": (None, [ctypes.c_void_p]),
+
+    # Realm config functions
+    "realm_config_new": (_config_p, []),
+    "realm_config_get_path": (ctypes.c_char_p, [_config_p]),
+    "realm_config_set_path": (None, [_config_p, ctypes.c_char_p]),
+    "realm_config_get_encryption_key": (ctypes.c_size_t, [_config_p, ctypes.c_char_p]),
+    "realm_config_set_encryption_key": (ctypes.c_bool, [_config_p, ctypes.c_char_p, ctypes.c_size_t]),
+    "realm_config_get_schema_version": (ctypes.c_uint64, [_config_p]),
+    "realm_config_set_schema_version": (None, [_config_p, ctypes.c_uint64]),
+    "realm_config_get_schema_mode": (ctypes.c_int, [_config_p]),
+    "realm_config_set_schema_mode": (None, [_config_p, ctypes.c_int]),
+    "realm_config_get_disable_format_upgrade": (ctypes.c_bool, [_config_p]),
+    "realm_config_set_disable_format_upgrade": (None, [_config_p, ctypes.c_bool]),
+    "realm_config_get_force_sync_history": (ctypes.c_bool, [_config_p]),
+    "realm_config_set_force_sync_history": (None, [_config_p, ctypes.c_bool]),
+    "realm_config_get_automatic_change_notifications": (ctypes.c_bool, [_config_p]),
+    "realm_config_set_automatic_change_notifications": (None, [_config_p, ctypes.c_bool]),
+    "realm_config_get_max_number_of_active_versions": (ctypes.c_uint64, [_config_p]),
+    "realm_config_set_max_number_of_active_versions": (None, [_config_p, ctypes.c_uint64]),
+    "realm_config_get_in_memory": (ctypes.c_bool, [_config_p]),
+    "realm_config_set_in_memory": (None, [_config_p, ctypes.c_bool]),
+    "realm_config_get_fifo_path": (ctypes.c_char_p, [_config_p]),
+    "realm_config_set_fifo_path": (None, [_config_p, ctypes.c_char_p]),
+    "realm_config_get_cached": (ctypes.c_bool, [_config_p]),
+    "realm_config_set_cached": (None, [_config_p, ctypes.c_bool]),
+
+    # Realm functions
+    "realm_open": (_realm_p, [_config_p]),
+    "realm_get_version_id": (ctypes.c_bool, [
+        _realm_p, ctypes.POINTER(ctypes.c_bool), ctypes.POINTER(Realm._RealmVersionId)
+    ]),
+    "realm_get_num_versions": (ctypes.c_bool, [_realm_p, ctypes.POINTER(ctypes.c_uint64)]),
+    "realm_convert_with_config": (ctypes.c_bool, [_realm_p, _config_p, ctypes.c_bool]),
+    "realm_convert_with_path": (ctypes.c_bool, [
+        _realm_p, ctypes.c_char_p, Realm._RealmBinary, ctypes.c_bool
+    ]),
+    "realm_delete_files": (ctypes.c_bool, [ctypes.c_char_p, ctypes.POINTER(ctypes.c_bool)]),
+    "realm_is_closed": (ctypes.c_bool, [_realm_p]),
+    "realm_is_writable": (ctypes.c_bool, [_realm_p]),
+    "realm_close": (ctypes.c_bool, [_realm_p]),
+    "realm_begin_read": (ctypes.c_bool, [_realm_p]),
+    "realm_begin_write": (ctypes.c_bool, [_realm_p]),
+    "realm_commit": (ctypes.c_bool, [_realm_p]),
+    "realm_rollback": (ctypes.c_bool, [_realm_p]),
+    "realm_refresh": (ctypes.c_bool, [_realm_p, ctypes.POINTER(ctypes.c_bool)]),
+    "realm_freeze": (_realm_p, [_realm_p]),
+    "realm_compact": (ctypes.c_bool, [_realm_p, ctypes.POINTER(ctypes.c_bool)]),
+    "realm_get_schema_version": (ctypes.c_uint64, [_realm_p]),
+    "realm_get_num_classes": (ctypes.c_size_t, [_realm_p]),
+    "realm_get_schema": (ctypes.c_void_p, [_realm_p]),
+    "realm_get_class_keys": (ctypes.c_bool, [
+        _realm_p, ctypes.POINTER(ctypes.c_uint32), ctypes.c_size_t, ctypes.POINTER(ctypes.c_size_t)
+    ]),
+    "realm_get_class": (ctypes.c_bool, [_realm_p, ctypes.c_uint32, ctypes.POINTER(RealmClassInfo)]),
+    "realm_get_class_properties": (ctypes.c_bool, [
+        _realm_p,
+        ctypes.c_uint32,
+        ctypes.POINTER(RealmPropertyInfo),
+        ctypes.c_size_t,
+        ctypes.POINTER(ctypes.c_size_t)
+    ]),
+
+    # Object and results functions - object and results handles are opaque `void*` values
+    "realm_get_num_objects": (ctypes.c_bool, [_realm_p, ctypes.c_uint32, ctypes.POINTER(ctypes.c_size_t)]),
+    "realm_object_find_all": (ctypes.c_void_p, [_realm_p, ctypes.c_uint32]),
+    "realm_object_get_key": (ctypes.c_int64, [ctypes.c_void_p]),
+    "realm_object_create": (ctypes.c_void_p, [_realm_p, ctypes.c_uint32]),
+    "realm_object_create_with_primary_key": (ctypes.c_void_p, [_realm_p, ctypes.c_uint32, RealmValue]),
+    "realm_object_get_or_create_with_primary_key": (ctypes.c_void_p, [
+        _realm_p, ctypes.c_uint32, RealmValue, ctypes.POINTER(ctypes.c_bool)
+    ]),
+    "realm_set_values": (ctypes.c_bool, [
+        ctypes.c_void_p, ctypes.c_size_t, ctypes.POINTER(ctypes.c_int64), ctypes.POINTER(RealmValue), ctypes.c_bool
+    ]),
+    "realm_get_values": (ctypes.c_bool, [
+        ctypes.c_void_p, ctypes.c_size_t, ctypes.POINTER(ctypes.c_int64), ctypes.POINTER(RealmValue)
+    ]),
+    "realm_results_count": (ctypes.c_bool, [ctypes.c_void_p, ctypes.POINTER(ctypes.c_size_t)]),
+    "realm_results_get_object": (ctypes.c_void_p, [ctypes.c_void_p, ctypes.c_size_t]),
+    "realm_results_sort": (ctypes.c_void_p, [ctypes.c_void_p, ctypes.c_char_p]),
+    "realm_results_distinct": (ctypes.c_void_p, [ctypes.c_void_p, ctypes.c_char_p]),
+    "realm_results_limit": (ctypes.c_void_p, [ctypes.c_void_p, ctypes.c_size_t]),
+    "realm_results_freeze": (ctypes.c_void_p, [ctypes.c_void_p, _realm_p]),
+    "realm_results_min": (ctypes.c_bool, [
+        ctypes.c_void_p, ctypes.c_int64, ctypes.POINTER(RealmValue), ctypes.POINTER(ctypes.c_bool)
+    ]),
+    "realm_results_max": (ctypes.c_bool, [
+        ctypes.c_void_p, ctypes.c_int64, ctypes.POINTER(RealmValue), ctypes.POINTER(ctypes.c_bool)
+    ]),
+    "realm_results_sum": (ctypes.c_bool, [
+        ctypes.c_void_p, ctypes.c_int64, ctypes.POINTER(RealmValue), ctypes.POINTER(ctypes.c_bool)
+    ]),
+    "realm_results_average": (ctypes.c_bool, [
+        ctypes.c_void_p, ctypes.c_int64, ctypes.POINTER(RealmValue), ctypes.POINTER(ctypes.c_bool)
+    ]),
+
+    # Query functions
+    "realm_query_parse": (ctypes.c_void_p, [
+        _realm_p, ctypes.c_uint32, ctypes.c_char_p, ctypes.c_size_t, ctypes.POINTER(RealmQueryArg)
+    ]),
+    "realm_query_find_all": (ctypes.c_void_p, [ctypes.c_void_p]),
+}
+
+# Functions that are not available in every build of realm-ffi - these are set to None when the
+# library does not export them
+_OPTIONAL_FUNCTIONS = {
+    # Scheduler functions
+    "realm_scheduler_new": (ctypes.c_void_p, [
+        ctypes.c_void_p,
+        RealmFreeUserdataFunc,
+        RealmSchedulerNotifyFunc,
+        RealmSchedulerIsOnThreadFunc,
+        RealmSchedulerIsSameAsFunc,
+        RealmSchedulerCanDeliverFunc,
+    ]),
+    "realm_scheduler_perform_work": (None, [ctypes.c_void_p]),
+    "realm_config_set_scheduler": (None, [_config_p, ctypes.c_void_p]),
+
+    # Compaction functions
+    "realm_config_set_should_compact_on_launch_function": (None, [
+        _config_p, RealmShouldCompactOnLaunchFunc, ctypes.c_void_p, RealmFreeUserdataFunc
+    ]),
+
+    # Async transaction functions
+    "realm_async_begin_write": (ctypes.c_uint, [
+        _realm_p, RealmAsyncBeginWriteFunc, ctypes.c_void_p, RealmFreeUserdataFunc, ctypes.c_bool
+    ]),
+    "realm_async_commit": (ctypes.c_uint, [
+        _realm_p, RealmAsyncCommitFunc, ctypes.c_void_p, RealmFreeUserdataFunc, ctypes.c_bool
+    ]),
+
+    # Change notification functions - the callback tokens are released with `realm_release`
+    "realm_add_realm_changed_callback": (ctypes.c_void_p, [
+        _realm_p, RealmOnRealmChangeFunc, ctypes.c_void_p, RealmFreeUserdataFunc
+    ]),
+    "realm_results_add_notification_callback": (ctypes.c_void_p, [
+        ctypes.c_void_p, ctypes.c_void_p, RealmFreeUserdataFunc, ctypes.c_void_p, RealmOnCollectionChangeFunc
+    ]),
+    "realm_collection_changes_get_num_changes": (None, [
+        ctypes.c_void_p,
+        ctypes.POINTER(ctypes.c_size_t),
+        ctypes.POINTER(ctypes.c_size_t),
+        ctypes.POINTER(ctypes.c_size_t),
+        ctypes.POINTER(ctypes.c_size_t),
+        ctypes.POINTER(ctypes.c_bool),
+    ]),
+    "realm_collection_changes_get_changes": (None, [
+        ctypes.c_void_p,
+        ctypes.POINTER(ctypes.c_size_t), ctypes.c_size_t,
+        ctypes.POINTER(ctypes.c_size_t), ctypes.c_size_t,
+        ctypes.POINTER(ctypes.c_size_t), ctypes.c_size_t,
+        ctypes.POINTER(ctypes.c_size_t), ctypes.c_size_t,
+        ctypes.c_void_p, ctypes.c_size_t,
+    ]),
+}
+
+
+class RealmBindings():
+    # Process-wide table of the realm-ffi functions, built once by `realm_init()`.
+    # Each C function is available as an attribute with the same name as the C symbol.
+    # Functions returning false or NULL on failure raise the last error as a `RealmException`.
+
+    def __init__(self, lib: ctypes.CDLL):
+        self._lib = lib
+        for name, (restype, argtypes) in _FUNCTIONS.items():
+            setattr(self, name, self._bind(name, getattr(lib, name), restype, argtypes))
+        for name, (restype, argtypes) in _OPTIONAL_FUNCTIONS.items():
+            func = getattr(lib, name, None)
+            if func is not None:
+                func = self._bind(name, func, restype, argtypes)
+            setattr(self, name, func)
+
+    @staticmethod
+    def _bind(name: str, func, restype, argtypes):
+        func.restype = restype
+        func.argtypes = argtypes
+        if reports_errors(name, restype):
+            func.errcheck = error_check(name)
+        return func
+
+    @property
+    def lib(self) -> ctypes.CDLL:
+        return self._lib
+
+    def has_function(self, name: str) -> bool:
+        return getattr(self, name, None) is not None
+
+    @classmethod
+    def function_names(cls):
+        return list(_FUNCTIONS) + list(_OPTIONAL_FUNCTIONS)
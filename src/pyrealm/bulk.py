@@ -0,0 +1,306 @@
+import ctypes
+import time
+
+from collections import OrderedDict
+from typing import (Any, Dict, Iterable, NamedTuple, Optional, Type, Union)
+
+from .error import (RealmException, throw_last_error)
+from .property import (PropertyType, RealmCollectionType, RealmPropertyType)
+from .schema import (RealmObject, RealmSchemaClass, RealmSchemaProperty)
+from .value import (RealmValue, from_property_value, from_python, to_python)
+
+
+DEFAULT_CHUNK_SIZE = 1000
+
+# Links and collections can't be written with `realm_set_values`
+_UNWRITABLE_TYPES = [
+    RealmPropertyType.RLM_PROPERTY_TYPE_OBJECT,
+    RealmPropertyType.RLM_PROPERTY_TYPE_LINKING_OBJECTS,
+]
+
+
+class BulkInsertResult(NamedTuple):
+    inserted: int
+    chunks: int
+    elapsed: float
+
+    @property
+    def rate(self) -> float:
+        # Objects inserted per second
+        return self.inserted / self.elapsed if self.elapsed > 0 else 0.0
+
+
+class UpsertResult(NamedTuple):
+    created: int
+    updated: int
+    unchanged: int
+    elapsed: float
+
+    @property
+    def total(self) -> int:
+        return self.created + self.updated + self.unchanged
+
+
+# Outcome of writing a single object with `_ObjectLayout.upsert`
+_CREATED = 0
+_UPDATED = 1
+_UNCHANGED = 2
+
+
+def _is_writable(prop: RealmSchemaProperty) -> bool:
+    return prop.collection_type == RealmCollectionType.RLM_COLLECTION_TYPE_NONE and prop.type not in _UNWRITABLE_TYPES
+
+
+class _ObjectLayout():
+    # Column layout used to write the objects of a class: the primary key (if any) and the other
+    # properties, with preallocated key and value buffers that are reused for every object
+
+    def __init__(self, class_info: RealmSchemaClass, properties: Optional['OrderedDict[str, PropertyType]'] = None):
+        self.class_info = class_info
+        if properties is None:
+            names = [x.name for x in class_info.properties if _is_writable(x)]
+        else:
+            names = list(properties)
+        self.primary_key = None
+        self.columns = []
+        for name in names:
+            prop = class_info.get_property(name)
+            if prop is None:
+                raise ValueError(f"Property '{name}' not found in class '{class_info.name}'")
+            if not _is_writable(prop):
+                raise TypeError(f"Property '{name}' of type {prop.type.name} cannot be written in bulk")
+            if prop.is_primary_key:
+                self.primary_key = prop
+            else:
+                self.columns.append(prop)
+        if self.primary_key is None and class_info.primary_key:
+            raise ValueError(f"Primary key '{class_info.primary_key}' of class '{class_info.name}' is not in the layout")
+        if properties is not None:
+            # The property marked with PrimaryKey must be the primary key in the realm schema
+            defined = [name for name, x in properties.items() if x.is_primary_key]
+            expected = [self.primary_key.name] if self.primary_key is not None else []
+            if defined != expected:
+                raise ValueError(
+                    f"PrimaryKey properties {defined} do not match the primary key "
+                    f"'{class_info.primary_key}' of class '{class_info.name}' in the realm"
+                )
+        num_columns = len(self.columns)
+        self.keys = (ctypes.c_int64 * num_columns)(*[x.key for x in self.columns])
+        self._converters = {x.name: PropertyType.get_converter(x.type) for x in self.columns}
+        if self.primary_key is not None:
+            self._converters[self.primary_key.name] = PropertyType.get_converter(self.primary_key.type)
+        self.values = (RealmValue * num_columns)()
+        self.primary_key_value = RealmValue()
+        # Current values and the changed columns when updating existing objects
+        self._current = (RealmValue * num_columns)()
+        self._changed_keys = (ctypes.c_int64 * num_columns)()
+        self._changed_values = (RealmValue * num_columns)()
+
+    @property
+    def num_columns(self) -> int:
+        return len(self.columns)
+
+    def _get(self, row: Union[RealmObject, Dict[str, Any]], prop: RealmSchemaProperty) -> Any:
+        if isinstance(row, RealmObject):
+            return getattr(row, prop.name)
+        elif prop.name in row:
+            return row[prop.name]
+        elif prop.is_nullable:
+            return None
+        raise ValueError(f"Property '{prop.name}' was not provided and is not nullable")
+
+    def _set(self, prop: RealmSchemaProperty, value: Any, out: RealmValue):
+        if value is None:
+            if not prop.is_nullable:
+                raise ValueError(f"Property '{prop.name}' is not nullable")
+            from_python(None, out)
+        else:
+            from_property_value(prop.type, self._converters[prop.name](value), out)
+
+    def fill(self, row: Union[RealmObject, Dict[str, Any]]):
+        # Convert the values of `row` into the value buffers
+        if self.primary_key is not None:
+            self._set(self.primary_key, self._get(row, self.primary_key), self.primary_key_value)
+        for i, prop in enumerate(self.columns):
+            self._set(prop, self._get(row, prop), self.values[i])
+
+    def create(self, lib, realm, row: Union[RealmObject, Dict[str, Any]]):
+        self.fill(row)
+        if self.primary_key is not None:
+            obj = lib.realm_object_create_with_primary_key(realm, self.class_info.key, self.primary_key_value)
+        else:
+            obj = lib.realm_object_create(realm, self.class_info.key)
+        if not obj:
+            throw_last_error(f"Error creating object of class '{self.class_info.name}'")
+        try:
+            if self.columns and not lib.realm_set_values(obj, len(self.columns), self.keys, self.values, False):
+                throw_last_error(f"Error setting values of object of class '{self.class_info.name}'")
+        finally:
+            lib.realm_release(obj)
+
+    def _diff(self, lib, obj) -> int:
+        # Collect the columns whose new value differs from the stored one - returns the number of changes
+        num_columns = len(self.columns)
+        if not num_columns:
+            return 0
+        if not lib.realm_get_values(obj, num_columns, self.keys, self._current):
+            throw_last_error(f"Error reading values of object of class '{self.class_info.name}'")
+        count = 0
+        for i in range(num_columns):
+            current = self._current[i]
+            value = self.values[i]
+            if current.type != value.type or to_python(current) != to_python(value):
+                self._changed_keys[count] = self.keys[i]
+                self._changed_values[count] = value
+                count += 1
+        return count
+
+    def upsert(self, lib, realm, row: Union[RealmObject, Dict[str, Any]]) -> int:
+        # Create the object with the primary key of `row` or update the values that changed
+        self.fill(row)
+        created = ctypes.c_bool(False)
+        obj = lib.realm_object_get_or_create_with_primary_key(
+            realm, self.class_info.key, self.primary_key_value, ctypes.byref(created)
+        )
+        if not obj:
+            throw_last_error(f"Error creating object of class '{self.class_info.name}'")
+        try:
+            if created.value:
+                result = _CREATED
+                count, keys, values = len(self.columns), self.keys, self.values
+            else:
+                count = self._diff(lib, obj)
+                result = _UPDATED if count else _UNCHANGED
+                keys, values = self._changed_keys, self._changed_values
+            if count and not lib.realm_set_values(obj, count, keys, values, False):
+                throw_last_error(f"Error setting values of object of class '{self.class_info.name}'")
+        finally:
+            lib.realm_release(obj)
+        return result
+
+
+def resolve_layout(realm: 'Realm', cls: Union[Type[RealmObject], str]) -> _ObjectLayout:
+    # The layout of a RealmObject class comes from the `_properties` built by RealmObjectMeta,
+    # a class name uses all the writable properties of the class in the realm schema
+    if isinstance(cls, str):
+        return _ObjectLayout(realm._find_class(cls))
+    elif isinstance(cls, type) and issubclass(cls, RealmObject) and cls is not RealmObject:
+        return _ObjectLayout(realm._find_class(cls._name), cls._properties)
+    raise TypeError(f"Expected a RealmObject class or class name, got {cls}")
+
+
+def _check_no_transaction(realm: 'Realm', func: str):
+    if realm._transaction != realm._TransactionType.NONE:
+        raise RealmException(message=f"{func}() manages its own write transactions and cannot run inside another transaction")
+
+
+def _check_write_transaction(realm: 'Realm', func: str):
+    if realm._transaction != realm._TransactionType.WRITE:
+        raise RealmException(message=f"{func}() must run inside a write transaction")
+
+
+def bulk_insert(
+    realm: 'Realm',
+    cls: Union[Type[RealmObject], str],
+    rows: Iterable[Union[RealmObject, Dict[str, Any]]],
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> BulkInsertResult:
+    # Create an object for every row, committing a write transaction every `chunk_size` objects.
+    # If a row fails, the current chunk is rolled back and the previous chunks stay committed.
+    if chunk_size < 1:
+        raise ValueError(f"Chunk size must be greater than 0 - got {chunk_size}")
+    _check_no_transaction(realm, "bulk_insert")
+    layout = resolve_layout(realm, cls)
+    lib = realm._lib
+    inserted = 0
+    chunks = 0
+    in_chunk = 0
+    # Set while a chunk's write transaction is open - a row can fail before it is counted
+    in_write = False
+    start = time.perf_counter()
+    try:
+        for row in rows:
+            if not in_write:
+                realm.begin_write()
+                in_write = True
+            layout.create(lib, realm._realm, row)
+            in_chunk += 1
+            if in_chunk == chunk_size:
+                realm.commit()
+                in_write = False
+                inserted += in_chunk
+                chunks += 1
+                in_chunk = 0
+        if in_write:
+            realm.commit()
+            in_write = False
+            inserted += in_chunk
+            chunks += 1
+            in_chunk = 0
+    except BaseException:
+        if in_write:
+            realm.rollback()
+        raise
+    return BulkInsertResult(inserted, chunks, time.perf_counter() - start)
+
+
+def upsert_many(
+    realm: 'Realm',
+    cls: Union[Type[RealmObject], str],
+    rows: Iterable[Union[RealmObject, Dict[str, Any]]]
+) -> UpsertResult:
+    # Create or update an object for every row by primary key in a single write transaction.
+    # Only the values that changed are written to existing objects.
+    _check_no_transaction(realm, "upsert_many")
+    layout = resolve_layout(realm, cls)
+    if layout.primary_key is None:
+        raise ValueError(f"Class '{layout.class_info.name}' does not have a primary key")
+    lib = realm._lib
+    counts = [0, 0, 0]
+    start = time.perf_counter()
+    realm.begin_write()
+    try:
+        for row in rows:
+            counts[layout.upsert(lib, realm._realm, row)] += 1
+        realm.commit()
+    except BaseException:
+        realm.rollback()
+        raise
+    return UpsertResult(counts[_CREATED], counts[_UPDATED], counts[_UNCHANGED], time.perf_counter() - start)
+
+
+def insert(
+    realm: 'Realm',
+    cls: Union[Type[RealmObject], str],
+    rows: Iterable[Union[RealmObject, Dict[str, Any]]]
+) -> int:
+    # Create an object for every row in the current write transaction - returns the number of
+    # objects created. Nothing is committed: the caller commits or rolls back the transaction.
+    _check_write_transaction(realm, "insert")
+    layout = resolve_layout(realm, cls)
+    lib = realm._lib
+    handle = realm._realm
+    count = 0
+    for row in rows:
+        layout.create(lib, handle, row)
+        count += 1
+    return count
+
+
+def upsert(
+    realm: 'Realm',
+    cls: Union[Type[RealmObject], str],
+    rows: Iterable[Union[RealmObject, Dict[str, Any]]]
+) -> UpsertResult:
+    # Create or update an object for every row by primary key in the current write transaction
+    _check_write_transaction(realm, "upsert")
+    layout = resolve_layout(realm, cls)
+    if layout.primary_key is None:
+        raise ValueError(f"Class '{layout.class_info.name}' does not have a primary key")
+    lib = realm._lib
+    handle = realm._realm
+    counts = [0, 0, 0]
+    start = time.perf_counter()
+    for row in rows:
+        counts[layout.upsert(lib, handle, row)] += 1
+    return UpsertResult(counts[_CREATED], counts[_UPDATED], counts[_UNCHANGED], time.perf_counter() - start)
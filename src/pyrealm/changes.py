@@ -0,0 +1,218 @@
+from array import array
+from collections import deque
+from functools import partial
+from typing import (Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union)
+
+from .error import throw_last_error
+from .notifications import CollectionChanges
+from .results import Results
+
+# Default number of versions kept by a change journal
+DEFAULT_MAX_VERSIONS = 10000
+# Number of object keys per block of a `_KeyList`
+DEFAULT_KEY_BLOCK_SIZE = 4096
+
+
+class ClassChanges(NamedTuple):
+    # Object keys changed in a class - a key is only in one of the lists
+    inserted: List[int]
+    modified: List[int]
+    deleted: List[int]
+
+    def merge(self, other: 'ClassChanges') -> 'ClassChanges':
+        # Combine with the changes of the same class that happened after these ones - objects
+        # inserted and deleted again are not reported at all
+        deleted_now = set(other.deleted)
+        inserted_before = set(self.inserted)
+        inserted = [x for x in self.inserted if x not in deleted_now] + other.inserted
+        deleted = self.deleted + [x for x in other.deleted if x not in inserted_before]
+        skip = deleted_now.union(inserted)
+        modified = list(dict.fromkeys(x for x in self.modified + other.modified if x not in skip))
+        return ClassChanges(inserted, modified, deleted)
+
+
+class ChangeBatch():
+    # Changes committed in a single version of the realm, by class name
+    def __init__(self, version: Tuple[int, int], classes: Optional[Dict[str, ClassChanges]] = None):
+        self.version = version
+        self.classes: Dict[str, ClassChanges] = classes if classes is not None else {}
+
+    def add(self, class_name: str, changes: ClassChanges):
+        current = self.classes.get(class_name)
+        self.classes[class_name] = changes if current is None else current.merge(changes)
+
+    def __str__(self):
+        return f"ChangeBatch: version {self.version} - classes: {', '.join(self.classes)}"
+
+    def __repr__(self):
+        return f"<{str(self)}>"
+
+
+class _KeyList():
+    # Object keys in results order, stored in blocks of up to twice `block_size` keys: inserting or
+    # deleting a key only shifts the keys of its block, and finding the block walks the block sizes,
+    # instead of shifting every key after it in a single array.
+
+    def __init__(self, keys: Iterable[int] = (), block_size: int = DEFAULT_KEY_BLOCK_SIZE):
+        self._block_size = block_size
+        self._blocks: List[array] = []
+        block = array('q')
+        for key in keys:
+            block.append(key)
+            if len(block) == block_size:
+                self._blocks.append(block)
+                block = array('q')
+        if block:
+            self._blocks.append(block)
+        self._len = sum(len(x) for x in self._blocks)
+
+    def _locate(self, index: int) -> Tuple[int, int]:
+        # Block number and offset in the block of the key at `index`
+        if not 0 <= index < self._len:
+            raise IndexError(f"Key index out of range: {index}")
+        for i, block in enumerate(self._blocks):
+            if index < len(block):
+                return i, index
+            index -= len(block)
+        raise IndexError(f"Key index out of range: {index}")
+
+    def insert(self, index: int, key: int):
+        if index == self._len:
+            if not self._blocks or len(self._blocks[-1]) >= self._block_size:
+                self._blocks.append(array('q'))
+            self._blocks[-1].append(key)
+        else:
+            i, offset = self._locate(index)
+            block = self._blocks[i]
+            block.insert(offset, key)
+            if len(block) >= 2 * self._block_size:
+                self._blocks[i:i + 1] = [block[:self._block_size], block[self._block_size:]]
+        self._len += 1
+
+    def clear(self):
+        self._blocks = []
+        self._len = 0
+
+    def __getitem__(self, index: int) -> int:
+        i, offset = self._locate(index)
+        return self._blocks[i][offset]
+
+    def __delitem__(self, index: int):
+        i, offset = self._locate(index)
+        block = self._blocks[i]
+        del block[offset]
+        if not block:
+            del self._blocks[i]
+        self._len -= 1
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> Iterator[int]:
+        for block in self._blocks:
+            yield from block
+
+
+def _version_number(version: Union[int, Tuple[int, int], None]) -> int:
+    if version is None:
+        return 0
+    return version[0] if isinstance(version, tuple) else version
+
+
+class ChangeJournal():
+    # Records the keys of the objects inserted, modified and deleted by every version of the realm,
+    # from the collection notifications of each class, so consumers can resume from a checkpointed
+    # version without diffing the tables. Up to `max_versions` versions are kept.
+    #
+    # Deletions are reported by results index, and the deleted objects can no longer be read when
+    # the notification arrives, so the object keys of each class are kept in results order to map
+    # the indices back to keys. Reading them when the journal starts costs one object lookup per
+    # object of the journaled classes - O(number of objects), once. After that, every change costs
+    # O(size of the change), plus walking the key blocks of a `_KeyList` for each changed index.
+
+    def __init__(self, realm: 'Realm', class_names: Optional[List[str]] = None, max_versions: int = DEFAULT_MAX_VERSIONS):
+        if max_versions < 1:
+            raise ValueError(f"Max versions must be greater than 0 - got {max_versions}")
+        self._realm = realm
+        self._lib = realm._lib
+        if class_names is None:
+            class_names = [x.name for x in realm.schema.classes]
+        self._batches: deque = deque(maxlen=max_versions)
+        # Changes before this version are no longer available
+        self._base_version = _version_number(realm.transaction_version)
+        self._results: Dict[str, Results] = {}
+        self._keys: Dict[str, _KeyList] = {}
+        try:
+            for name in class_names:
+                results = realm.objects(name)
+                self._results[name] = results
+                self._keys[name] = _KeyList(self._object_key(results, i) for i in range(len(results)))
+                results.on_change(partial(self._changed, name), window=0)
+        except BaseException:
+            self.close()
+            raise
+
+    @property
+    def class_names(self) -> List[str]:
+        return list(self._results)
+
+    @property
+    def base_version(self) -> int:
+        return self._base_version
+
+    @property
+    def max_versions(self) -> int:
+        return self._batches.maxlen
+
+    def _object_key(self, results: Results, index: int) -> int:
+        obj = self._lib.realm_results_get_object(results._handle(), index)
+        if not obj:
+            throw_last_error(f"Error requesting object at index {index}")
+        try:
+            return self._lib.realm_object_get_key(obj)
+        finally:
+            self._lib.realm_release(obj)
+
+    def _changed(self, class_name: str, changes: CollectionChanges):
+        keys = self._keys[class_name]
+        results = self._results[class_name]
+        if changes.cleared:
+            deleted = list(keys)
+            keys.clear()
+        else:
+            deleted = [keys[i] for i in changes.deletions]
+            for i in reversed(changes.deletions):
+                del keys[i]
+        inserted = []
+        for i in changes.insertions:
+            key = self._object_key(results, i)
+            keys.insert(i, key)
+            inserted.append(key)
+        modified = [keys[i] for i in changes.modifications]
+
+        version = self._realm.transaction_version
+        if not self._batches or self._batches[-1].version != version:
+            if len(self._batches) == self._batches.maxlen:
+                self._base_version = _version_number(self._batches[0].version)
+            self._batches.append(ChangeBatch(version))
+        self._batches[-1].add(class_name, ClassChanges(inserted, modified, deleted))
+
+    def changes_since(self, version: Union[int, Tuple[int, int]]) -> Iterator[ChangeBatch]:
+        # Iterate over the change batches committed after `version`, oldest first - `version` is a
+        # `transaction_version` or the version of a batch used as a checkpoint
+        number = _version_number(version)
+        if number < self._base_version:
+            raise ValueError(f"Changes before version {self._base_version} are no longer available - got {number}")
+        return iter([x for x in self._batches if x.version[0] > number])
+
+    def close(self):
+        for results in self._results.values():
+            results.close()
+        self._results = {}
+        self._keys = {}
+
+    def __str__(self):
+        return f"ChangeJournal: {len(self._batches)} versions since version {self._base_version}"
+
+    def __repr__(self):
+        return f"<{str(self)}>"
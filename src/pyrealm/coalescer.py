@@ -0,0 +1,252 @@
+import queue
+import threading
+import time
+
+from concurrent.futures import Future
+from typing import (Any, Callable, Dict, List, Optional, TypeVar)
+
+from .config import RealmConfig
+from .metrics import Histogram
+from .realm import Realm
+
+T = TypeVar("T")
+
+# Queued to wake up the writer thread when the coalescer is closed
+_STOP = object()
+
+
+class _QueuedWrite():
+    def __init__(self, func: Callable, args: tuple):
+        self.func = func
+        self.args = args
+        self.future = Future()
+        self.queued = time.monotonic()
+        self.result = None
+
+
+class WriteCoalescer():
+    # Group commit for many small writes. Write functions are queued from any thread and a dedicated
+    # writer thread, which owns its own realm, runs a batch of them in a single write transaction.
+    # A batch is committed once it holds `max_batch` writes or `max_delay` seconds after its first
+    # write was queued, whichever comes first. Each caller's future completes with the result of its
+    # function once the batch has been committed.
+    #
+    # If a function raises, the transaction is rolled back, the caller gets the exception and the
+    # rest of the batch is run again in a new transaction - write functions must only change the realm.
+    # If the commit itself fails, every write in the batch gets the error. If the rollback fails, the
+    # state of the transaction is unknown, so the rest of the batch isn't run again and gets the
+    # rollback error instead.
+    #
+    # Write functions run inside the batch's write transaction, so they create objects with
+    # `Realm.insert()`/`Realm.upsert()` rather than `bulk_insert()`, which manages its own transactions:
+    #
+    #   with WriteCoalescer(config) as coalescer:
+    #       future = coalescer.submit(lambda realm, row: realm.insert("Event", [row]), row)
+
+    DEFAULT_MAX_BATCH = 100
+    DEFAULT_MAX_DELAY = 0.005
+
+    def __init__(self, config: RealmConfig, max_batch: int = DEFAULT_MAX_BATCH, max_delay: float = DEFAULT_MAX_DELAY):
+        if config is None:
+            raise ValueError("config cannot be None")
+        if max_batch < 1:
+            raise ValueError(f"Max batch size must be greater than 0 - got {max_batch}")
+        if max_delay < 0:
+            raise ValueError(f"Max delay cannot be negative - got {max_delay}")
+        self._config = config
+        self._max_batch = max_batch
+        self._max_delay = max_delay
+        self._queue = queue.SimpleQueue()
+        self._closed = False
+        self._close_lock = threading.Lock()
+        self._realm = None
+        self._batches = 0
+        self._writes = 0
+        self._failed = 0
+        self._retries = 0
+        self._batch_sizes = Histogram.exponential(1, 2, max(1, max_batch.bit_length()))
+        self._latency = Histogram.exponential(0.0001, 2, 16)
+        self._commit_time = Histogram.exponential(0.0001, 2, 16)
+
+        # Open the realm on the writer thread and pass any error back to the caller
+        opened = Future()
+        self._thread = threading.Thread(target=self._run, args=(opened,), name="pyrealm-writer", daemon=True)
+        self._thread.start()
+        opened.result()
+
+    @property
+    def config(self) -> RealmConfig:
+        return self._config
+
+    @property
+    def max_batch(self) -> int:
+        return self._max_batch
+
+    @property
+    def max_delay(self) -> float:
+        return self._max_delay
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    @property
+    def batch_sizes(self) -> Histogram:
+        return self._batch_sizes
+
+    @property
+    def latency(self) -> Histogram:
+        # Seconds from queuing a write until its future completes
+        return self._latency
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "batches": self._batches,
+            "writes": self._writes,
+            "failed": self._failed,
+            "retries": self._retries,
+            "pending": self.pending,
+            "writes_per_batch": self._writes / self._batches if self._batches else 0.0,
+            "batch_size": self._batch_sizes.snapshot(),
+            "latency": self._latency.snapshot(),
+            "commit_time": self._commit_time.snapshot(),
+        }
+
+    def submit(self, func: Callable[..., T], *args) -> 'Future[T]':
+        # Queue `func(realm, *args)` to run in the next write transaction - can be called from any thread
+        if self._closed:
+            raise RuntimeError("Write coalescer is closed")
+        write = _QueuedWrite(func, args)
+        self._queue.put(write)
+        return write.future
+
+    def write(self, func: Callable[..., T], *args) -> T:
+        # Like `submit()`, but waits for the batch to be committed
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("write() cannot be called from a write function")
+        return self.submit(func, *args).result()
+
+    def _run(self, opened: Future):
+        try:
+            self._realm = Realm(self._config)
+        except BaseException as e:
+            opened.set_exception(e)
+            return
+        opened.set_result(None)
+        try:
+            stopping = False
+            while not stopping:
+                item = self._queue.get()
+                if item is _STOP:
+                    break
+                batch = [item]
+                deadline = item.queued + self._max_delay
+                while len(batch) < self._max_batch:
+                    timeout = deadline - time.monotonic()
+                    try:
+                        item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is _STOP:
+                        stopping = True
+                        break
+                    batch.append(item)
+                self._write_batch(batch)
+        finally:
+            self._realm.close()
+
+    def _write_batch(self, batch: List[_QueuedWrite]):
+        writes = [x for x in batch if x.future.set_running_or_notify_cancel()]
+        self._batch_sizes.observe(len(writes))
+        while writes:
+            failed = self._run_batch(writes)
+            if failed is None:
+                break
+            # Only the failed write gets its exception, the others run again in a new transaction
+            writes.remove(failed)
+            self._retries += 1
+        self._batches += 1
+
+    def _run_batch(self, writes: List[_QueuedWrite]) -> Optional[_QueuedWrite]:
+        realm = self._realm
+        try:
+            realm.begin_write()
+        except BaseException as e:
+            self._complete(writes, error=e)
+            return None
+        for write in writes:
+            try:
+                write.result = write.func(realm, *write.args)
+            except BaseException as e:
+                rollback_error = self._rollback()
+                self._complete([write], error=e)
+                if rollback_error is not None:
+                    self._complete([x for x in writes if x is not write], error=rollback_error)
+                    return None
+                return write
+        start = time.perf_counter()
+        try:
+            realm.commit()
+        except BaseException as e:
+            self._rollback()
+            self._complete(writes, error=e)
+            return None
+        self._commit_time.observe(time.perf_counter() - start)
+        self._complete(writes)
+        return None
+
+    def _rollback(self) -> Optional[BaseException]:
+        # Roll back the batch's transaction - the error is returned rather than raised, so it can't
+        # stop the writer thread and leave the queued futures pending
+        try:
+            if self._realm._transaction != Realm._TransactionType.NONE:
+                self._realm.rollback()
+        except BaseException as e:
+            return e
+        return None
+
+    def _complete(self, writes: List[_QueuedWrite], error: BaseException = None):
+        now = time.monotonic()
+        for write in writes:
+            self._latency.observe(now - write.queued)
+            if error is not None:
+                self._failed += 1
+                write.future.set_exception(error)
+            else:
+                self._writes += 1
+                write.future.set_result(write.result)
+
+    def close(self, wait: bool = True):
+        # Stop accepting writes - the writes already queued are still committed
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        if not wait or threading.current_thread() is self._thread:
+            return
+        self._thread.join()
+        # Anything queued after the stop marker by a racing submit() is cancelled
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                item.future.cancel()
+
+    def __enter__(self) -> 'WriteCoalescer':
+        return self
+
+    def __exit__(self, _exc_type, _exc_value, _trace):
+        self.close()
+
+    def __str__(self):
+        return f"WriteCoalescer: '{self._config.path}' - batches: {self._batches}, writes: {self._writes}"
+
+    def __repr__(self):
+        return f"<{str(self)}>"
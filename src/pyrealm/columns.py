@@ -0,0 +1,134 @@
+import ctypes
+
+from typing import (Dict, List, Optional)
+
+from .error import throw_last_error
+from .property import (RealmCollectionType, RealmPropertyType)
+from .schema import (RealmSchemaClass, RealmSchemaProperty)
+from .value import (RealmTimestampValue, RealmValue, RealmValueType)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+DEFAULT_BATCH_SIZE = 4096
+
+# Property types that can be read as NumPy columns and the dtype of the resulting array
+_COLUMN_DTYPES = {
+    RealmPropertyType.RLM_PROPERTY_TYPE_INT: "int64",
+    RealmPropertyType.RLM_PROPERTY_TYPE_BOOL: "bool",
+    RealmPropertyType.RLM_PROPERTY_TYPE_FLOAT: "float32",
+    RealmPropertyType.RLM_PROPERTY_TYPE_DOUBLE: "float64",
+    RealmPropertyType.RLM_PROPERTY_TYPE_TIMESTAMP: "datetime64[ns]",
+}
+
+_value_dtype = None
+
+
+def _get_value_dtype() -> 'np.dtype':
+    # NumPy view of a `realm_value_t` so a whole batch of values can be decoded without
+    # creating a Python object per value
+    global _value_dtype
+    if _value_dtype is None:
+        _value_dtype = np.dtype({
+            "names": ["integer", "boolean", "fnum", "dnum", "seconds", "nanoseconds", "type"],
+            "formats": [np.int64, np.bool_, np.float32, np.float64, np.int64, np.int32, np.int32],
+            "offsets": [
+                0, 0, 0, 0,
+                RealmTimestampValue.seconds.offset,
+                RealmTimestampValue.nanoseconds.offset,
+                RealmValue.type.offset,
+            ],
+            "itemsize": ctypes.sizeof(RealmValue),
+        })
+    return _value_dtype
+
+
+def _check_numpy():
+    if np is None:
+        raise ImportError("NumPy is required to read columns - install it with 'pip install numpy'")
+
+
+def get_column_properties(class_info: RealmSchemaClass, props: Optional[List[str]] = None) -> List[RealmSchemaProperty]:
+    # Resolve the property names to read - all the supported columns are read if `props` is not provided
+    if props is None:
+        return [
+            x for x in class_info.properties
+            if x.type in _COLUMN_DTYPES and x.collection_type == RealmCollectionType.RLM_COLLECTION_TYPE_NONE
+        ]
+    columns = []
+    for name in props:
+        prop = class_info.get_property(name)
+        if prop is None:
+            raise ValueError(f"Property '{name}' not found in class '{class_info.name}'")
+        if prop.type not in _COLUMN_DTYPES or prop.collection_type != RealmCollectionType.RLM_COLLECTION_TYPE_NONE:
+            raise TypeError(f"Property '{name}' of type {prop.type.name} cannot be read as a column")
+        columns.append(prop)
+    return columns
+
+
+def _store_column(prop: RealmSchemaProperty, values: 'np.ndarray', dest: 'np.ndarray'):
+    if prop.type == RealmPropertyType.RLM_PROPERTY_TYPE_INT:
+        dest[:] = values["integer"]
+    elif prop.type == RealmPropertyType.RLM_PROPERTY_TYPE_BOOL:
+        dest[:] = values["boolean"]
+    elif prop.type == RealmPropertyType.RLM_PROPERTY_TYPE_FLOAT:
+        dest[:] = values["fnum"]
+    elif prop.type == RealmPropertyType.RLM_PROPERTY_TYPE_DOUBLE:
+        dest[:] = values["dnum"]
+    elif prop.type == RealmPropertyType.RLM_PROPERTY_TYPE_TIMESTAMP:
+        dest.view(np.int64)[:] = values["seconds"] * 1_000_000_000 + values["nanoseconds"]
+
+
+def read_results_columns(
+    lib,
+    results: int,
+    num_rows: int,
+    columns: List[RealmSchemaProperty],
+    batch_size: int = DEFAULT_BATCH_SIZE
+) -> Dict[str, 'np.ndarray']:
+    # Read the `columns` of the first `num_rows` objects of a native results handle into
+    # preallocated arrays, decoding `batch_size` objects at a time
+    _check_numpy()
+    if batch_size < 1:
+        raise ValueError(f"Batch size must be greater than 0 - got {batch_size}")
+    num_columns = len(columns)
+    data = {x.name: np.empty(num_rows, dtype=_COLUMN_DTYPES[x.type]) for x in columns}
+    masks = {x.name: np.zeros(num_rows, dtype=np.bool_) for x in columns if x.is_nullable}
+
+    if num_rows and num_columns:
+        batch_size = min(batch_size, num_rows)
+        keys = (ctypes.c_int64 * num_columns)(*[x.key for x in columns])
+        buffer = (RealmValue * (batch_size * num_columns))()
+        row_size = ctypes.sizeof(RealmValue) * num_columns
+        base = ctypes.addressof(buffer)
+        rows = [ctypes.cast(base + i * row_size, ctypes.POINTER(RealmValue)) for i in range(batch_size)]
+        view = np.frombuffer(buffer, dtype=_get_value_dtype()).reshape(batch_size, num_columns)
+
+        get_object = lib.realm_results_get_object
+        get_values = lib.realm_get_values
+        release = lib.realm_release
+        for start in range(0, num_rows, batch_size):
+            count = min(batch_size, num_rows - start)
+            for i in range(count):
+                obj = get_object(results, start + i)
+                if not obj:
+                    throw_last_error(f"Error requesting object at index {start + i}")
+                try:
+                    found = get_values(obj, num_columns, keys, rows[i])
+                finally:
+                    release(obj)
+                if not found:
+                    throw_last_error(f"Error reading values of object at index {start + i}")
+            batch = view[:count]
+            for j, prop in enumerate(columns):
+                _store_column(prop, batch[:, j], data[prop.name][start:start + count])
+                if prop.name in masks:
+                    masks[prop.name][start:start + count] = batch[:, j]["type"] == RealmValueType.RLM_TYPE_NULL
+
+    return {
+        name: np.ma.masked_array(values, mask=masks[name]) if name in masks else values
+        for name, values in data.items()
+    }
@@ -0,0 +1,110 @@
+import itertools
+import threading
+import weakref
+
+from typing import (Any, Dict, Optional)
+
+from .scheduler import RealmShouldCompactOnLaunchFunc
+
+_MB = 1024 * 1024
+
+_policy_ids = itertools.count(1)
+# Policy id -> compaction policy, used to route the C callback back to the Python object
+_policies = weakref.WeakValueDictionary()
+
+
+class CompactionPolicy():
+    # Decides whether a realm file is compacted when it is opened: when at least
+    # `min_free_percent` % of the file is free space or the file is larger than `max_file_size_mb`
+    # megabytes. Set it with `RealmConfig.compaction_policy` - the core asks the policy when the
+    # first realm of the file is opened by the process.
+
+    DEFAULT_MIN_FREE_PERCENT = 50.0
+
+    def __init__(self, min_free_percent: Optional[float] = DEFAULT_MIN_FREE_PERCENT, max_file_size_mb: Optional[float] = None):
+        if min_free_percent is None and max_file_size_mb is None:
+            raise ValueError("Compaction policy needs a free space percentage or a file size")
+        if min_free_percent is not None and not 0 <= min_free_percent <= 100:
+            raise ValueError(f"Free space percentage must be between 0 and 100 - got {min_free_percent}")
+        if max_file_size_mb is not None and max_file_size_mb < 0:
+            raise ValueError(f"Max file size cannot be negative - got {max_file_size_mb}")
+        self._min_free_percent = min_free_percent
+        self._max_file_size_mb = max_file_size_mb
+        self._lock = threading.Lock()
+        self._checks = 0
+        self._compactions = 0
+        self._bytes_reclaimable = 0
+        self._last_total = 0
+        self._last_used = 0
+        self._id = next(_policy_ids)
+        _policies[self._id] = self
+
+    @property
+    def id(self) -> int:
+        return self._id
+
+    @property
+    def min_free_percent(self) -> Optional[float]:
+        return self._min_free_percent
+
+    @property
+    def max_file_size_mb(self) -> Optional[float]:
+        return self._max_file_size_mb
+
+    @property
+    def compactions(self) -> int:
+        return self._compactions
+
+    def should_compact(self, total_bytes: int, used_bytes: int) -> bool:
+        free_bytes = total_bytes - used_bytes
+        if total_bytes <= 0 or free_bytes <= 0:
+            # Nothing to reclaim
+            return False
+        if self._min_free_percent is not None and free_bytes * 100 >= self._min_free_percent * total_bytes:
+            return True
+        return self._max_file_size_mb is not None and total_bytes > self._max_file_size_mb * _MB
+
+    def _check(self, total_bytes: int, used_bytes: int) -> bool:
+        compact = self.should_compact(total_bytes, used_bytes)
+        with self._lock:
+            self._checks += 1
+            self._last_total = total_bytes
+            self._last_used = used_bytes
+            if compact:
+                self._compactions += 1
+                self._bytes_reclaimable += total_bytes - used_bytes
+        return compact
+
+    def stats(self) -> Dict[str, Any]:
+        # `bytes_reclaimable` is the free space of the files compacted when they were checked
+        with self._lock:
+            return {
+                "checks": self._checks,
+                "compactions": self._compactions,
+                "bytes_reclaimable": self._bytes_reclaimable,
+                "last_total_bytes": self._last_total,
+                "last_used_bytes": self._last_used,
+            }
+
+    def __str__(self):
+        conditions = []
+        if self._min_free_percent is not None:
+            conditions.append(f"free space >= {self._min_free_percent}%")
+        if self._max_file_size_mb is not None:
+            conditions.append(f"file size > {self._max_file_size_mb} MB")
+        return f"CompactionPolicy: {' or '.join(conditions)}"
+
+    def __repr__(self):
+        return f"<{str(self)}>"
+
+
+@RealmShouldCompactOnLaunchFunc
+def _should_compact_on_launch(userdata, total_bytes, used_bytes):
+    policy = _policies.get(userdata)
+    if policy is None:
+        return False
+    try:
+        return policy._check(total_bytes, used_bytes)
+    except Exception:
+        # Exceptions cannot be passed through the C callback - don't compact
+        return False
@@ -0,0 +1,177 @@
+import os
+import threading
+import time
+
+from collections import deque
+from typing import (Any, Callable, Dict, List, NamedTuple, Optional)
+
+import pyrealm
+
+from .compaction import CompactionPolicy
+from .config import RealmConfig
+from .realm import Realm
+
+
+class CompactionReport(NamedTuple):
+    path: str
+    compacted: bool
+    size_before: int
+    size_after: int
+    elapsed: float
+
+    @property
+    def reclaimed(self) -> int:
+        return max(0, self.size_before - self.size_after)
+
+
+class BackgroundCompactor():
+    # Compacts a realm file from a background thread when the file is idle: no realm of the file is
+    # open in this process and the file has not been written to for `idle_time` seconds (or
+    # `is_idle()` returns True if given). Every `interval` seconds, an idle file is opened with a
+    # separate, uncached handle and the core compacts it while opening when `policy` says so - the
+    # core only compacts when no other process has the file open either.
+
+    DEFAULT_INTERVAL = 300.0
+    DEFAULT_IDLE_TIME = 30.0
+
+    def __init__(
+        self,
+        config: RealmConfig,
+        policy: Optional[CompactionPolicy] = None,
+        interval: float = DEFAULT_INTERVAL,
+        idle_time: float = DEFAULT_IDLE_TIME,
+        is_idle: Optional[Callable[[], bool]] = None,
+        history_size: int = 100
+    ):
+        if config is None:
+            raise ValueError("config cannot be None")
+        if config.in_memory:
+            raise ValueError("In-memory realms cannot be compacted in the background")
+        if interval <= 0:
+            raise ValueError(f"Interval must be greater than 0 - got {interval}")
+        if idle_time < 0:
+            raise ValueError(f"Idle time cannot be negative - got {idle_time}")
+        self._config = config
+        self._path = config.path
+        self._policy = policy or config.compaction_policy or CompactionPolicy()
+        self._interval = interval
+        self._idle_time = idle_time
+        self._is_idle = is_idle
+        self._reports: deque = deque(maxlen=history_size)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._runs = 0
+        self._skipped = 0
+        self._compactions = 0
+        self._bytes_reclaimed = 0
+        self._time_spent = 0.0
+
+    @property
+    def config(self) -> RealmConfig:
+        return self._config
+
+    @property
+    def policy(self) -> CompactionPolicy:
+        return self._policy
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def reports(self) -> List[CompactionReport]:
+        with self._lock:
+            return list(self._reports)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "runs": self._runs,
+                "skipped": self._skipped,
+                "compactions": self._compactions,
+                "bytes_reclaimed": self._bytes_reclaimed,
+                "time_spent": self._time_spent,
+                "last_report": self._reports[-1] if self._reports else None,
+            }
+
+    def idle(self) -> bool:
+        if self._is_idle is not None:
+            return self._is_idle()
+        if pyrealm._opened_realms.count_for_path(self._path):
+            return False
+        try:
+            modified = os.path.getmtime(self._path)
+        except OSError:
+            # No file to compact yet
+            return False
+        return time.time() - modified >= self._idle_time
+
+    def _file_size(self) -> int:
+        try:
+            return os.path.getsize(self._path)
+        except OSError:
+            return 0
+
+    def run_once(self) -> Optional[CompactionReport]:
+        # Compact the file now if it is idle - returns None if it was not
+        if not self.idle():
+            with self._lock:
+                self._skipped += 1
+            return None
+        config = self._config.copy()
+        config.cached = False
+        config.compaction_policy = self._policy
+        compactions = self._policy.compactions
+        size_before = self._file_size()
+        start = time.perf_counter()
+        Realm(config).close()
+        elapsed = time.perf_counter() - start
+        report = CompactionReport(
+            self._path, self._policy.compactions > compactions, size_before, self._file_size(), elapsed
+        )
+        with self._lock:
+            self._runs += 1
+            self._reports.append(report)
+            if report.compacted:
+                self._compactions += 1
+                self._bytes_reclaimed += report.reclaimed
+                self._time_spent += elapsed
+        return report
+
+    def _run(self):
+        while not self._stop.wait(self._interval):
+            try:
+                self.run_once()
+            except Exception:
+                # The file may have been opened between the idle check and the compaction - try
+                # again in the next window
+                with self._lock:
+                    self._skipped += 1
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="pyrealm-compactor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._stop.set()
+        if thread is not threading.current_thread():
+            thread.join()
+
+    def __enter__(self) -> 'BackgroundCompactor':
+        self.start()
+        return self
+
+    def __exit__(self, _exc_type, _exc_value, _trace):
+        self.stop()
+
+    def __str__(self):
+        return f"BackgroundCompactor: '{self._path}'{' - running' if self.running else ''}"
+
+    def __repr__(self):
+        return f"<{str(self)}>"
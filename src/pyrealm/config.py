@@ -1,9 +1,13 @@
 import ctypes
+import threading
 
 from enum import IntEnum
-from typing import List
+from typing import (List, Optional)
 
 import pyrealm
+from . import handles
+from .compaction import (CompactionPolicy, _should_compact_on_launch)
+from .scheduler import _free_userdata
 from .schema import RealmObject
 
 
@@ -31,8 +35,16 @@ class RealmConfig():
         schema_version: int = 0,
         schema: List[RealmObject] = None,
     ):
-        self._init_if()
-        self._config = self._new_config()
+        self._lib = pyrealm.get_bindings()
+        self._config = self._lib.realm_config_new()
+        handles.track("config", self._config)
+        # Open realms using the config - `close()` keeps the handle until the last one is closed
+        self._lock = threading.Lock()
+        self._num_realms = 0
+        self._close_pending = False
+        # Set by `RealmScheduler.set_on_config()`
+        self._scheduler = None
+        self._compaction_policy = None
 
         if path:
             self.path = path
@@ -43,47 +55,9 @@ class RealmConfig():
             self.schema_mode = RealmSchemaMode.RLM_SCHEMA_MODE_AUTOMATIC
         self.schema_version = schema_version
 
-    def _init_if(self) -> None:
-        # Set up the interface for the Realm config functions
-        self._new_config = pyrealm._realm_lib.realm_config_new
-        self._new_config.restype = ctypes.POINTER(RealmConfig._ConfigObject)
-        self._set_path = pyrealm._realm_lib.realm_config_set_path
-        self._get_path = pyrealm._realm_lib.realm_config_get_path
-        self._get_path.restype = ctypes.c_char_p
-        self._get_encryption_key = pyrealm._realm_lib.realm_config_get_encryption_key
-        self._get_encryption_key.restype = ctypes.c_ulong
-        self._set_encryption_key = pyrealm._realm_lib.realm_config_set_encryption_key
-        self._get_schema_version = pyrealm._realm_lib.realm_config_get_schema_version
-        self._get_schema_version.restype = ctypes.c_uint64
-        self._set_schema_version = pyrealm._realm_lib.realm_config_set_schema_version
-        self._get_schema_mode = pyrealm._realm_lib.realm_config_get_schema_mode
-        self._get_schema_mode.restype = ctypes.c_uint64
-        self._set_schema_mode = pyrealm._realm_lib.realm_config_set_schema_mode
-        self._get_disable_format_upgrade = pyrealm._realm_lib.realm_config_get_disable_format_upgrade
-        self._get_disable_format_upgrade = ctypes.c_bool
-        self._set_disable_format_upgrade = pyrealm._realm_lib.realm_config_set_disable_format_upgrade
-        self._get_force_sync_history = pyrealm._realm_lib.realm_config_get_force_sync_history
-        self._get_force_sync_history.restype = ctypes.c_bool
-        self._set_force_sync_history = pyrealm._realm_lib.realm_config_set_force_sync_history
-        self._get_automatic_change_notifications = pyrealm._realm_lib.realm_config_get_automatic_change_notifications
-        self._get_automatic_change_notifications.restype = ctypes.c_bool
-        self._set_automatic_change_notifications = pyrealm._realm_lib.realm_config_set_automatic_change_notifications
-        self._get_max_number_of_active_versions = pyrealm._realm_lib.realm_config_get_max_number_of_active_versions
-        self._get_max_number_of_active_versions.restype = ctypes.c_uint64
-        self._set_max_number_of_active_versions = pyrealm._realm_lib.realm_config_set_max_number_of_active_versions
-        self._get_in_memory = pyrealm._realm_lib.realm_config_get_in_memory
-        self._get_in_memory.restype = ctypes.c_bool
-        self._set_in_memory = pyrealm._realm_lib.realm_config_set_in_memory
-        self._get_fifo_path = pyrealm._realm_lib.realm_config_get_fifo_path
-        self._get_fifo_path.restype = ctypes.c_char_p
-        self._set_fifo_path = pyrealm._realm_lib.realm_config_set_fifo_path
-        self._get_cached = pyrealm._realm_lib.realm_config_get_cached
-        self._get_cached.restype = ctypes.c_bool
-        self._set_cached = pyrealm._realm_lib.realm_config_set_cached
-
     @property
     def path(self) -> str:
-        value = self._get_path(self._config)
+        value = self._lib.realm_config_get_path(self._handle())
         if value:
             return value.decode('ASCII')
         else:
@@ -92,14 +66,14 @@ class RealmConfig():
     @path.setter
     def path(self, path: str):
         if path:
-            self._set_path(self._config, ctypes.c_char_p(path.encode('utf-8')))
+            self._lib.realm_config_set_path(self._handle(), path.encode('utf-8'))
         else:
             raise ValueError("Path cannot be empty")
 
     @property
     def encryption_key(self) -> bytes:
         buf = ctypes.create_string_buffer(100)
-        keylen = self._get_encryption_key(self._config, buf)
+        keylen = self._lib.realm_config_get_encryption_key(self._handle(), buf)
         if keylen > 0:
             return buf.raw[:keylen]
         else:
@@ -111,78 +85,102 @@ class RealmConfig():
             key = b''
         elif len(key) not in [0, 64]:
             raise ValueError(f"Encryption key length must be 0 or 64 - got {len(key)} bytes")
-        return self._set_encryption_key(self._config, ctypes.c_char_p(key), ctypes.c_int(len(key)))
+        return self._lib.realm_config_set_encryption_key(self._handle(), key, len(key))
 
     @property
     def schema_version(self) -> int:
-        return self._get_schema_version(self._config)
+        return self._lib.realm_config_get_schema_version(self._handle())
 
     @schema_version.setter
     def schema_version(self, num: int):
-        self._set_schema_version(self._config, ctypes.c_uint64(num))
+        self._lib.realm_config_set_schema_version(self._handle(), num)
 
     @property
     def schema_mode(self) -> RealmSchemaMode:
-        result = self._get_schema_mode(self._config)
+        result = self._lib.realm_config_get_schema_mode(self._handle())
         return RealmSchemaMode(result)
 
     @schema_mode.setter
     def schema_mode(self, mode: RealmSchemaMode):
         if not isinstance(mode, RealmSchemaMode):
             raise TypeError(f"Invalid schema mode type: {type(mode)}")
-        self._set_schema_mode(self._config, ctypes.c_int(mode.value))
+        self._lib.realm_config_set_schema_mode(self._handle(), mode.value)
 
     @property
     def disable_format_upgrade(self) -> bool:
-        return self._get_disable_format_upgrade(self._config)
+        return self._lib.realm_config_get_disable_format_upgrade(self._handle())
 
     @disable_format_upgrade.setter
     def disable_format_upgrade(self, disable: bool):
-        self._set_disable_format_upgrade(self._config, ctypes.c_bool(disable))
+        self._lib.realm_config_set_disable_format_upgrade(self._handle(), disable)
 
     @property
     def force_sync_history(self) -> bool:
-        return self._get_force_sync_history(self._config)
+        return self._lib.realm_config_get_force_sync_history(self._handle())
 
     @force_sync_history.setter
     def force_sync_history(self, force: bool):
-        self._set_force_sync_history(self._config, ctypes.c_bool(force))
+        self._lib.realm_config_set_force_sync_history(self._handle(), force)
 
     @property
     def automatic_change_notifications(self) -> bool:
-        return self._get_automatic_change_notifications(self._config)
+        return self._lib.realm_config_get_automatic_change_notifications(self._handle())
 
     @automatic_change_notifications.setter
     def automatic_change_notifications(self, force: bool):
-        self._set_automatic_change_notifications(self._config, ctypes.c_bool(force))
+        self._lib.realm_config_set_automatic_change_notifications(self._handle(), force)
 
     @property
     def force_sync_history(self) -> bool:
-        return self._get_force_sync_history(self._config)
+        return self._lib.realm_config_get_force_sync_history(self._handle())
 
     @force_sync_history.setter
     def force_sync_history(self, force: bool):
-        self._set_force_sync_history(self._config, ctypes.c_bool(force))
+        self._lib.realm_config_set_force_sync_history(self._handle(), force)
+
+    @property
+    def scheduler(self) -> 'RealmScheduler':
+        # Scheduler the realms opened with this config deliver their callbacks through, if any
+        return self._scheduler
+
+    @property
+    def compaction_policy(self) -> Optional[CompactionPolicy]:
+        return self._compaction_policy
+
+    @compaction_policy.setter
+    def compaction_policy(self, policy: Optional[CompactionPolicy]):
+        # Compact the file on launch according to the policy - None disables compaction on launch
+        if policy is not None and not isinstance(policy, CompactionPolicy):
+            raise TypeError(f"Invalid compaction policy type: {type(policy)}")
+        if not self._lib.has_function("realm_config_set_should_compact_on_launch_function"):
+            raise RuntimeError("The realm library does not support compaction on launch")
+        if policy is None:
+            self._lib.realm_config_set_should_compact_on_launch_function(self._handle(), None, None, None)
+        else:
+            self._lib.realm_config_set_should_compact_on_launch_function(
+                self._handle(), _should_compact_on_launch, policy.id, _free_userdata
+            )
+        self._compaction_policy = policy
 
     @property
     def max_number_of_active_versions(self) -> int:
-        return self._get_max_number_of_active_versions(self._config)
+        return self._lib.realm_config_get_max_number_of_active_versions(self._handle())
 
     @max_number_of_active_versions.setter
     def max_number_of_active_versions(self, num: int):
-        self._set_max_number_of_active_versions(self._config, ctypes.c_uint64(num))
+        self._lib.realm_config_set_max_number_of_active_versions(self._handle(), num)
 
     @property
     def in_memory(self) -> bool:
-        return self._get_in_memory(self._config)
+        return self._lib.realm_config_get_in_memory(self._handle())
 
     @in_memory.setter
     def in_memory(self, enable: bool):
-        self._set_in_memory(self._config, ctypes.c_bool(enable))
+        self._lib.realm_config_set_in_memory(self._handle(), enable)
 
     @property
     def fifo_path(self) -> str:
-        result = self._get_fifo_path(self._config)
+        result = self._lib.realm_config_get_fifo_path(self._handle())
         if result:
             return result.decode("ASCII")
         else:
@@ -191,19 +189,85 @@ class RealmConfig():
     @fifo_path.setter
     def fifo_path(self, path: str):
         if path is not None:
-            self._set_fifo_path(self._config, ctypes.c_char_p(path.encode('utf-8')))
+            self._lib.realm_config_set_fifo_path(self._handle(), path.encode('utf-8'))
         else:
             raise ValueError("Fifo path cannot be none")
 
     @property
     def cached(self) -> bool:
-        return self._get_cached(self._config)
+        return self._lib.realm_config_get_cached(self._handle())
 
     @cached.setter
     def cached(self, enable: bool):
-        self._set_cached(self._config, ctypes.c_bool(enable))
+        self._lib.realm_config_set_cached(self._handle(), enable)
+
+    def copy(self) -> 'RealmConfig':
+        # New config with the same settings - the scheduler is bound to a thread and is not copied
+        config = RealmConfig(schema_version=self.schema_version)
+        if self.path:
+            config.path = self.path
+        config.encryption_key = self.encryption_key
+        config.schema_mode = self.schema_mode
+        config.in_memory = self.in_memory
+        config.disable_format_upgrade = self.disable_format_upgrade
+        config.force_sync_history = self.force_sync_history
+        config.automatic_change_notifications = self.automatic_change_notifications
+        config.max_number_of_active_versions = self.max_number_of_active_versions
+        config.cached = self.cached
+        if self.fifo_path:
+            config.fifo_path = self.fifo_path
+        if self._compaction_policy is not None:
+            config.compaction_policy = self._compaction_policy
+        return config
+
+    @property
+    def closed(self) -> bool:
+        return self._config is None or self._close_pending
+
+    def _handle(self) -> ctypes.POINTER(_ConfigObject):
+        if self._config is None:
+            raise ValueError("Config has been closed")
+        return self._config
+
+    def _realm_opened(self):
+        with self._lock:
+            self._num_realms += 1
+
+    def _realm_closed(self):
+        with self._lock:
+            self._num_realms -= 1
+            release = self._close_pending and self._num_realms == 0
+        if release:
+            self._release()
+
+    def close(self):
+        # Release the native config. Realms opened with the config still read their settings from
+        # it, so the handle is only released once the last of them is closed.
+        with self._lock:
+            if self._num_realms:
+                self._close_pending = True
+                return
+        self._release()
+
+    def _release(self):
+        config, self._config = self._config, None
+        self._close_pending = False
+        handles.release(self._lib, config)
+
+    def __del__(self):
+        # No realm can be using the config anymore
+        if getattr(self, "_config", None) is not None:
+            self._release()
+
+    def __enter__(self) -> 'RealmConfig':
+        return self
+
+    def __exit__(self, _exc_type, _exc_value, _trace):
+        self.close()
 
     def __str__(self):
+        if self.closed:
+            return "RealmConfig: closed"
         return f"RealmConfig: '{self.path}'{', encrypted' if self.encryption_key else ''}"
 
     def __repr__(self):
@@ -222,7 +286,8 @@ class RealmConfig():
             f"{prepend}- Realm max versions:       {self.max_number_of_active_versions}\n"
             f"{prepend}- Realm in memory:          {self.in_memory}\n"
             f"{prepend}- Realm fifo path:          {self.fifo_path}\n"
-            f"{prepend}- Realm cached:             {self.cached}"
+            f"{prepend}- Realm cached:             {self.cached}\n"
+            f"{prepend}- Realm compaction:         {self._compaction_policy or 'none'}"
         )
 
 
@@ -1,7 +1,8 @@
 import ctypes
+import threading
 
 from enum import IntEnum
-from typing import Optional
+from typing import (Any, Callable, Optional, Tuple, Union)
 
 import pyrealm
 
@@ -87,13 +88,13 @@ class RealmException(Exception):
         self.code = 0
 
         if realm_err:
-            self.errorno = RealmErrorNo(realm_err.error.value)
-            errmsg = realm_err.message.decode("ASCII") if realm_err.messsage else message if message is not None else ""
-            self.errmessage = f"{self.errorno.name}: {errmsg}"
+            self.errorno = _error_no(realm_err.error)
+            errmsg = realm_err.message.decode("utf-8", "replace") if realm_err.message else message if message is not None else ""
+            self.errmessage = f"{getattr(self.errorno, 'name', self.errorno)}: {errmsg}"
             if self.errorno == RealmErrorNo.RLM_ERR_LOGIC:
-                self.kind = RealmLogicError(realm_err.kind.logic_error_kind.value)
+                self.kind = _logic_error_kind(realm_err.kind.logic_error_kind)
             else:
-                self.code = RealmLogicError(realm_err.kind.code.value)
+                self.code = realm_err.kind.code
 
         super().__init__(self.errmessage)
 
@@ -104,13 +105,40 @@ class RealmException(Exception):
         return f"<RealmException:{self.errmessage}>"
 
 
+def _error_no(value: int) -> Union[RealmErrorNo, int]:
+    # Keep the raw value of error codes added by newer versions of the core
+    try:
+        return RealmErrorNo(value)
+    except ValueError:
+        return value
+
+
+def _logic_error_kind(value: int) -> Union[RealmLogicError, int]:
+    try:
+        return RealmLogicError(value)
+    except ValueError:
+        return value
+
+
+# The last error is stored per thread by the core, so each thread reads it into its own struct
+# allocated the first time the thread needs it
+_local = threading.local()
+
+
+def _error_struct() -> Tuple[RealmError, Any]:
+    try:
+        return _local.error
+    except AttributeError:
+        realm_err = RealmError()
+        _local.error = (realm_err, ctypes.byref(realm_err))
+        return _local.error
+
+
 def get_last_error(clear_error: bool = False) -> RealmException:
-    pyrealm.realm_lib.realm_get_last_error.restype = ctypes.c_bool
-    realm_err = RealmError()
+    realm_err, realm_err_ref = _error_struct()
     realm_ex = None
-    if pyrealm.realm_lib.realm_get_last_error(ctypes.byref(realm_err)):
-        if realm_err:
-            realm_ex = RealmException(realm_err=realm_err)
+    if pyrealm.get_bindings().realm_get_last_error(realm_err_ref):
+        realm_ex = RealmException(realm_err=realm_err)
     if clear_error:
         clear_last_error()
     return realm_ex
@@ -123,5 +151,34 @@ def throw_last_error(alt_message: str = "", clear_error: bool = True):
         raise RealmException(message=alt_message)
 
 def clear_last_error() -> bool:
-    pyrealm.realm_lib.realm_clear_last_error.restype = ctypes.c_bool
-    return pyrealm.realm_lib.realm_clear_last_error()
+    return pyrealm.get_bindings().realm_clear_last_error()
+
+
+# Functions returning a bool or a pointer that is a value rather than a success flag
+VALUE_FUNCTIONS = frozenset({
+    "realm_get_last_error",
+    "realm_clear_last_error",
+    "realm_is_closed",
+    "realm_is_writable",
+})
+
+
+def reports_errors(name: str, restype) -> bool:
+    # Functions returning false or NULL on failure, with the reason in the last error
+    if name in VALUE_FUNCTIONS or name.startswith("realm_config_get_"):
+        return False
+    if restype is ctypes.c_bool or restype is ctypes.c_void_p:
+        return True
+    return isinstance(restype, type) and issubclass(restype, ctypes._Pointer)
+
+
+def error_check(name: str) -> Callable:
+    # ctypes `errcheck` hook of a function that reports errors: a successful call only costs the
+    # test of the result, a failed call raises the last error of the thread
+    message = f"{name} failed"
+
+    def check(result, _func, _args):
+        if result:
+            return result
+        raise get_last_error(clear_error=True) or RealmException(message=message)
+    return check
@@ -0,0 +1,115 @@
+import ctypes
+import threading
+import time
+import traceback
+
+from collections import Counter
+from typing import (Any, Dict, List, Optional)
+
+DEFAULT_STACK_DEPTH = 16
+
+_lock = threading.Lock()
+_tracking = False
+_stack_depth = DEFAULT_STACK_DEPTH
+# Handle address -> record of the native handles created while tracking and not released yet
+_live: Dict[int, 'HandleRecord'] = {}
+
+
+class HandleRecord():
+    # A native handle owned by pyrealm and where it was allocated
+    def __init__(self, kind: str, address: int, stack: traceback.StackSummary):
+        self.kind = kind
+        self.address = address
+        self.stack = stack
+        self.thread = threading.current_thread().name
+        self.created = time.monotonic()
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.created
+
+    def format_stack(self) -> str:
+        return "".join(traceback.format_list(self.stack))
+
+    def __str__(self):
+        return f"HandleRecord: {self.kind} 0x{self.address:x} allocated {self.age:.1f}s ago by thread '{self.thread}'"
+
+    def __repr__(self):
+        return f"<{str(self)}>"
+
+
+def _address(handle: Any) -> Optional[int]:
+    # Handles are either `c_void_p` results (int) or typed pointers
+    if handle is None or isinstance(handle, int):
+        return handle
+    return ctypes.cast(handle, ctypes.c_void_p).value
+
+
+def track(kind: str, handle: Any):
+    # Record a native handle that was just allocated - nothing is done unless tracking is enabled
+    if not _tracking or not handle:
+        return
+    # Drop the frame of this function
+    record = HandleRecord(kind, _address(handle), traceback.extract_stack(limit=_stack_depth + 1)[:-1])
+    with _lock:
+        _live[record.address] = record
+
+
+def release(lib, handle: Any):
+    # Release a native handle allocated by the core and stop tracking it
+    if not handle:
+        return
+    if _live:
+        with _lock:
+            _live.pop(_address(handle), None)
+    lib.realm_release(handle)
+
+
+def enable(stack_depth: int = DEFAULT_STACK_DEPTH):
+    global _tracking
+    global _stack_depth
+    if stack_depth < 1:
+        raise ValueError(f"Stack depth must be greater than 0 - got {stack_depth}")
+    _stack_depth = stack_depth
+    _tracking = True
+
+
+def disable(clear: bool = True):
+    # Stop recording new handles - the handles recorded so far are forgotten unless `clear` is False
+    global _tracking
+    _tracking = False
+    if clear:
+        with _lock:
+            _live.clear()
+
+
+def is_enabled() -> bool:
+    return _tracking
+
+
+def live_handles(kind: Optional[str] = None) -> List[HandleRecord]:
+    # The tracked handles not released yet, oldest first
+    with _lock:
+        records = list(_live.values())
+    return sorted((x for x in records if kind is None or x.kind == kind), key=lambda x: x.created)
+
+
+def counts() -> Dict[str, int]:
+    # Number of live tracked handles by type
+    with _lock:
+        return dict(Counter(x.kind for x in _live.values()))
+
+
+def report(min_age: float = 0.0) -> str:
+    # The live tracked handles at least `min_age` seconds old, grouped by type with the stack that
+    # allocated each of them
+    records = [x for x in live_handles() if x.age >= min_age]
+    if not records:
+        return "No live native handles"
+    lines = []
+    for kind, count in sorted(Counter(x.kind for x in records).items()):
+        lines.append(f"{kind}: {count} live")
+        for record in (x for x in records if x.kind == kind):
+            lines.append(f"  {record}")
+            lines.extend(f"    {x}" for x in record.format_stack().rstrip().splitlines())
+    return "\n".join(lines)
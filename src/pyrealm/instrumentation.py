@@ -0,0 +1,203 @@
+import functools
+import threading
+import time
+
+from typing import (Any, Callable, Dict, List, Optional)
+
+from .error import reports_errors
+from .metrics import Histogram
+
+# Latency buckets from 1 microsecond to ~16 seconds
+_LATENCY_START = 0.000001
+_LATENCY_FACTOR = 2
+_LATENCY_BUCKETS = 25
+
+_lock = threading.Lock()
+_enabled = False
+# Function name -> stats, kept when the instrumentation is turned off so they can still be read
+_stats: Dict[str, 'FunctionStats'] = {}
+# Function name -> original function of the instrumented bindings
+_originals: Dict[str, Callable] = {}
+_instrumented = None
+
+
+class FunctionStats():
+    # Call count, latency and error count of a single realm-ffi function
+    def __init__(self, name: str):
+        self.name = name
+        self.errors = 0
+        self.latency = Histogram.exponential(_LATENCY_START, _LATENCY_FACTOR, _LATENCY_BUCKETS)
+
+    @property
+    def calls(self) -> int:
+        return self.latency.count
+
+    @property
+    def total_time(self) -> float:
+        return self.latency.sum
+
+    def snapshot(self) -> Dict[str, Any]:
+        calls = self.latency.count
+        return {
+            "calls": calls,
+            "errors": self.errors,
+            "total_time": self.latency.sum,
+            "mean": self.latency.sum / calls if calls else 0.0,
+            "p50": self.latency.percentile(50),
+            "p99": self.latency.percentile(99),
+        }
+
+
+def _wrap(name: str, func: Callable, stats: FunctionStats) -> Callable:
+    observe = stats.latency.observe
+    perf_counter = time.perf_counter
+
+    if reports_errors(name, getattr(func, "restype", None)):
+        @functools.wraps(func)
+        def wrapper(*args):
+            start = perf_counter()
+            try:
+                result = func(*args)
+            except BaseException:
+                stats.errors += 1
+                raise
+            finally:
+                observe(perf_counter() - start)
+            if not result:
+                stats.errors += 1
+            return result
+    else:
+        @functools.wraps(func)
+        def wrapper(*args):
+            start = perf_counter()
+            try:
+                return func(*args)
+            except BaseException:
+                stats.errors += 1
+                raise
+            finally:
+                observe(perf_counter() - start)
+    return wrapper
+
+
+def _instrument(bindings):
+    # Swap every function of the shared bindings table for a timed wrapper - realms, configs and
+    # results look the functions up in the table on every call, so they all use the wrappers
+    global _instrumented
+    for name in bindings.function_names():
+        func = getattr(bindings, name, None)
+        if func is None:
+            continue
+        stats = _stats.get(name)
+        if stats is None:
+            stats = _stats[name] = FunctionStats(name)
+        _originals[name] = func
+        setattr(bindings, name, _wrap(name, func, stats))
+    _instrumented = bindings
+
+
+def _restore():
+    # Put the original functions back, so there is no overhead left once disabled
+    global _instrumented
+    if _instrumented is not None:
+        for name, func in _originals.items():
+            setattr(_instrumented, name, func)
+    _originals.clear()
+    _instrumented = None
+
+
+def bindings_created(bindings):
+    # Called by `realm_init()` for a new bindings table
+    with _lock:
+        if _enabled:
+            _restore()
+            _instrument(bindings)
+
+
+def enable(bindings):
+    global _enabled
+    with _lock:
+        if _enabled and _instrumented is bindings:
+            return
+        _restore()
+        _instrument(bindings)
+        _enabled = True
+
+
+def disable():
+    global _enabled
+    with _lock:
+        _restore()
+        _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset():
+    with _lock:
+        for stats in _stats.values():
+            stats.errors = 0
+            stats.latency.reset()
+
+
+def function_stats(name: str) -> Optional[FunctionStats]:
+    return _stats.get(name)
+
+
+def snapshot() -> Dict[str, Dict[str, Any]]:
+    # Stats of every function called while instrumented, by function name
+    with _lock:
+        stats = list(_stats.values())
+    return {x.name: x.snapshot() for x in stats if x.calls}
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def export_prometheus(prefix: str = "pyrealm") -> str:
+    # Prometheus text exposition format of the stats
+    with _lock:
+        stats = sorted((x for x in _stats.values() if x.calls), key=lambda x: x.name)
+    lines: List[str] = [
+        f"# HELP {prefix}_ffi_calls_total Number of calls to each realm-ffi function",
+        f"# TYPE {prefix}_ffi_calls_total counter",
+    ]
+    lines += [f"{prefix}_ffi_calls_total{{function=\"{_label(x.name)}\"}} {x.calls}" for x in stats]
+    lines += [
+        f"# HELP {prefix}_ffi_errors_total Number of failed calls to each realm-ffi function",
+        f"# TYPE {prefix}_ffi_errors_total counter",
+    ]
+    lines += [f"{prefix}_ffi_errors_total{{function=\"{_label(x.name)}\"}} {x.errors}" for x in stats]
+    lines += [
+        f"# HELP {prefix}_ffi_call_duration_seconds Latency of the realm-ffi function calls",
+        f"# TYPE {prefix}_ffi_call_duration_seconds histogram",
+    ]
+    for x in stats:
+        name = _label(x.name)
+        cumulative = 0
+        for bound, count in x.latency.buckets():
+            cumulative += count
+            lines.append(f"{prefix}_ffi_call_duration_seconds_bucket{{function=\"{name}\",le=\"{_number(bound)}\"}} {cumulative}")
+        lines.append(f"{prefix}_ffi_call_duration_seconds_sum{{function=\"{name}\"}} {_number(x.total_time)}")
+        lines.append(f"{prefix}_ffi_call_duration_seconds_count{{function=\"{name}\"}} {x.calls}")
+    lines += [
+        f"# HELP {prefix}_ffi_call_latency_seconds Estimated latency quantiles of the realm-ffi function calls",
+        f"# TYPE {prefix}_ffi_call_latency_seconds gauge",
+    ]
+    for x in stats:
+        name = _label(x.name)
+        for quantile in (50, 99):
+            lines.append(
+                f"{prefix}_ffi_call_latency_seconds{{function=\"{name}\",quantile=\"{quantile / 100}\"}} "
+                f"{_number(x.latency.percentile(quantile))}"
+            )
+    return "\n".join(lines) + "\n"
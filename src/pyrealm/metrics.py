@@ -0,0 +1,81 @@
+import threading
+
+from bisect import bisect_left
+from typing import (Any, Dict, List, Sequence)
+
+
+class Histogram():
+    # Fixed bucket histogram - a value is counted in the first bucket whose upper bound is greater
+    # than or equal to it, values above the last bound go to an overflow bucket. Percentiles are
+    # estimated from the bucket bounds.
+
+    def __init__(self, bounds: Sequence[float]):
+        if not bounds:
+            raise ValueError("Histogram needs at least one bucket bound")
+        self._bounds = tuple(sorted(bounds))
+        self._lock = threading.Lock()
+        self.reset()
+
+    @classmethod
+    def exponential(cls, start: float, factor: float, count: int) -> 'Histogram':
+        return cls([start * factor ** i for i in range(count)])
+
+    @property
+    def bounds(self) -> Sequence[float]:
+        return self._bounds
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @property
+    def sum(self) -> float:
+        return self._sum
+
+    def reset(self):
+        with self._lock:
+            self._counts = [0] * (len(self._bounds) + 1)
+            self._count = 0
+            self._sum = 0
+            self._min = None
+            self._max = None
+
+    def observe(self, value: float):
+        with self._lock:
+            self._counts[bisect_left(self._bounds, value)] += 1
+            self._count += 1
+            self._sum += value
+            if self._min is None or value < self._min:
+                self._min = value
+            if self._max is None or value > self._max:
+                self._max = value
+
+    def percentile(self, percent: float) -> float:
+        # Upper bound of the bucket holding the value at `percent` (0-100), capped by the max value
+        with self._lock:
+            if not self._count:
+                return 0.0
+            rank = max(1, -(-self._count * percent // 100))
+            seen = 0
+            for i, count in enumerate(self._counts):
+                seen += count
+                if seen >= rank:
+                    return min(self._bounds[i], self._max) if i < len(self._bounds) else self._max
+            return self._max
+
+    def buckets(self) -> List[Any]:
+        # (upper bound, count) for every bucket - the overflow bucket bound is infinity
+        with self._lock:
+            return list(zip(self._bounds + (float("inf"),), self._counts))
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self._count,
+            "sum": self._sum,
+            "min": self._min if self._min is not None else 0,
+            "max": self._max if self._max is not None else 0,
+            "mean": self._sum / self._count if self._count else 0,
+            "p50": self.percentile(50),
+            "p99": self.percentile(99),
+            "buckets": self.buckets(),
+        }
@@ -0,0 +1,359 @@
+import os
+import threading
+import time
+import traceback
+import warnings
+
+from collections import deque
+from typing import (Any, Callable, Dict, List, Optional, Tuple)
+
+from .config import RealmConfig
+from .realm import (Realm, TransactionContextHandler)
+
+DEFAULT_STACK_DEPTH = 8
+
+
+class OpenTransaction():
+    # A read transaction opened with `realm.read()` and where it was opened
+    def __init__(self, handler: TransactionContextHandler, stack_depth: int):
+        self.handler = handler
+        self.realm = handler.realm
+        self.thread = threading.current_thread()
+        self.opened = time.monotonic()
+        self.version = handler.realm.transaction_version
+        self.refreshes = 0
+        self.alerted = False
+        # Drop the frames of this class, the tracker and `__enter__`
+        self.stack = traceback.extract_stack(limit=stack_depth + 3)[:-3]
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.opened
+
+    def format_stack(self) -> str:
+        return "".join(traceback.format_list(self.stack))
+
+    def __str__(self):
+        return (
+            f"Read transaction on '{self.realm.config.path}' at version {self.version} held for "
+            f"{self.age:.1f}s by thread '{self.thread.name}'"
+        )
+
+    def __repr__(self):
+        return f"<{str(self)}>"
+
+
+class TransactionTracker():
+    # Records the read transactions opened with `TransactionContextHandler` while it is installed
+    def __init__(self, stack_depth: int = DEFAULT_STACK_DEPTH):
+        self._stack_depth = stack_depth
+        self._lock = threading.Lock()
+        self._open: Dict[int, OpenTransaction] = {}
+
+    def opened(self, handler: TransactionContextHandler):
+        transaction = OpenTransaction(handler, self._stack_depth)
+        with self._lock:
+            self._open[id(handler)] = transaction
+
+    def closed(self, handler: TransactionContextHandler):
+        with self._lock:
+            self._open.pop(id(handler), None)
+
+    def open_transactions(self, path: Optional[str] = None) -> List[OpenTransaction]:
+        # Open read transactions, oldest first, optionally only the ones on the realm file at `path`
+        with self._lock:
+            transactions = list(self._open.values())
+        if path is not None:
+            transactions = [x for x in transactions if x.realm.config.path == path]
+        return sorted(transactions, key=lambda x: x.opened)
+
+
+_tracker_lock = threading.Lock()
+_tracker_users = 0
+
+
+def _install_tracker(stack_depth: int) -> TransactionTracker:
+    global _tracker_users
+    with _tracker_lock:
+        if TransactionContextHandler._tracker is None:
+            TransactionContextHandler._tracker = TransactionTracker(stack_depth)
+        _tracker_users += 1
+        return TransactionContextHandler._tracker
+
+
+def _uninstall_tracker():
+    global _tracker_users
+    with _tracker_lock:
+        _tracker_users -= 1
+        if _tracker_users <= 0:
+            _tracker_users = 0
+            TransactionContextHandler._tracker = None
+
+
+class VersionAlert():
+    # Raised (as a warning or passed to `on_alert`) when a monitor threshold is crossed. `reason` is
+    # "versions", "file_size" or "read_age".
+    def __init__(self, reason: str, message: str, num_versions: int, file_size: int, transactions: List[OpenTransaction]):
+        self.reason = reason
+        self.message = message
+        self.num_versions = num_versions
+        self.file_size = file_size
+        self.transactions = transactions
+
+    def __str__(self):
+        lines = [self.message]
+        for transaction in self.transactions:
+            lines.append(f"  {transaction}\n{transaction.format_stack()}")
+        return "\n".join(lines)
+
+    def __repr__(self):
+        return f"<VersionAlert: {self.reason}>"
+
+
+class VersionMonitor():
+    # Background monitor for the growth of a realm file. Every `interval` seconds a monitor thread
+    # samples the number of active versions and the file size, and alerts when there are more than
+    # `max_versions` versions, the file is larger than `max_file_size` bytes or a read transaction
+    # opened with `realm.read()` has been held for more than `max_read_age` seconds. Alerts go to
+    # `on_alert` if set, otherwise they are issued as a ResourceWarning, and list the read
+    # transactions pinning old versions with the stack that opened them.
+    #
+    # With `auto_refresh`, the realms holding those transactions are refreshed to the latest
+    # version. This is only possible for realms whose config has a scheduler, since the refresh
+    # must run on the thread that owns the realm.
+
+    DEFAULT_INTERVAL = 5.0
+    DEFAULT_MAX_VERSIONS = 32
+    DEFAULT_MAX_READ_AGE = 60.0
+    DEFAULT_HISTORY_SIZE = 120
+
+    def __init__(
+        self,
+        config: RealmConfig,
+        interval: float = DEFAULT_INTERVAL,
+        max_versions: Optional[int] = DEFAULT_MAX_VERSIONS,
+        max_file_size: Optional[int] = None,
+        max_read_age: Optional[float] = DEFAULT_MAX_READ_AGE,
+        auto_refresh: bool = False,
+        on_alert: Optional[Callable[[VersionAlert], None]] = None,
+        stack_depth: int = DEFAULT_STACK_DEPTH,
+        history_size: int = DEFAULT_HISTORY_SIZE
+    ):
+        if config is None:
+            raise ValueError("config cannot be None")
+        if interval <= 0:
+            raise ValueError(f"Interval must be greater than 0 - got {interval}")
+        self._config = config
+        self._path = config.path
+        self._interval = interval
+        self._max_versions = max_versions
+        self._max_file_size = max_file_size
+        self._max_read_age = max_read_age
+        self._auto_refresh = auto_refresh
+        self._on_alert = on_alert
+        self._stack_depth = stack_depth
+        self._history: deque = deque(maxlen=history_size)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._tracker = None
+        self._realm = None
+        self._active_alerts = set()
+        self._samples = 0
+        self._alerts = 0
+        self._refreshes = 0
+        self._refresh_failures = 0
+        self._max_seen_versions = 0
+        self._max_seen_file_size = 0
+
+    @property
+    def config(self) -> RealmConfig:
+        return self._config
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def history(self) -> List[Tuple[float, int, int]]:
+        # (time, number of versions, file size) of the recent samples, oldest first
+        with self._lock:
+            return list(self._history)
+
+    def open_transactions(self) -> List[OpenTransaction]:
+        if self._tracker is None:
+            return []
+        return self._tracker.open_transactions(self._path)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            last = self._history[-1] if self._history else (0.0, 0, 0)
+            first = self._history[0] if self._history else last
+        elapsed = last[0] - first[0]
+        transactions = self.open_transactions()
+        return {
+            "samples": self._samples,
+            "num_versions": last[1],
+            "max_num_versions": self._max_seen_versions,
+            "file_size": last[2],
+            "max_file_size": self._max_seen_file_size,
+            "file_growth_rate": (last[2] - first[2]) / elapsed if elapsed > 0 else 0.0,
+            "open_read_transactions": len(transactions),
+            "oldest_read_age": transactions[0].age if transactions else 0.0,
+            "alerts": self._alerts,
+            "refreshes": self._refreshes,
+            "refresh_failures": self._refresh_failures,
+        }
+
+    def start(self):
+        if self.running:
+            return
+        self._tracker = _install_tracker(self._stack_depth)
+        self._stop.clear()
+        # Open the monitor realm on the monitor thread and pass any error back to the caller
+        opened = threading.Event()
+        errors = []
+        self._thread = threading.Thread(target=self._run, args=(opened, errors), name="pyrealm-monitor", daemon=True)
+        self._thread.start()
+        opened.wait()
+        if errors:
+            self._thread = None
+            self._release_tracker()
+            raise errors[0]
+
+    def _run(self, opened: threading.Event, errors: List[BaseException]):
+        try:
+            self._realm = Realm(self._config)
+        except BaseException as e:
+            errors.append(e)
+            opened.set()
+            return
+        opened.set()
+        try:
+            while True:
+                self.sample()
+                if self._stop.wait(self._interval):
+                    break
+        finally:
+            self._realm.close()
+            self._realm = None
+
+    def sample(self) -> Tuple[float, int, int]:
+        # Take a sample and check the thresholds - called on the monitor thread
+        realm = self._realm
+        if realm is None:
+            raise RuntimeError("Version monitor is not running")
+        # The monitor realm must not pin an old version itself
+        realm.refresh()
+        num_versions = realm.num_versions
+        file_size = 0
+        if not self._config.in_memory:
+            try:
+                file_size = os.path.getsize(self._path)
+            except OSError:
+                pass
+        sample = (time.time(), num_versions, file_size)
+        with self._lock:
+            self._history.append(sample)
+            self._samples += 1
+            self._max_seen_versions = max(self._max_seen_versions, num_versions)
+            self._max_seen_file_size = max(self._max_seen_file_size, file_size)
+        self._check(num_versions, file_size)
+        return sample
+
+    def _check(self, num_versions: int, file_size: int):
+        transactions = self.open_transactions()
+        self._check_threshold(
+            "versions",
+            self._max_versions is not None and num_versions > self._max_versions,
+            f"Realm '{self._path}' has {num_versions} active versions (max {self._max_versions})",
+            num_versions, file_size, transactions
+        )
+        self._check_threshold(
+            "file_size",
+            self._max_file_size is not None and file_size > self._max_file_size,
+            f"Realm '{self._path}' file size is {file_size} bytes (max {self._max_file_size})",
+            num_versions, file_size, transactions
+        )
+        if self._max_read_age is not None:
+            stale = [x for x in transactions if x.age > self._max_read_age]
+            new_stale = [x for x in stale if not x.alerted]
+            for transaction in new_stale:
+                transaction.alerted = True
+            if new_stale:
+                self._alert(VersionAlert(
+                    "read_age",
+                    f"{len(new_stale)} read transaction(s) on realm '{self._path}' held for more than {self._max_read_age}s",
+                    num_versions, file_size, new_stale
+                ))
+            if self._auto_refresh:
+                for transaction in stale:
+                    self._refresh_holder(transaction)
+
+    def _check_threshold(
+        self, reason: str, crossed: bool, message: str, num_versions: int, file_size: int, transactions: List[OpenTransaction]
+    ):
+        # Alert once when the threshold is crossed, and again only after it has cleared
+        if not crossed:
+            self._active_alerts.discard(reason)
+            return
+        if reason in self._active_alerts:
+            return
+        self._active_alerts.add(reason)
+        self._alert(VersionAlert(reason, message, num_versions, file_size, transactions))
+        if self._auto_refresh:
+            for transaction in transactions:
+                self._refresh_holder(transaction)
+
+    def _alert(self, alert: VersionAlert):
+        self._alerts += 1
+        if self._on_alert is not None:
+            self._on_alert(alert)
+        else:
+            warnings.warn(str(alert), ResourceWarning, stacklevel=2)
+
+    def _refresh_holder(self, transaction: OpenTransaction):
+        # Move the realm holding the read transaction to the latest version on its own thread
+        scheduler = transaction.realm.config.scheduler
+        if scheduler is None:
+            self._refresh_failures += 1
+            return
+
+        def refresh():
+            realm = transaction.realm
+            if realm.closed or realm._transaction != Realm._TransactionType.READ:
+                return
+            realm.refresh()
+            transaction.opened = time.monotonic()
+            transaction.version = realm.transaction_version
+            transaction.refreshes += 1
+            transaction.alerted = False
+
+        self._refreshes += 1
+        scheduler._submit(refresh)
+
+    def _release_tracker(self):
+        if self._tracker is not None:
+            self._tracker = None
+            _uninstall_tracker()
+
+    def stop(self):
+        thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._stop.set()
+        if thread is not threading.current_thread():
+            thread.join()
+        self._release_tracker()
+
+    def __enter__(self) -> 'VersionMonitor':
+        self.start()
+        return self
+
+    def __exit__(self, _exc_type, _exc_value, _trace):
+        self.stop()
+
+    def __str__(self):
+        return f"VersionMonitor: '{self._path}'{' - running' if self.running else ''}"
+
+    def __repr__(self):
+        return f"<{str(self)}>"
@@ -0,0 +1,337 @@
+import ctypes
+import itertools
+import threading
+
+from bisect import bisect_left
+from typing import (Callable, Dict, Iterable, List, Optional, Tuple)
+
+from .error import throw_last_error
+from .scheduler import (RealmOnCollectionChangeFunc, RealmOnRealmChangeFunc, _free_userdata)
+
+# Default time window (seconds) used to coalesce bursts of change notifications
+DEFAULT_CHANGE_WINDOW = 0.05
+
+
+class RealmChanges():
+    # Change notification for a realm - `count` is the number of notifications coalesced into this
+    # one and `version` the transaction version of the last one
+    def __init__(self, version: Optional[Tuple[int, int]] = None, count: int = 1):
+        self.version = version
+        self.count = count
+
+    def merge(self, other: 'RealmChanges') -> 'RealmChanges':
+        return RealmChanges(other.version, self.count + other.count)
+
+    def __str__(self):
+        return f"RealmChanges: version {self.version} ({self.count} notification{'s' if self.count != 1 else ''})"
+
+    def __repr__(self):
+        return f"<{str(self)}>"
+
+
+class CollectionChanges():
+    # Change notification for results. Deletions are indices in the results before the changes,
+    # insertions and modifications are indices in the results after the changes. Moved objects are
+    # reported as a deletion and an insertion.
+    def __init__(
+        self,
+        deletions: Iterable[int] = (),
+        insertions: Iterable[int] = (),
+        modifications: Iterable[int] = (),
+        cleared: bool = False,
+        count: int = 1
+    ):
+        self.deletions: List[int] = sorted(set(deletions))
+        self.insertions: List[int] = sorted(set(insertions))
+        self.modifications: List[int] = sorted(set(modifications) - set(self.insertions))
+        self.cleared = cleared
+        self.count = count
+
+    @property
+    def empty(self) -> bool:
+        return not (self.deletions or self.insertions or self.modifications or self.cleared)
+
+    def _original_index(self, index: int) -> int:
+        # Map an index after these changes, which was not inserted, to its index before them
+        index -= bisect_left(self.insertions, index)
+        for deleted in self.deletions:
+            if deleted > index:
+                break
+            index += 1
+        return index
+
+    def _new_index(self, index: int) -> int:
+        # Map an index before these changes, which was not deleted, to its index after them
+        index -= bisect_left(self.deletions, index)
+        for inserted in self.insertions:
+            if inserted > index:
+                break
+            index += 1
+        return index
+
+    def merge(self, other: 'CollectionChanges') -> 'CollectionChanges':
+        # Combine with the changes that happened after these ones into a single set of changes
+        if other.cleared:
+            return CollectionChanges((), other.insertions, other.modifications, True, self.count + other.count)
+        inserted = set(self.insertions)
+        deleted = set(other.deletions)
+        deletions = set(self.deletions)
+        deletions.update(self._original_index(x) for x in other.deletions if x not in inserted)
+        insertions = {other._new_index(x) for x in self.insertions if x not in deleted}
+        insertions.update(other.insertions)
+        modifications = {other._new_index(x) for x in self.modifications if x not in deleted}
+        modifications.update(other.modifications)
+        return CollectionChanges(deletions, insertions, modifications, self.cleared, self.count + other.count)
+
+    def __eq__(self, other):
+        if not isinstance(other, CollectionChanges):
+            return NotImplemented
+        return (
+            self.deletions == other.deletions
+            and self.insertions == other.insertions
+            and self.modifications == other.modifications
+            and self.cleared == other.cleared
+        )
+
+    def __str__(self):
+        return (
+            f"CollectionChanges: deletions {self.deletions}, insertions {self.insertions}, "
+            f"modifications {self.modifications}{', cleared' if self.cleared else ''}"
+        )
+
+    def __repr__(self):
+        return f"<{str(self)}>"
+
+
+class _ChangeWindow():
+    # Coalesces the changes received within `window` seconds of the first one and passes the merged
+    # changes to the callback. If `submit` is set, the delayed delivery is run through it (e.g. on
+    # the realm thread via its scheduler), otherwise on a timer thread.
+    def __init__(self, callback: Callable, window: float, submit: Optional[Callable[[Callable[[], None]], None]]):
+        self._callback = callback
+        self._window = window
+        self._submit = submit
+        self._lock = threading.Lock()
+        self._pending = None
+        self._timer = None
+
+    @property
+    def pending(self):
+        return self._pending
+
+    def add(self, changes):
+        with self._lock:
+            self._pending = changes if self._pending is None else self._pending.merge(changes)
+            if self._window > 0:
+                if self._timer is None:
+                    self._timer = threading.Timer(self._window, self._expired)
+                    self._timer.daemon = True
+                    self._timer.start()
+                return
+        self.flush()
+
+    def _expired(self):
+        with self._lock:
+            self._timer = None
+        if self._submit is not None:
+            self._submit(self.flush)
+        else:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            changes, self._pending = self._pending, None
+            timer, self._timer = self._timer, None
+        if timer is not None:
+            timer.cancel()
+        if changes is not None:
+            self._callback(changes)
+
+    def cancel(self):
+        with self._lock:
+            self._pending = None
+            timer, self._timer = self._timer, None
+        if timer is not None:
+            timer.cancel()
+
+
+_token_ids = itertools.count(1)
+# Token id -> notification token, used to route the C callbacks back to the Python object
+_tokens: Dict[int, 'NotificationToken'] = {}
+_tokens_lock = threading.Lock()
+
+
+class NotificationToken():
+    # Registration of a change callback - the callback is removed with `cancel()` or when the realm
+    # or results it was registered on are closed
+    def __init__(
+        self,
+        lib,
+        window: _ChangeWindow,
+        on_cancel: Optional[Callable[['NotificationToken'], None]] = None,
+        realm: Optional['Realm'] = None
+    ):
+        self._lib = lib
+        self._realm = realm
+        self._window = window
+        self._on_cancel = on_cancel
+        self._token = None
+        self._id = next(_token_ids)
+        with _tokens_lock:
+            _tokens[self._id] = self
+
+    @property
+    def id(self) -> int:
+        return self._id
+
+    @property
+    def active(self) -> bool:
+        return self._token is not None
+
+    def _register(self, token: int) -> bool:
+        if not token:
+            self._unregister()
+            return False
+        self._token = token
+        return True
+
+    def _unregister(self):
+        with _tokens_lock:
+            _tokens.pop(self._id, None)
+
+    def _changed(self, changes):
+        self._window.add(changes)
+
+    def flush(self):
+        # Deliver the changes waiting for the coalescing window to end now
+        self._window.flush()
+
+    def cancel(self):
+        self._unregister()
+        self._window.cancel()
+        token, self._token = self._token, None
+        if token:
+            self._lib.realm_release(token)
+            if self._on_cancel is not None:
+                self._on_cancel(self)
+
+    def __enter__(self) -> 'NotificationToken':
+        return self
+
+    def __exit__(self, _exc_type, _exc_value, _trace):
+        self.cancel()
+
+    def __str__(self):
+        return f"NotificationToken: {self._id}{'' if self.active else ' - cancelled'}"
+
+    def __repr__(self):
+        return f"<{str(self)}>"
+
+
+def _read_indices(lib, changes: int, counts: Tuple[int, int, int]) -> Tuple[List[int], List[int], List[int]]:
+    num_deletions, num_insertions, num_modifications = counts
+    deletions = (ctypes.c_size_t * num_deletions)()
+    insertions = (ctypes.c_size_t * num_insertions)()
+    modifications = (ctypes.c_size_t * num_modifications)()
+    modifications_after = (ctypes.c_size_t * num_modifications)()
+    lib.realm_collection_changes_get_changes(
+        changes,
+        deletions, num_deletions,
+        insertions, num_insertions,
+        modifications, num_modifications,
+        modifications_after, num_modifications,
+        None, 0
+    )
+    return list(deletions), list(insertions), list(modifications_after)
+
+
+def read_collection_changes(lib, changes: int) -> CollectionChanges:
+    # Copy a `realm_collection_changes_t` - it is only valid during the callback
+    num_deletions = ctypes.c_size_t()
+    num_insertions = ctypes.c_size_t()
+    num_modifications = ctypes.c_size_t()
+    num_moves = ctypes.c_size_t()
+    cleared = ctypes.c_bool()
+    lib.realm_collection_changes_get_num_changes(
+        changes,
+        ctypes.byref(num_deletions),
+        ctypes.byref(num_insertions),
+        ctypes.byref(num_modifications),
+        ctypes.byref(num_moves),
+        ctypes.byref(cleared)
+    )
+    deletions, insertions, modifications = _read_indices(
+        lib, changes, (num_deletions.value, num_insertions.value, num_modifications.value)
+    )
+    return CollectionChanges(deletions, insertions, modifications, cleared.value)
+
+
+@RealmOnRealmChangeFunc
+def _on_realm_change(userdata):
+    token = _tokens.get(userdata)
+    if token is not None:
+        token._changed(RealmChanges(token._realm.transaction_version))
+
+
+@RealmOnCollectionChangeFunc
+def _on_collection_change(userdata, changes):
+    token = _tokens.get(userdata)
+    if token is not None and changes:
+        token._changed(read_collection_changes(token._lib, changes))
+
+
+def check_notifications_supported(lib, config: 'RealmConfig', *functions: str):
+    if not all(lib.has_function(x) for x in functions):
+        raise RuntimeError("The realm library does not support change notifications")
+    if not config.automatic_change_notifications:
+        raise RuntimeError("Change notifications are disabled by the realm config (automatic_change_notifications)")
+
+
+def _config_submit(config: 'RealmConfig') -> Optional[Callable[[Callable[[], None]], None]]:
+    scheduler = config.scheduler
+    return scheduler._submit if scheduler is not None else None
+
+
+def add_realm_callback(
+    realm: 'Realm',
+    callback: Callable[[RealmChanges], None],
+    window: float,
+    on_cancel: Optional[Callable] = None
+) -> NotificationToken:
+    lib = realm._lib
+    check_notifications_supported(lib, realm.config, "realm_add_realm_changed_callback")
+    token = NotificationToken(lib, _ChangeWindow(callback, window, _config_submit(realm.config)), on_cancel, realm)
+    try:
+        handle = lib.realm_add_realm_changed_callback(realm._handle(), _on_realm_change, token.id, _free_userdata)
+    except BaseException:
+        token._unregister()
+        raise
+    if not token._register(handle):
+        throw_last_error("Error adding realm change callback")
+    return token
+
+
+def add_results_callback(
+    results: 'Results',
+    callback: Callable[[CollectionChanges], None],
+    window: float,
+    on_cancel: Optional[Callable] = None
+) -> NotificationToken:
+    lib = results._lib
+    check_notifications_supported(
+        lib, results.realm.config,
+        "realm_results_add_notification_callback",
+        "realm_collection_changes_get_num_changes",
+        "realm_collection_changes_get_changes"
+    )
+    token = NotificationToken(lib, _ChangeWindow(callback, window, _config_submit(results.realm.config)), on_cancel)
+    try:
+        handle = lib.realm_results_add_notification_callback(
+            results._handle(), token.id, _free_userdata, None, _on_collection_change
+        )
+    except BaseException:
+        token._unregister()
+        raise
+    if not token._register(handle):
+        throw_last_error(f"Error adding change callback for results of class '{results.class_name}'")
+    return token
@@ -0,0 +1,266 @@
+import threading
+import time
+
+from typing import (Dict, List, Optional, Tuple)
+
+from .config import RealmConfig
+from .realm import Realm
+
+
+class _ThreadRealms():
+    # Realms owned by a single thread - only that thread touches the realms themselves
+    def __init__(self, thread: threading.Thread):
+        self.thread = thread
+        # Idle realms and when they were released, the most recently used last
+        self.idle: List[Tuple[Realm, float]] = []
+        self.in_use: Dict[int, Realm] = {}
+
+
+class RealmPoolCheckout():
+    # Class to return the realm to the pool when used in a context (e.g. `with pool.checkout() as realm:`)
+    def __init__(self, pool: 'RealmPool'):
+        self._pool = pool
+        self._realm = None
+
+    def __enter__(self) -> Realm:
+        self._realm = self._pool.acquire()
+        return self._realm
+
+    def __exit__(self, _exc_type, _exc_value, _trace):
+        realm, self._realm = self._realm, None
+        if realm is not None:
+            self._pool.release(realm)
+
+
+class RealmPool():
+    # Cache of open realms for a config. Realm handles are confined to the thread that opened them,
+    # so every thread gets its own realms: up to `max_per_thread` idle realms are kept open per
+    # thread and refreshed when they are checked out again. Realms that stay idle for longer than
+    # `idle_timeout` seconds are closed by their thread on its next checkout or release.
+
+    DEFAULT_MAX_PER_THREAD = 1
+    DEFAULT_IDLE_TIMEOUT = 60.0
+
+    def __init__(
+        self,
+        config: RealmConfig,
+        max_per_thread: int = DEFAULT_MAX_PER_THREAD,
+        idle_timeout: Optional[float] = DEFAULT_IDLE_TIMEOUT
+    ):
+        if config is None:
+            raise ValueError("config cannot be None")
+        if max_per_thread < 0:
+            raise ValueError(f"Max realms per thread cannot be negative - got {max_per_thread}")
+        if idle_timeout is not None and idle_timeout < 0:
+            raise ValueError(f"Idle timeout cannot be negative - got {idle_timeout}")
+        self._config = config
+        self._max_per_thread = max_per_thread
+        self._idle_timeout = idle_timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._threads: Dict[int, _ThreadRealms] = {}
+        self._closed = False
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._opens = 0
+        self._open_time = 0.0
+        self._max_open_time = 0.0
+
+    @property
+    def config(self) -> RealmConfig:
+        return self._config
+
+    @property
+    def max_per_thread(self) -> int:
+        return self._max_per_thread
+
+    @property
+    def idle_timeout(self) -> Optional[float]:
+        return self._idle_timeout
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    @property
+    def hit_rate(self) -> float:
+        total = self._hits + self._misses
+        return self._hits / total if total else 0.0
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            idle = sum(len(x.idle) for x in self._threads.values())
+            in_use = sum(len(x.in_use) for x in self._threads.values())
+            return {
+                "threads": len(self._threads),
+                "idle": idle,
+                "in_use": in_use,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self.hit_rate,
+                "evictions": self._evictions,
+                "opens": self._opens,
+                "open_time_avg": self._open_time / self._opens if self._opens else 0.0,
+                "open_time_max": self._max_open_time,
+            }
+
+    def _thread_realms(self) -> _ThreadRealms:
+        realms = getattr(self._local, "realms", None)
+        if realms is None:
+            thread = threading.current_thread()
+            realms = _ThreadRealms(thread)
+            with self._lock:
+                # Thread idents are reused, so take out the finished threads before registering this one
+                finished = self._take_finished()
+                self._threads[thread.ident] = realms
+            self._local.realms = realms
+            self._close_finished(finished)
+        return realms
+
+    def _take_finished(self) -> List[_ThreadRealms]:
+        # Remove the threads that have exited from the pool - the caller holds the lock
+        finished = [x for x in self._threads.values() if not x.thread.is_alive()]
+        for x in finished:
+            del self._threads[x.thread.ident]
+        return finished
+
+    def _close_finished(self, finished: List[_ThreadRealms]):
+        # Close the realms left behind by threads that have exited - a realm failing to close
+        # doesn't stop the others from being closed
+        evicted = 0
+        for realms in finished:
+            while realms.idle:
+                realm, _ = realms.idle.pop()
+                evicted += 1
+                try:
+                    self._close_realm(realm)
+                except Exception:
+                    pass
+        if evicted:
+            with self._lock:
+                self._evictions += evicted
+
+    def _prune_finished(self):
+        with self._lock:
+            finished = self._take_finished()
+        self._close_finished(finished)
+
+    def _open(self) -> Realm:
+        start = time.perf_counter()
+        realm = Realm(self._config)
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._misses += 1
+            self._opens += 1
+            self._open_time += elapsed
+            self._max_open_time = max(self._max_open_time, elapsed)
+        return realm
+
+    def _close_realm(self, realm: Realm):
+        if not realm.closed:
+            realm.close()
+
+    def _evict(self, realms: _ThreadRealms, keep: int, older_than: Optional[float] = None) -> int:
+        # Close the least recently used idle realms beyond `keep` and the ones released before `older_than`
+        evicted = 0
+        while realms.idle and (len(realms.idle) > keep or (older_than is not None and realms.idle[0][1] < older_than)):
+            realm, _ = realms.idle.pop(0)
+            evicted += 1
+            self._close_realm(realm)
+        if evicted:
+            with self._lock:
+                self._evictions += evicted
+        return evicted
+
+    def _evict_expired(self, realms: _ThreadRealms, now: float) -> int:
+        older_than = now - self._idle_timeout if self._idle_timeout is not None else None
+        return self._evict(realms, self._max_per_thread, older_than)
+
+    def _check_closed(self, realms: _ThreadRealms):
+        if self._closed:
+            self._evict(realms, 0)
+            raise RuntimeError("Realm pool is closed")
+
+    def acquire(self) -> Realm:
+        # Check out an open realm for the calling thread - it must be returned with `release()`
+        realms = self._thread_realms()
+        self._check_closed(realms)
+        self._evict_expired(realms, time.monotonic())
+        realm = None
+        while realms.idle:
+            candidate, _ = realms.idle.pop()
+            if candidate.closed:
+                # Closed outside of the pool
+                self._close_realm(candidate)
+                continue
+            try:
+                candidate.refresh()
+            except Exception:
+                # Don't hand out a realm that can't be brought up to date - it is no longer in
+                # the idle list, so close it here rather than leaking it
+                try:
+                    self._close_realm(candidate)
+                except Exception:
+                    pass
+                continue
+            realm = candidate
+            with self._lock:
+                self._hits += 1
+            break
+        if realm is None:
+            realm = self._open()
+        realms.in_use[id(realm)] = realm
+        return realm
+
+    def release(self, realm: Realm):
+        realms = self._thread_realms()
+        if realms.in_use.pop(id(realm), None) is None:
+            raise ValueError("Realm was not checked out from this pool by the current thread")
+        if realm.closed:
+            self._close_realm(realm)
+            return
+        if realm._transaction != Realm._TransactionType.NONE:
+            # Don't hand out a realm with a transaction left open
+            realm.rollback()
+        if self._closed:
+            self._close_realm(realm)
+            self._evict(realms, 0)
+            return
+        now = time.monotonic()
+        realms.idle.append((realm, now))
+        self._evict_expired(realms, now)
+
+    def checkout(self) -> RealmPoolCheckout:
+        return RealmPoolCheckout(self)
+
+    def evict_idle(self) -> int:
+        # Close the idle realms of the calling thread - returns the number of realms closed
+        return self._evict(self._thread_realms(), 0)
+
+    def close(self):
+        # Close the idle realms of the calling thread and of the threads that have exited. Other
+        # threads close their realms the next time they use the pool.
+        self._closed = True
+        self.evict_idle()
+        self._prune_finished()
+
+    def __enter__(self) -> 'RealmPool':
+        return self
+
+    def __exit__(self, _exc_type, _exc_value, _trace):
+        self.close()
+
+    def __str__(self):
+        return f"RealmPool: '{self._config.path}' - hits: {self._hits}, misses: {self._misses}"
+
+    def __repr__(self):
+        return f"<{str(self)}>"
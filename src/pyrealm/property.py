@@ -1,9 +1,19 @@
 import ctypes
+import uuid
 
 from abc import ABC
 from collections import OrderedDict
+from datetime import (date, datetime, timedelta, timezone)
+from decimal import Decimal
 from enum import (IntEnum, IntFlag)
-from typing import (Any, Dict, List, Type, Union)
+from typing import (Any, Callable, Dict, Iterable, List, Type, Union)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
 
 class RealmPropertyFlags(IntFlag):
     RLM_PROPERTY_NORMAL = 0
@@ -48,6 +58,12 @@ class RealmPropertyInfo(ctypes.Structure):
     ]
 
 
+def _decode_name(value: Union[bytes, str, None]) -> str:
+    if isinstance(value, bytes):
+        return value.decode('utf-8')
+    return value if value else ""
+
+
 class PropertyValue():
     def __init__(self, prop: 'PropertyType', value: Any = None):
         if not issubclass(type(prop), PropertyType):
@@ -55,7 +71,7 @@ class PropertyValue():
         self._value = None
         self._property = prop
         if value is not None:
-            self.value
+            self.value = value
 
     @property
     def name(self):
@@ -71,8 +87,11 @@ class PropertyValue():
 
     @value.setter
     def value(self, value: Any):
-        if value is None and not self.is_nullable:
-            raise ValueError(f"Property '{self.name}' is not nullable")
+        # NumPy's NaT is the missing timestamp and is stored as null
+        if value is None or _is_nat(value):
+            if not self.is_nullable:
+                raise ValueError(f"Property '{self.name}' is not nullable")
+            self._value = None
         else:
             self._value = PropertyType.convert_value(self.rtype, value)
 
@@ -169,99 +188,121 @@ class PropertyType(ABC):
         return prop_info
 
     @classmethod
-    def new_from_property_info(cls, prop_info: RealmPropertyInfo):
+    def new_from_property_info(cls, prop_info: RealmPropertyInfo) -> Union['PropertyType', 'PropertyWrapper']:
         prop_class = cls._get_property_class(prop_info.type)
         prop_obj = None
-        if prop_class is None:
-            raise ValueError(f"Property type {prop_info.type} is unknown or not supported")
+        public_name = _decode_name(prop_info.public_name)
         if prop_info.type == RealmPropertyType.RLM_PROPERTY_TYPE_LINKING_OBJECTS:
             prop_obj = prop_class(
-                link_class=prop_info.link_target,
-                link_property=prop_info.link_origin_property_name,
-                public_name=prop_info.public_name)
+                link_class=_decode_name(prop_info.link_target),
+                link_property=_decode_name(prop_info.link_origin_property_name),
+                public_name=public_name)
         else:
-            prop_obj = prop_class(public_name=prop_info.public_name)
-        prop_obj.set_name(prop_info.name)
+            prop_obj = prop_class(public_name=public_name)
+            prop_obj._link_target = _decode_name(prop_info.link_target)
+        prop_obj._set_name(_decode_name(prop_info.name))
         prop_obj._key = prop_info.key
-        prop_obj._flags = RealmPropertyFlags(prop_info.flags)
-        prop_obj._collection_type = RealmCollectionType(prop_info.collection_type)
-        if (prop_obj._flags & RealmPropertyFlags.RLM_PROPERTY_NULLABLE):
+        flags = RealmPropertyFlags(prop_info.flags)
+        # The wrappers set the nullable/primary key flags and collection type on the property
+        if flags & RealmPropertyFlags.RLM_PROPERTY_INDEXED:
+            prop_obj._flags = RealmPropertyFlags.RLM_PROPERTY_INDEXED
+        else:
+            prop_obj._flags = RealmPropertyFlags.RLM_PROPERTY_NORMAL
+        if flags & RealmPropertyFlags.RLM_PROPERTY_NULLABLE:
             prop_obj = Nullable(prop_obj)
-        prop_obj = cls._wrap_collection_type(prop_obj)
-        if (prop_obj._flags & RealmPropertyFlags.RLM_PROPERTY_PRIMARY_KEY):
+        prop_obj = cls._wrap_collection_type(prop_obj, RealmCollectionType(prop_info.collection_type))
+        if flags & RealmPropertyFlags.RLM_PROPERTY_PRIMARY_KEY:
             prop_obj = PrimaryKey(prop_obj)
 
         return prop_obj
 
     @classmethod
     def _get_property_class(cls, rtype: RealmPropertyType) -> Type['PropertyType']:
-        if rtype == RealmPropertyType.RLM_PROPERTY_TYPE_INT:
-            return RealmInt
-        elif rtype == RealmPropertyType.RLM_PROPERTY_TYPE_BOOL:
-            return RealmBool
-        elif rtype == RealmPropertyType.RLM_PROPERTY_TYPE_STRING:
-            return RealmString
-        elif rtype == RealmPropertyType.RLM_PROPERTY_TYPE_BINARY:
-            return RealmBinary
-        elif rtype == RealmPropertyType.RLM_PROPERTY_TYPE_MIXED:
-            return RealmMixed
-        elif rtype == RealmPropertyType.RLM_PROPERTY_TYPE_TIMESTAMP:
-            return RealmTimestamp
-        elif rtype == RealmPropertyType.RLM_PROPERTY_TYPE_FLOAT:
-            return RealmFloat
-        elif rtype == RealmPropertyType.RLM_PROPERTY_TYPE_DOUBLE:
-            return RealmDouble
-        elif rtype == RealmPropertyType.RLM_PROPERTY_TYPE_DECIMAL128:
-            return RealmDecimal128
-        elif rtype == RealmPropertyType.RLM_PROPERTY_TYPE_OBJECT:
-            return RealmObject
-        elif rtype == RealmPropertyType.RLM_PROPERTY_TYPE_LINKING_OBJECTS:
-            return RealmLinkingObject
-        elif rtype == RealmPropertyType.RLM_PROPERTY_TYPE_OBJECT_ID:
-            return RealmObjectID
-        elif rtype == RealmPropertyType.RLM_PROPERTY_TYPE_UUID:
-            return RealmUUID
-        else:
+        prop_class = _PROPERTY_CLASSES.get(rtype)
+        if prop_class is None:
             raise ValueError(f"Property type '{rtype}' is invalid")
+        return prop_class
 
     @classmethod
-    def _wrap_collection_type(cls, prop: 'PropertyType') -> 'PropertyType':
-        if prop.collection_type == RealmCollectionType.RLM_COLLECTION_TYPE_NONE:
+    def _wrap_collection_type(
+        cls,
+        prop: Union['PropertyType', 'PropertyWrapper'],
+        collection_type: RealmCollectionType
+    ) -> Union['PropertyType', 'PropertyWrapper']:
+        if collection_type == RealmCollectionType.RLM_COLLECTION_TYPE_NONE:
             return prop
-        elif prop.collection_type == RealmCollectionType.RLM_COLLECTION_TYPE_LIST:
-            return RealmList(prop)
-        elif prop.collection_type == RealmCollectionType.RLM_COLLECTION_TYPE_SET:
-            return RealmSet(prop)
-        elif prop.collection_type == RealmCollectionType.RLM_COLLECTION_TYPE_DICTIONARY:
-            return RealmDictionary(prop)
-        else:
-            raise ValueError(f"Property collection type '{prop.collection_type}' is invalid")
+        wrapper = _COLLECTION_WRAPPERS.get(collection_type)
+        if wrapper is None:
+            raise ValueError(f"Property collection type '{collection_type}' is invalid")
+        return wrapper(prop)
+
+    @classmethod
+    def get_converter(cls, rtype: RealmPropertyType) -> Callable[[Any], Any]:
+        # The function that converts a (non None) Python value for a property of type `rtype`
+        converter = _CONVERTERS.get(rtype)
+        if converter is None:
+            raise TypeError(f"Property type {RealmPropertyType(rtype).name} is not supported")
+        return converter
 
     @classmethod
     def convert_value(cls, rtype: RealmPropertyType, value: Any):
-        raise_type_error = False
-        if rtype == RealmPropertyType.RLM_PROPERTY_TYPE_INT:
-            return cls._convert_int_value(value)
-        elif rtype == RealmPropertyType.RLM_PROPERTY_TYPE_BOOL:
-            return cls._convert_bool_value(value)
-        elif rtype == RealmPropertyType.RLM_PROPERTY_TYPE_STRING:
-            return cls._convert_string_value(value)
-        elif rtype == RealmPropertyType.RLM_PROPERTY_TYPE_BINARY:
-            return cls._convert_binary_value(value)
-        elif rtype == RealmPropertyType.RLM_PROPERTY_TYPE_FLOAT or \
-            rtype == RealmPropertyType.RLM_PROPERTY_TYPE_DOUBLE:
-            return cls._convert_float_value(value)
-        elif rtype == RealmPropertyType.RLM_PROPERTY_TYPE_MIXED:
-            return value
-        else:
-            raise TypeError(f"Property type {rtype.name} is not supported")
+        return cls.get_converter(rtype)(value)
+
+    @classmethod
+    def convert_many(cls, rtype: RealmPropertyType, values: Iterable[Any]) -> Union[List[Any], 'np.ndarray']:
+        # Convert a whole column of values - None values are kept. NumPy arrays of numeric and
+        # timestamp values are converted with a single cast and an array is returned.
+        if np is not None and isinstance(values, np.ndarray):
+            converted = cls._convert_array(rtype, values)
+            if converted is not None:
+                return converted
+        converter = cls.get_converter(rtype)
+        if rtype == RealmPropertyType.RLM_PROPERTY_TYPE_TIMESTAMP:
+            return [None if x is None or _is_nat(x) else converter(x) for x in values]
+        return [None if x is None else converter(x) for x in values]
+
+    @classmethod
+    def _convert_array(cls, rtype: RealmPropertyType, values: 'np.ndarray') -> 'np.ndarray':
+        allowed = _ARRAY_KINDS.get(rtype)
+        if allowed is None or values.dtype.kind == 'O':
+            # Object arrays and non numeric types are converted value by value
+            return None
+        if values.dtype.kind not in allowed:
+            raise TypeError(f"expected {_ARRAY_DTYPES[rtype]} values but got {values.dtype}")
+        if values.dtype.kind == 'M' and np.isnat(values).any():
+            # NaT values are stored as null, which an array of timestamps can't hold
+            return None
+        if rtype == RealmPropertyType.RLM_PROPERTY_TYPE_INT and values.dtype == np.uint64 and values.size:
+            if values.max() > _INT64_MAX:
+                raise OverflowError(f"uint64 value {values.max()} does not fit in an int property")
+        if rtype == RealmPropertyType.RLM_PROPERTY_TYPE_BOOL and values.dtype.kind != 'b':
+            return values != 0
+        with np.errstate(over='ignore', invalid='ignore'):
+            converted = values.astype(_ARRAY_DTYPES[rtype], copy=False)
+        if converted is values:
+            return converted
+        if values.dtype.kind == 'M':
+            # Nanoseconds only cover the years 1678 to 2262 and the cast wraps outside of them -
+            # the timestamps that don't convert back are converted value by value
+            if (converted.astype(values.dtype) != values).any():
+                return None
+        elif converted.dtype.kind == 'f':
+            overflow = np.isinf(converted) & np.isfinite(values)
+            if overflow.any():
+                raise OverflowError(f"value {values[overflow][0]} does not fit in a {converted.dtype} property")
+        return converted
 
     @classmethod
     def _convert_int_value(cls, value: Any):
         if isinstance(value, int):
-            return value
+            result = value
+        elif np is not None and isinstance(value, np.integer):
+            result = int(value)
         else:
             raise TypeError(f"expected int but got {type(value)}")
+        if not _INT64_MIN <= result <= _INT64_MAX:
+            raise OverflowError(f"int value {result} does not fit in 64 bits")
+        return result
 
     @classmethod
     def _convert_bool_value(cls, value: Any):
@@ -271,6 +312,8 @@ class PropertyType(ABC):
             return value.lower() in ['true', 't', 'yes', 'y']
         elif isinstance(value, int):
             return value != 0
+        elif np is not None and isinstance(value, (np.bool_, np.integer)):
+            return bool(value)
         else:
             raise TypeError(f"expected bool but got {type(value)}")
 
@@ -287,6 +330,8 @@ class PropertyType(ABC):
     def _convert_binary_value(cls, value: Any):
         if isinstance(value, bytes):
             return value
+        elif isinstance(value, (bytearray, memoryview)):
+            return bytes(value)
         else:
             raise TypeError(f"expected bytes but got {type(value)}")
 
@@ -296,8 +341,66 @@ class PropertyType(ABC):
             return value
         elif isinstance(value, int):
             return float(value)
+        elif np is not None and isinstance(value, (np.floating, np.integer)):
+            return float(value)
         else:
-            raise TypeError(f"expected bytes but got {type(value)}")
+            raise TypeError(f"expected float but got {type(value)}")
+
+    @classmethod
+    def _convert_timestamp_value(cls, value: Any):
+        # Naive datetime values are treated as UTC when written
+        if isinstance(value, datetime):
+            return value
+        elif isinstance(value, date):
+            return datetime(value.year, value.month, value.day, tzinfo=timezone.utc)
+        elif isinstance(value, str):
+            return datetime.fromisoformat(value)
+        elif np is not None and isinstance(value, np.datetime64):
+            if np.isnat(value):
+                raise ValueError("NaT is not a valid timestamp - use None for a missing value")
+            microseconds = int(value.astype('datetime64[us]').astype(np.int64))
+            return _EPOCH + timedelta(microseconds=microseconds)
+        else:
+            raise TypeError(f"expected datetime but got {type(value)}")
+
+    @classmethod
+    def _convert_decimal128_value(cls, value: Any):
+        if isinstance(value, Decimal):
+            return value
+        elif isinstance(value, (int, str)) and not isinstance(value, bool):
+            return Decimal(value)
+        elif isinstance(value, float):
+            # Use the shortest representation rather than the exact binary value
+            return Decimal(repr(value))
+        else:
+            raise TypeError(f"expected Decimal but got {type(value)}")
+
+    @classmethod
+    def _convert_object_id_value(cls, value: Any):
+        # Object IDs are 12 bytes - a 24 character hex string is also accepted
+        if isinstance(value, str):
+            try:
+                value = bytes.fromhex(value)
+            except ValueError:
+                raise ValueError(f"Invalid object ID: '{value}'") from None
+        elif isinstance(value, (bytearray, memoryview)):
+            value = bytes(value)
+        elif not isinstance(value, bytes):
+            raise TypeError(f"expected object ID bytes but got {type(value)}")
+        if len(value) != 12:
+            raise ValueError(f"Object ID must be 12 bytes - got {len(value)}")
+        return value
+
+    @classmethod
+    def _convert_uuid_value(cls, value: Any):
+        if isinstance(value, uuid.UUID):
+            return value
+        elif isinstance(value, str):
+            return uuid.UUID(value)
+        elif isinstance(value, (bytes, bytearray)):
+            return uuid.UUID(bytes=bytes(value))
+        else:
+            raise TypeError(f"expected UUID but got {type(value)}")
 
 
 class PropertyWrapper(ABC):
@@ -339,8 +442,12 @@ class PropertyWrapper(ABC):
     def is_primary_key(self):
         return self._property.is_primary_key
 
+    @property
+    def collection_type(self):
+        return self._property.collection_type
+
     def _set_name(self, new_name: str):
-        self._property.set_name(new_name)
+        self._property._set_name(new_name)
 
     def describe(self):
         return self._property.describe()
@@ -385,10 +492,10 @@ class RealmList(PropertyWrapper):
 class RealmDictionary(PropertyWrapper):
     def __init__(self, prop: Union[PropertyType, 'PropertyWrapper']):
         super().__init__(prop)
-        if self._collection_type != RealmCollectionType.RLM_COLLECTION_TYPE_NONE:
+        if self._property._collection_type != RealmCollectionType.RLM_COLLECTION_TYPE_NONE:
             raise ValueError("Property collection types cannot be combined")
         else:
-            self._collection_type = RealmCollectionType.RLM_COLLECTION_TYPE_DICTIONARY
+            self._property._collection_type = RealmCollectionType.RLM_COLLECTION_TYPE_DICTIONARY
 
 
 class RealmInt(PropertyType):
@@ -472,3 +579,66 @@ class RealmUUID(PropertyType):
     def __init__(self, public_name: str = ""):
         # name will be set later
         super().__init__(public_name=public_name, rtype=RealmPropertyType.RLM_PROPERTY_TYPE_UUID)
+
+
+# Dispatch tables used instead of comparing the property type against every enum value
+_PROPERTY_CLASSES: Dict[RealmPropertyType, Type[PropertyType]] = {
+    RealmPropertyType.RLM_PROPERTY_TYPE_INT: RealmInt,
+    RealmPropertyType.RLM_PROPERTY_TYPE_BOOL: RealmBool,
+    RealmPropertyType.RLM_PROPERTY_TYPE_STRING: RealmString,
+    RealmPropertyType.RLM_PROPERTY_TYPE_BINARY: RealmBinary,
+    RealmPropertyType.RLM_PROPERTY_TYPE_MIXED: RealmMixed,
+    RealmPropertyType.RLM_PROPERTY_TYPE_TIMESTAMP: RealmTimestamp,
+    RealmPropertyType.RLM_PROPERTY_TYPE_FLOAT: RealmFloat,
+    RealmPropertyType.RLM_PROPERTY_TYPE_DOUBLE: RealmDouble,
+    RealmPropertyType.RLM_PROPERTY_TYPE_DECIMAL128: RealmDecimal128,
+    RealmPropertyType.RLM_PROPERTY_TYPE_OBJECT: RealmObject,
+    RealmPropertyType.RLM_PROPERTY_TYPE_LINKING_OBJECTS: RealmLinkingObject,
+    RealmPropertyType.RLM_PROPERTY_TYPE_OBJECT_ID: RealmObjectID,
+    RealmPropertyType.RLM_PROPERTY_TYPE_UUID: RealmUUID,
+}
+
+_COLLECTION_WRAPPERS: Dict[RealmCollectionType, Type[PropertyWrapper]] = {
+    RealmCollectionType.RLM_COLLECTION_TYPE_LIST: RealmList,
+    RealmCollectionType.RLM_COLLECTION_TYPE_SET: RealmSet,
+    RealmCollectionType.RLM_COLLECTION_TYPE_DICTIONARY: RealmDictionary,
+}
+
+_CONVERTERS: Dict[RealmPropertyType, Callable[[Any], Any]] = {
+    RealmPropertyType.RLM_PROPERTY_TYPE_INT: PropertyType._convert_int_value,
+    RealmPropertyType.RLM_PROPERTY_TYPE_BOOL: PropertyType._convert_bool_value,
+    RealmPropertyType.RLM_PROPERTY_TYPE_STRING: PropertyType._convert_str_value,
+    RealmPropertyType.RLM_PROPERTY_TYPE_BINARY: PropertyType._convert_binary_value,
+    RealmPropertyType.RLM_PROPERTY_TYPE_MIXED: lambda value: value,
+    RealmPropertyType.RLM_PROPERTY_TYPE_TIMESTAMP: PropertyType._convert_timestamp_value,
+    RealmPropertyType.RLM_PROPERTY_TYPE_FLOAT: PropertyType._convert_float_value,
+    RealmPropertyType.RLM_PROPERTY_TYPE_DOUBLE: PropertyType._convert_float_value,
+    RealmPropertyType.RLM_PROPERTY_TYPE_DECIMAL128: PropertyType._convert_decimal128_value,
+    RealmPropertyType.RLM_PROPERTY_TYPE_OBJECT_ID: PropertyType._convert_object_id_value,
+    RealmPropertyType.RLM_PROPERTY_TYPE_UUID: PropertyType._convert_uuid_value,
+}
+
+_INT64_MIN = -2 ** 63
+_INT64_MAX = 2 ** 63 - 1
+
+
+def _is_nat(value: Any) -> bool:
+    return np is not None and isinstance(value, np.datetime64) and np.isnat(value)
+
+
+# NumPy array dtype kinds accepted by `PropertyType.convert_many` and the resulting dtype
+_ARRAY_KINDS: Dict[RealmPropertyType, str] = {
+    RealmPropertyType.RLM_PROPERTY_TYPE_INT: "iu",
+    RealmPropertyType.RLM_PROPERTY_TYPE_BOOL: "biu",
+    RealmPropertyType.RLM_PROPERTY_TYPE_FLOAT: "iuf",
+    RealmPropertyType.RLM_PROPERTY_TYPE_DOUBLE: "iuf",
+    RealmPropertyType.RLM_PROPERTY_TYPE_TIMESTAMP: "M",
+}
+
+_ARRAY_DTYPES: Dict[RealmPropertyType, str] = {
+    RealmPropertyType.RLM_PROPERTY_TYPE_INT: "int64",
+    RealmPropertyType.RLM_PROPERTY_TYPE_BOOL: "bool",
+    RealmPropertyType.RLM_PROPERTY_TYPE_FLOAT: "float32",
+    RealmPropertyType.RLM_PROPERTY_TYPE_DOUBLE: "float64",
+    RealmPropertyType.RLM_PROPERTY_TYPE_TIMESTAMP: "datetime64[ns]",
+}
@@ -0,0 +1,144 @@
+from collections import OrderedDict
+from typing import (Any, Dict, Hashable, Optional, Sequence, Tuple)
+
+from . import handles
+from .error import throw_last_error
+from .value import make_query_args
+
+
+def _freeze_arg(arg: Any) -> Hashable:
+    if isinstance(arg, (list, tuple)):
+        return tuple(_freeze_arg(x) for x in arg)
+    elif isinstance(arg, set):
+        return frozenset(arg)
+    # Keep the type in the key so 1, 1.0 and True are cached separately
+    return (type(arg), arg)
+
+
+class QueryCache():
+    # Bounded LRU cache of parsed native `realm_query_t` objects for a single realm.
+    # Every entry is dropped when the schema version changes.
+    #
+    # The realm C API binds the query arguments when the query is parsed and cannot rebind them,
+    # so the argument values are part of the cache key: only calls repeating both the query string
+    # and the argument values hit the cache. A predicate run with ever-changing arguments (e.g. an
+    # id lookup) is parsed on every call. To keep such predicates from evicting the rest of the
+    # cache, at most `max_variants` argument sets are cached per query string - the other calls
+    # parse a query that is released after use.
+
+    DEFAULT_MAX_SIZE = 128
+    DEFAULT_MAX_VARIANTS = 8
+
+    def __init__(self, lib, realm, max_size: int = DEFAULT_MAX_SIZE, max_variants: int = DEFAULT_MAX_VARIANTS):
+        if max_size < 0:
+            raise ValueError(f"Query cache size cannot be negative - got {max_size}")
+        if max_variants < 1:
+            raise ValueError(f"Max variants must be greater than 0 - got {max_variants}")
+        self._lib = lib
+        self._realm = realm
+        self._max_size = max_size
+        self._max_variants = max_variants
+        self._queries: 'OrderedDict[Tuple, int]' = OrderedDict()
+        # (class key, query string) -> number of cached argument sets
+        self._variants: Dict[Tuple[int, str], int] = {}
+        self._uncached = 0
+        self._schema_version = None
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    @property
+    def max_size(self) -> int:
+        return self._max_size
+
+    @property
+    def max_variants(self) -> int:
+        return self._max_variants
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    def __len__(self) -> int:
+        return len(self._queries)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._queries),
+            "max_size": self._max_size,
+            "hits": self._hits,
+            "misses": self._misses,
+            "uncached": self._uncached,
+            "evictions": self._evictions,
+            "invalidations": self._invalidations,
+        }
+
+    def _parse(self, class_key: int, query_string: str, args: Sequence[Any]) -> int:
+        query_args, _keepalive = make_query_args(args)
+        query = self._lib.realm_query_parse(
+            self._realm, class_key, query_string.encode('utf-8'), len(args), query_args
+        )
+        if not query:
+            throw_last_error(f"Error parsing query '{query_string}'")
+        handles.track("query", query)
+        return query
+
+    def get_query(self, class_key: int, query_string: str, args: Sequence[Any], schema_version: int) -> Tuple[int, bool]:
+        # Return the parsed query and whether it is owned by the cache - queries that are not
+        # cached must be released by the caller
+        if schema_version != self._schema_version:
+            if self._queries:
+                self._invalidations += 1
+            self.clear()
+            self._schema_version = schema_version
+
+        try:
+            key = (class_key, query_string, tuple(_freeze_arg(x) for x in args))
+            hash(key)
+        except TypeError:
+            # Arguments that can't be hashed are never cached
+            key = None
+
+        if key is not None:
+            query = self._queries.get(key)
+            if query is not None:
+                self._queries.move_to_end(key)
+                self._hits += 1
+                return query, True
+
+        self._misses += 1
+        query = self._parse(class_key, query_string, args)
+        if key is None or self._max_size == 0:
+            return query, False
+        predicate = key[:2]
+        variants = self._variants.get(predicate, 0)
+        if variants >= self._max_variants:
+            self._uncached += 1
+            return query, False
+
+        self._queries[key] = query
+        self._variants[predicate] = variants + 1
+        while len(self._queries) > self._max_size:
+            evicted_key, evicted = self._queries.popitem(last=False)
+            self._forget_variant(evicted_key[:2])
+            handles.release(self._lib, evicted)
+            self._evictions += 1
+        return query, True
+
+    def _forget_variant(self, predicate: Tuple[int, str]):
+        variants = self._variants[predicate] - 1
+        if variants:
+            self._variants[predicate] = variants
+        else:
+            del self._variants[predicate]
+
+    def clear(self):
+        self._variants.clear()
+        while self._queries:
+            _, query = self._queries.popitem()
+            handles.release(self._lib, query)
@@ -3,14 +3,21 @@ import os
 import threading
 
 from enum import Enum
-from typing import (List, Tuple)
+from typing import (Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Type, Union)
 
 import pyrealm
 
+from .bulk import (DEFAULT_CHUNK_SIZE, BulkInsertResult, UpsertResult, bulk_insert, insert, upsert, upsert_many)
+from .changes import (DEFAULT_MAX_VERSIONS, ChangeBatch, ChangeJournal)
+from .columns import DEFAULT_BATCH_SIZE
 from .config import RealmConfig
+from . import handles
 from .error import (RealmException, throw_last_error,)
+from .notifications import (DEFAULT_CHANGE_WINDOW, NotificationToken, RealmChanges, add_realm_callback)
 from .property import (RealmPropertyInfo)
-from .schema import (RealmClassInfo, RealmObject)
+from .query import QueryCache
+from .results import Results
+from .schema import (RealmClassInfo, RealmObject, RealmSchema, RealmSchemaClass)
 
 
 class RealmVersion():
@@ -42,109 +49,76 @@ class Realm():
             ("index", ctypes.c_uint64),
         ]
 
+    class _RealmBinary(ctypes.Structure):
+        _fields_ = [
+            ("data", ctypes.POINTER(ctypes.c_uint8)),
+            ("size", ctypes.c_size_t),
+        ]
+
     class _TransactionType(Enum):
         NONE = 0
         READ = 1
         WRITE = 2
 
+    # Maximum number of parsed queries cached by each realm
+    QUERY_CACHE_SIZE = QueryCache.DEFAULT_MAX_SIZE
+
     def __init__(self, config: RealmConfig):
         if config is None:
             raise ValueError("config cannot be None")
 
-        self._init_if()
+        self._lib = pyrealm.get_bindings()
+        realm = self._lib.realm_open(config._handle())
+        if not realm:
+            throw_last_error("Error opening Realm object")
+        self._setup(realm, config)
+
+    def _setup(self, realm: ctypes.POINTER(_RealmObject), config: RealmConfig):
         self._transaction = Realm._TransactionType.NONE
         self._lock = threading.Lock()
-        self._realm = self._open(config._config)
-        if self._realm is None:
-            throw_last_error("Error opening Realm object")
-        pyrealm._opened_realms.append(self)
+        self._realm = realm
+        handles.track("realm", realm)
         self._config = config
+        config._realm_opened()
+        self._registry_id = pyrealm._opened_realms.add(self, config.path)
         self._active_schema = None
         self._last_schema_version = None
+        # Set when the realm may have moved to a new version and the cached schema must be revalidated
+        self._schema_check = True
+        # Incremented every time the realm may have moved to a new version
+        self._change_count = 0
+        self._query_cache = QueryCache(self._lib, realm, Realm.QUERY_CACHE_SIZE)
+        self._notification_tokens: List[NotificationToken] = []
+        self._change_journal = None
 
-    def _init_if(self):
-        # Set up the interface for the Realm realm functions
-        self._get_version_id = pyrealm._realm_lib.realm_get_version_id
-        self._get_version_id.restype = ctypes.c_bool
-        self._get_num_versions = pyrealm._realm_lib.realm_get_num_versions
-        self._get_num_versions.restype = ctypes.c_bool
-        self._open = pyrealm._realm_lib.realm_open
-        self._open.restype = ctypes.POINTER(Realm._RealmObject)
-        self._convert_with_config = pyrealm._realm_lib.realm_convert_with_config
-        self._convert_with_config.restype = ctypes.c_bool
-        self._convert_with_path = pyrealm._realm_lib.realm_convert_with_path
-        self._convert_with_path.restype = ctypes.c_bool
-        self._delete_files = pyrealm._realm_lib.realm_delete_files
-        self._delete_files.restype = ctypes.c_bool
-        self._is_closed = pyrealm._realm_lib.realm_is_closed
-        self._is_closed.restype = ctypes.c_bool
-        self._is_writable = pyrealm._realm_lib.realm_is_writable
-        self._is_writable.restype = ctypes.c_bool
-        self._close = pyrealm._realm_lib.realm_close
-        self._close.restype = ctypes.c_bool
-        self._begin_read = pyrealm._realm_lib.realm_begin_read
-        self._begin_read.restype = ctypes.c_bool
-        self._begin_write = pyrealm._realm_lib.realm_begin_write
-        self._begin_write.restype = ctypes.c_bool
-        self._commit = pyrealm._realm_lib.realm_commit
-        self._commit.restype = ctypes.c_bool
-        self._rollback = pyrealm._realm_lib.realm_rollback
-        self._rollback.restype = ctypes.c_bool
-        self._refresh = pyrealm._realm_lib.realm_refresh
-        self._refresh.restype = ctypes.c_bool
-        self._freeze = pyrealm._realm_lib.realm_freeze
-        self._freeze.restype = ctypes.c_bool
-        self._compact = pyrealm._realm_lib.realm_compact
-        self._compact.restype = ctypes.c_bool
-        self._get_schema_version = pyrealm._realm_lib.realm_get_schema_version
-        self._get_schema_version.restype = ctypes.c_uint64
-        self._get_num_classes = pyrealm._realm_lib.realm_get_num_classes
-        self._get_num_classes.restype = ctypes.c_uint64
-        self._get_schema = pyrealm._realm_lib.realm_get_schema
-        self._get_schema.restype = ctypes.c_void_p
-        self._get_class_keys = pyrealm._realm_lib.realm_get_class_keys
-        self._get_class_keys.argtypes = [
-            ctypes.POINTER(Realm._RealmObject),
-            ctypes.POINTER(ctypes.c_uint32),
-            ctypes.c_size_t,
-            ctypes.POINTER(ctypes.c_size_t)
-        ]
-        self._get_class_keys.restype = ctypes.c_bool
-        self._get_class = pyrealm._realm_lib.realm_get_class
-        self._get_class.argtypes = [
-            ctypes.POINTER(Realm._RealmObject),
-            ctypes.c_uint32,
-            ctypes.POINTER(RealmClassInfo)
-        ]
-        self._get_class.restype = ctypes.c_bool
-        self._get_class_properties = pyrealm._realm_lib.realm_get_class_properties
-        self._get_class_properties.argtypes = [
-            ctypes.POINTER(Realm._RealmObject),
-            ctypes.c_uint32,
-            ctypes.POINTER(RealmPropertyInfo),
-            ctypes.c_size_t,
-            ctypes.POINTER(ctypes.c_size_t)
-        ]
-        self._get_class_properties.restype = ctypes.c_bool
-
+    @classmethod
+    def _from_handle(cls, realm: ctypes.POINTER(_RealmObject), config: RealmConfig) -> 'Realm':
+        # Wrap a realm handle returned by the C API (e.g. from `realm_freeze`)
+        new_realm = cls.__new__(cls)
+        new_realm._lib = pyrealm.get_bindings()
+        new_realm._setup(realm, config)
+        return new_realm
 
     @classmethod
     def get_version(cls):
+        lib = pyrealm.get_bindings()
         major = ctypes.c_int()
         minor = ctypes.c_int()
         patch = ctypes.c_int()
         extra = ctypes.c_char_p()
-        pyrealm._realm_lib.realm_get_library_version.restype = ctypes.c_char_p
-        version_stg = pyrealm._realm_lib.realm_get_library_version()
-        result = pyrealm._realm_lib.realm_get_library_version_numbers(
+        version_stg = lib.realm_get_library_version()
+        lib.realm_get_library_version_numbers(
             ctypes.byref(major), ctypes.byref(minor), ctypes.byref(patch), ctypes.byref(extra)
         )
         if not version_stg:
             version_stg = b''
-        if result:
-            return RealmVersion(version_stg.decode("ASCII"), major.value, minor.value, patch.value, extra.value.decode("ASCII"))
-        else:
-            return RealmVersion(version_stg.decode("ASCII"), 0, 0, 0, "")
+        return RealmVersion(
+            version_stg.decode("ASCII"),
+            major.value,
+            minor.value,
+            patch.value,
+            extra.value.decode("ASCII") if extra.value else ""
+        )
 
     @property
     def config(self) -> RealmConfig:
@@ -152,16 +126,21 @@ class Realm():
 
     @property
     def closed(self) -> bool:
-        return self._is_closed(self._realm)
+        return self._realm is None or self._lib.realm_is_closed(self._realm)
+
+    def _handle(self) -> ctypes.POINTER(_RealmObject):
+        if self._realm is None:
+            raise RealmException(message="Realm has been closed")
+        return self._realm
 
     @property
     def writable(self) -> bool:
-        return self._is_writable(self._realm)
+        return self._lib.realm_is_writable(self._handle())
 
     @property
     def num_versions(self) -> int:
-        result = ctypes.c_ulonglong(0)
-        if self._get_num_versions(self._realm, ctypes.byref(result)):
+        result = ctypes.c_uint64(0)
+        if self._lib.realm_get_num_versions(self._handle(), ctypes.byref(result)):
             return result.value
         else:
             throw_last_error("Error requesting number versions in Realm object")
@@ -170,7 +149,7 @@ class Realm():
     def transaction_version(self) -> Tuple[int, int]:
         found = ctypes.c_bool()
         result = Realm._RealmVersionId()
-        if self._get_version_id(self._realm, ctypes.byref(found), ctypes.byref(result)):
+        if self._lib.realm_get_version_id(self._handle(), ctypes.byref(found), ctypes.byref(result)):
             if found:
                 return (result.version, result.index)
             else:
@@ -180,17 +159,17 @@ class Realm():
 
     @property
     def schema_version(self) -> int:
-        return self._get_schema_version(self._realm)
+        return self._lib.realm_get_schema_version(self._handle())
 
     @property
     def num_classes(self) -> int:
-        return self._get_num_classes(self._realm)
+        return self._lib.realm_get_num_classes(self._handle())
 
     def get_class_keys(self) -> List[int]:
         out_num = ctypes.c_size_t()
         num = self.num_classes
         class_keys = (ctypes.c_uint32 * num)()
-        if self._get_class_keys(self._realm, class_keys, num, ctypes.byref(out_num)):
+        if self._lib.realm_get_class_keys(self._handle(), class_keys, num, ctypes.byref(out_num)):
             retval = [int(x) for x in class_keys]
             return retval
         else:
@@ -198,7 +177,7 @@ class Realm():
 
     def get_class(self, class_key: int) -> RealmClassInfo:
         class_info = RealmClassInfo()
-        if self._get_class(self._realm, ctypes.c_uint32(class_key), ctypes.byref(class_info)):
+        if self._lib.realm_get_class(self._handle(), class_key, ctypes.byref(class_info)):
             return class_info
         else:
             throw_last_error("Error requesting class for Realm object")
@@ -206,11 +185,170 @@ class Realm():
     def get_class_properties(self, class_key: int, num_properties: int) -> List[RealmPropertyInfo]:
         out_num = ctypes.c_size_t()
         properties = (RealmPropertyInfo * num_properties)()
-        if self._get_class_properties(self._realm, ctypes.c_uint32(class_key), properties, num_properties, ctypes.byref(out_num)):
-            return list(properties)
+        if self._lib.realm_get_class_properties(self._handle(), class_key, properties, num_properties, ctypes.byref(out_num)):
+            return list(properties[:out_num.value])
         else:
             throw_last_error("Error requesting class for Realm object")
 
+    @property
+    def schema(self) -> RealmSchema:
+        # The snapshot is only revalidated after an operation that can move the realm to a new
+        # version, so repeated lookups between transactions do not call into the C API
+        if self._active_schema is None or self._schema_check:
+            version = (self.schema_version, self.transaction_version)
+            if self._active_schema is None or version != self._last_schema_version:
+                self._active_schema = self._load_schema(version)
+                self._last_schema_version = version
+            self._schema_check = False
+        return self._active_schema
+
+    def _load_schema(self, version: Tuple[int, Tuple[int, int]]) -> RealmSchema:
+        # Load the whole schema in a single pass: the class infos and the properties of every
+        # class are read into one contiguous buffer each instead of one ctypes array per class
+        lib = self._lib
+        realm = self._handle()
+        out_num = ctypes.c_size_t()
+        num = lib.realm_get_num_classes(realm)
+        class_keys = (ctypes.c_uint32 * num)()
+        if not lib.realm_get_class_keys(realm, class_keys, num, ctypes.byref(out_num)):
+            throw_last_error("Error requesting class keys for Realm object")
+        num = min(num, out_num.value)
+
+        class_infos = (RealmClassInfo * num)()
+        total_properties = 0
+        for i in range(num):
+            if not lib.realm_get_class(realm, class_keys[i], ctypes.byref(class_infos[i])):
+                throw_last_error("Error requesting class for Realm object")
+            total_properties += class_infos[i].num_properties + class_infos[i].num_computed_properties
+
+        properties = (RealmPropertyInfo * total_properties)()
+        classes = []
+        offset = 0
+        for info in class_infos:
+            max_properties = info.num_properties + info.num_computed_properties
+            class_properties = []
+            if max_properties:
+                if not lib.realm_get_class_properties(
+                    realm, info.key, ctypes.byref(properties[offset]), max_properties, ctypes.byref(out_num)
+                ):
+                    throw_last_error("Error requesting class properties for Realm object")
+                class_properties = properties[offset:offset + min(max_properties, out_num.value)]
+                offset += max_properties
+            classes.append(RealmSchemaClass.from_class_info(info, class_properties))
+        return RealmSchema(version, classes)
+
+    def _version_changed(self):
+        self._schema_check = True
+        self._change_count += 1
+
+    def _find_class(self, class_name: str) -> RealmSchemaClass:
+        # The schema may be cached - check the realm is still open before handing out its classes
+        self._handle()
+        class_info = self.schema.find_class(class_name)
+        if class_info is None:
+            raise ValueError(f"Class '{class_name}' not found in realm")
+        return class_info
+
+    def read_columns(
+        self,
+        class_name: str,
+        props: Optional[List[str]] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE
+    ) -> Dict[str, 'numpy.ndarray']:
+        # Read int, bool, float, double and timestamp properties of every object of a class into
+        # NumPy arrays (masked arrays for nullable properties) - requires NumPy
+        results = self.objects(class_name)
+        try:
+            return results.read_columns(props, batch_size)
+        finally:
+            results.close()
+
+    def objects(self, class_name: str, chunk_size: int = Results.DEFAULT_CHUNK_SIZE) -> Results:
+        class_info = self._find_class(class_name)
+        results = self._lib.realm_object_find_all(self._handle(), class_info.key)
+        if not results:
+            throw_last_error(f"Error requesting objects for class '{class_name}'")
+        return Results(self, class_info, results, chunk_size)
+
+    def query(self, class_name: str, query_string: str, *args, chunk_size: int = Results.DEFAULT_CHUNK_SIZE) -> Results:
+        # Run a query (e.g. `realm.query("Person", "age > $0", 21)`) - the objects are read lazily.
+        # Parsed queries are cached by query string and argument values, see `QueryCache`.
+        class_info = self._find_class(class_name)
+        query, cached = self._query_cache.get_query(
+            class_info.key, query_string, args, self.schema.schema_version
+        )
+        try:
+            results = self._lib.realm_query_find_all(query)
+        finally:
+            if not cached:
+                handles.release(self._lib, query)
+        if not results:
+            throw_last_error(f"Error running query '{query_string}' for class '{class_name}'")
+        return Results(self, class_info, results, chunk_size)
+
+    def bulk_insert(
+        self,
+        cls: Union[Type[RealmObject], str],
+        rows: Iterable[Union[RealmObject, Dict[str, Any]]],
+        chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> BulkInsertResult:
+        # Insert RealmObject instances or dicts, committing a write transaction every `chunk_size`
+        # objects - `cls` is a RealmObject class or the name of a class in the realm schema
+        return bulk_insert(self, cls, rows, chunk_size)
+
+    def upsert_many(
+        self,
+        cls: Union[Type[RealmObject], str],
+        rows: Iterable[Union[RealmObject, Dict[str, Any]]]
+    ) -> UpsertResult:
+        # Create or update objects by primary key in one write transaction - unchanged values
+        # are not written
+        return upsert_many(self, cls, rows)
+
+    def insert(self, cls: Union[Type[RealmObject], str], rows: Iterable[Union[RealmObject, Dict[str, Any]]]) -> int:
+        # Create objects in the current write transaction, e.g. in `with realm.write():` or in the
+        # write functions of `WriteCoalescer` and `AsyncRealm` - returns the number of objects created
+        return insert(self, cls, rows)
+
+    def upsert(self, cls: Union[Type[RealmObject], str], rows: Iterable[Union[RealmObject, Dict[str, Any]]]) -> UpsertResult:
+        # Create or update objects by primary key in the current write transaction
+        return upsert(self, cls, rows)
+
+    def on_change(
+        self,
+        callback: Callable[[RealmChanges], None],
+        window: float = DEFAULT_CHANGE_WINDOW
+    ) -> NotificationToken:
+        # Call `callback` when the realm moves to a new version. The notifications received within
+        # `window` seconds of the first one are delivered as a single call. Notifications are
+        # delivered through the scheduler of the config if one was set, otherwise when the realm is
+        # refreshed and, for a coalescing window, on a timer thread. Requires
+        # `config.automatic_change_notifications`.
+        token = add_realm_callback(self, callback, window, self._notification_tokens.remove)
+        self._notification_tokens.append(token)
+        return token
+
+    @property
+    def change_journal(self) -> Optional[ChangeJournal]:
+        return self._change_journal
+
+    def track_changes(self, class_names: Optional[List[str]] = None, max_versions: int = DEFAULT_MAX_VERSIONS) -> ChangeJournal:
+        # Start recording the object keys changed by every new version of the realm - the changes
+        # are recorded from the change notifications, see `on_change()` for their delivery
+        if self._change_journal is not None:
+            self._change_journal.close()
+        self._change_journal = ChangeJournal(self, class_names, max_versions)
+        return self._change_journal
+
+    def changes_since(self, version_id: Union[int, Tuple[int, int]]) -> Iterator[ChangeBatch]:
+        # Iterate over the inserted, modified and deleted object keys of each class, one batch per
+        # version committed after `version_id`. Pass the version of the last batch processed to
+        # resume. Changes are only available from the version `track_changes()` was called at,
+        # which is called with the default settings if it was not called yet.
+        if self._change_journal is None:
+            self.track_changes()
+        return self._change_journal.changes_since(version_id)
+
     def __str__(self):
         desc_str = (
             f"Realm: '{os.path.basename(self.config.path)}'"
@@ -228,7 +366,7 @@ class Realm():
     def info(self, prepend: str = "") -> str:
         states = []
         states.append('Closed') if self.closed else states.append('Open')
-        states.append('Writable') if self.writable else None
+        states.append('Writable') if not self.closed and self.writable else None
         states.append('Encrypted') if self.config.encryption_key else None
         return (
             f"{prepend}Realm Information\n"
@@ -241,44 +379,86 @@ class Realm():
         )
 
     def delete_files(self) -> bool:
-        result = ctypes.c_bool
-        if self._delete_files(self._realm, ctypes.byref(result)):
-            return result
+        result = ctypes.c_bool()
+        if self._lib.realm_delete_files(self.config.path.encode('utf-8'), ctypes.byref(result)):
+            return result.value
         else:
             throw_last_error("Error deleting files for Realm object")
 
+    @property
+    def query_cache(self) -> QueryCache:
+        return self._query_cache
+
     def close(self) -> bool:
-        if not self._close(self._realm):
+        # Close the realm and release its native handle - closing a closed realm does nothing
+        if self._realm is None:
+            return True
+        self._query_cache.clear()
+        if self._change_journal is not None:
+            self._change_journal.close()
+            self._change_journal = None
+        for token in list(self._notification_tokens):
+            token.cancel()
+        if not self._lib.realm_close(self._realm):
             throw_last_error("Error closing Realm object")
+        pyrealm._opened_realms.remove(self._registry_id)
+        self._release()
         return True
 
+    def _release(self):
+        realm, self._realm = self._realm, None
+        handles.release(self._lib, realm)
+        self._config._realm_closed()
+
+    def __del__(self):
+        # A realm that was not closed is closed by the core once its handle is released
+        if getattr(self, "_realm", None) is not None:
+            self._query_cache.clear()
+            self._release()
+
+    def __enter__(self) -> 'Realm':
+        return self
+
+    def __exit__(self, _exc_type, _exc_value, _trace):
+        self.close()
+
     def begin_read(self):
         with self._lock:
-            if self._transaction == Realm._Transaction.NONE:
-                if self._begin_read(self._realm):
-                    self._transaction = Realm._Transaction.READ
+            if self._transaction == Realm._TransactionType.NONE:
+                if self._lib.realm_begin_read(self._handle()):
+                    self._transaction = Realm._TransactionType.READ
+                    self._version_changed()
                     return True
                 else:
                     throw_last_error("Error beginning read transaction")
             else:
-                raise RealmException("Another transaction is already in progress")
+                raise RealmException(message="Another transaction is already in progress")
 
     def begin_write(self) -> bool:
         with self._lock:
-            if self._transaction == Realm._Transaction.NONE:
-                if self._begin_write(self._realm):
-                    self._transaction = Realm._Transaction.WRITE
+            if self._transaction == Realm._TransactionType.NONE:
+                if self._lib.realm_begin_write(self._handle()):
+                    self._transaction = Realm._TransactionType.WRITE
+                    self._version_changed()
                     return True
                 else:
                     throw_last_error("Error beginning write transaction")
             else:
-                raise RealmException("Another transaction is already in progress")
+                raise RealmException(message="Another transaction is already in progress")
+
+    def _end_read(self) -> bool:
+        # The C API has no call to end a read transaction - the next refresh moves the realm forward
+        self._transaction = Realm._TransactionType.NONE
+        return True
 
     def commit(self) -> bool:
         with self._lock:
-            if self._transaction != Realm._TransactionType.NONE:
-                if self._commit(self._realm):
+            if self._transaction == Realm._TransactionType.READ:
+                return self._end_read()
+            elif self._transaction != Realm._TransactionType.NONE:
+                if self._lib.realm_commit(self._handle()):
                     self._transaction = Realm._TransactionType.NONE
+                    self._version_changed()
                     return True
                 else:
                     throw_last_error("Error committing current transaction")
@@ -287,9 +467,12 @@ class Realm():
 
     def rollback(self) -> bool:
         with self._lock:
-            if self._transaction != Realm._TransactionType.NONE:
-                if self._rollback(self._realm):
+            if self._transaction == Realm._TransactionType.READ:
+                return self._end_read()
+            elif self._transaction != Realm._TransactionType.NONE:
+                if self._lib.realm_rollback(self._handle()):
                     self._transaction = Realm._TransactionType.NONE
+                    self._version_changed()
                     return True
                 else:
                     throw_last_error("Error rolling back current transaction")
@@ -297,23 +480,25 @@ class Realm():
                 return False
 
     def refresh(self) -> bool:
-        result = ctypes.c_bool
-        if self._refresh(self._realm, ctypes.byref(result)):
-            return result
+        result = ctypes.c_bool()
+        if self._lib.realm_refresh(self._handle(), ctypes.byref(result)):
+            if result.value:
+                self._version_changed()
+            return result.value
         else:
             throw_last_error("Error refreshing Realm object")
 
-    def freeze(self) -> bool:
-        result = ctypes.c_bool
-        if self._freeze(self._realm, ctypes.byref(result)):
-            return result
+    def freeze(self) -> 'Realm':
+        frozen = self._lib.realm_freeze(self._handle())
+        if frozen:
+            return Realm._from_handle(frozen, self._config)
         else:
-            throw_last_error("Error refreshing Realm object")
+            throw_last_error("Error freezing Realm object")
 
     def compact(self) -> bool:
-        result = ctypes.c_bool
-        if self._compact(self._realm, ctypes.byref(result)):
-            return result
+        result = ctypes.c_bool()
+        if self._lib.realm_compact(self._handle(), ctypes.byref(result)):
+            return result.value
         else:
             throw_last_error("Error compacting Realm object")
 
@@ -326,6 +511,10 @@ class Realm():
 
 class TransactionContextHandler():
     # Class to handle the transaction when used in a context (e.g. `with realm.read() as t:`)
+
+    # Set by `VersionMonitor` to record where the read transactions were opened
+    _tracker = None
+
     def __init__(self, realm: Realm, xact_type: Realm._TransactionType):
         if realm is None:
             raise ValueError("Realm cannot be none")
@@ -338,15 +527,29 @@ class TransactionContextHandler():
     def __enter__(self):
         if self._xact_type == Realm._TransactionType.READ:
             self._realm.begin_read()
+            tracker = TransactionContextHandler._tracker
+            if tracker is not None:
+                tracker.opened(self)
         elif self._xact_type == Realm._TransactionType.WRITE:
             self._realm.begin_write()
         else:
             raise ValueError(f"Transaction type is invalid: {self._xact_type}")
         return self
 
+    @property
+    def realm(self) -> Realm:
+        return self._realm
+
+    def _closed(self):
+        tracker = TransactionContextHandler._tracker
+        if tracker is not None:
+            tracker.closed(self)
+
     def __exit__(self, _exc_type, exc_value, _trace):
+        self._closed()
         # If the transaction hasn't been cancelled and an exception was not thrown, then commit it
-        if exc_value is None and self._transaction != Realm._TransactionType.NONE:
+        if exc_value is None and self._xact_type != Realm._TransactionType.NONE:
+            self._xact_type = Realm._TransactionType.NONE
             # If the transaction has already been committed or cancelled directly on the realm object,
             # this will do nothing
             self._realm.commit()
@@ -356,6 +559,7 @@ class TransactionContextHandler():
 
     def cancel(self):
         # Canceling the transaction before the contect has been completed
+        self._closed()
         if self._xact_type != Realm._TransactionType.NONE:
             self._xact_type = Realm._TransactionType.NONE
             # If the transaction has already been committed or cancelled directly on the realm object,
@@ -0,0 +1,167 @@
+import itertools
+import threading
+import weakref
+
+from collections import deque
+
+from typing import (Any, Dict, Iterator, List, Optional, Set, TYPE_CHECKING)
+
+if TYPE_CHECKING:
+    from .realm import Realm
+
+
+class _Entry():
+    __slots__ = ("ref", "path", "thread_id")
+
+    def __init__(self, ref: weakref.ref, path: str, thread_id: int):
+        self.ref = ref
+        self.path = path
+        self.thread_id = thread_id
+
+
+class RealmRegistry():
+    # The realms open in the process, grouped by path and by the thread that opened them. Realms
+    # are held by weak references: they are removed when they are closed, or when they are
+    # garbage collected without being closed, so the registry only holds open realms and the
+    # counts are kept up to date without asking the core.
+    #
+    # A realm can be garbage collected while the lock is held by the same thread, so the weak
+    # reference callbacks don't take the lock: they queue the registry id, and the queued ids are
+    # forgotten by the next call holding the lock.
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Registry ids of the realms garbage collected without being closed and not forgotten yet
+        self._collected_ids: deque = deque()
+        self._ids = itertools.count(1)
+        # Registry id -> entry
+        self._entries: Dict[int, _Entry] = {}
+        self._by_path: Dict[str, Set[int]] = {}
+        self._by_thread: Dict[int, Set[int]] = {}
+        self._opened = 0
+        self._closed = 0
+        self._collected = 0
+        self._max_open = 0
+
+    def add(self, realm: 'Realm', path: str) -> int:
+        # Register a newly opened realm - returns its registry id
+        registry_id = next(self._ids)
+        thread_id = threading.get_ident()
+        ref = weakref.ref(realm, lambda _ref, registry_id=registry_id: self._collected_ids.append(registry_id))
+        with self._lock:
+            self._forget_collected()
+            self._entries[registry_id] = _Entry(ref, path, thread_id)
+            self._by_path.setdefault(path, set()).add(registry_id)
+            self._by_thread.setdefault(thread_id, set()).add(registry_id)
+            self._opened += 1
+            self._max_open = max(self._max_open, len(self._entries))
+        return registry_id
+
+    def remove(self, registry_id: int) -> bool:
+        # Called when a realm is closed - returns False if it was not registered
+        with self._lock:
+            self._forget_collected()
+            return self._forget(registry_id, collected=False)
+
+    def _forget(self, registry_id: int, collected: bool) -> bool:
+        # The caller holds the lock
+        entry = self._entries.pop(registry_id, None)
+        if entry is None:
+            return False
+        self._discard(self._by_path, entry.path, registry_id)
+        self._discard(self._by_thread, entry.thread_id, registry_id)
+        if collected:
+            self._collected += 1
+        else:
+            self._closed += 1
+        return True
+
+    def _forget_collected(self):
+        # Forget the realms queued by the weak reference callbacks - the caller holds the lock
+        while self._collected_ids:
+            self._forget(self._collected_ids.popleft(), collected=True)
+
+    @staticmethod
+    def _discard(groups: Dict[Any, Set[int]], key: Any, registry_id: int):
+        group = groups.get(key)
+        if group is not None:
+            group.discard(registry_id)
+            if not group:
+                del groups[key]
+
+    def _realms(self, registry_ids) -> List['Realm']:
+        # Live realms of the registry ids, in the order they were opened - the caller holds the lock
+        realms = [self._entries[x].ref() for x in sorted(registry_ids)]
+        return [x for x in realms if x is not None]
+
+    def realms(self) -> List['Realm']:
+        with self._lock:
+            self._forget_collected()
+            return self._realms(self._entries)
+
+    def realms_for_path(self, path: str) -> List['Realm']:
+        with self._lock:
+            self._forget_collected()
+            return self._realms(self._by_path.get(path, ()))
+
+    def realms_for_thread(self, thread_id: Optional[int] = None) -> List['Realm']:
+        # Realms opened by the thread (the current thread by default)
+        if thread_id is None:
+            thread_id = threading.get_ident()
+        with self._lock:
+            self._forget_collected()
+            return self._realms(self._by_thread.get(thread_id, ()))
+
+    def count_for_path(self, path: str) -> int:
+        with self._lock:
+            self._forget_collected()
+            return len(self._by_path.get(path, ()))
+
+    def count_for_thread(self, thread_id: Optional[int] = None) -> int:
+        if thread_id is None:
+            thread_id = threading.get_ident()
+        with self._lock:
+            self._forget_collected()
+            return len(self._by_thread.get(thread_id, ()))
+
+    def paths(self) -> List[str]:
+        with self._lock:
+            self._forget_collected()
+            return list(self._by_path)
+
+    @property
+    def num_opened(self) -> int:
+        # Number of realms opened since the process started
+        return self._opened
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._forget_collected()
+            return {
+                "open": len(self._entries),
+                "max_open": self._max_open,
+                "opened": self._opened,
+                "closed": self._closed,
+                "collected": self._collected,
+                "paths": {x: len(y) for x, y in self._by_path.items()},
+                "threads": {x: len(y) for x, y in self._by_thread.items()},
+            }
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._forget_collected()
+            return len(self._entries)
+
+    def __iter__(self) -> Iterator['Realm']:
+        # Iterate over a snapshot, so realms can be closed while iterating
+        return iter(self.realms())
+
+    def __contains__(self, realm: 'Realm') -> bool:
+        entry = self._entries.get(getattr(realm, "_registry_id", None))
+        return entry is not None and entry.ref() is realm
+
+    def __str__(self):
+        return f"RealmRegistry: {len(self._entries)} open realms in {len(self._by_path)} paths"
+
+    def __repr__(self):
+        return f"<{str(self)}>"
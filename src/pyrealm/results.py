@@ -0,0 +1,350 @@
+import ctypes
+
+from decimal import Decimal
+from typing import (Any, Callable, Dict, Iterator, List, Optional, Union)
+
+from . import handles
+from .columns import (DEFAULT_BATCH_SIZE, get_column_properties, read_results_columns)
+from .error import throw_last_error
+from .notifications import (DEFAULT_CHANGE_WINDOW, CollectionChanges, NotificationToken, add_results_callback)
+from .property import (PropertyType, RealmCollectionType, RealmPropertyType)
+from .schema import (RealmSchemaClass, RealmSchemaProperty)
+from .value import (RealmValue, to_python)
+
+
+# Property types supported by each aggregate function
+_MIN_MAX_TYPES = [
+    RealmPropertyType.RLM_PROPERTY_TYPE_INT,
+    RealmPropertyType.RLM_PROPERTY_TYPE_FLOAT,
+    RealmPropertyType.RLM_PROPERTY_TYPE_DOUBLE,
+    RealmPropertyType.RLM_PROPERTY_TYPE_DECIMAL128,
+    RealmPropertyType.RLM_PROPERTY_TYPE_TIMESTAMP,
+    RealmPropertyType.RLM_PROPERTY_TYPE_MIXED,
+]
+_SUM_AVG_TYPES = [
+    RealmPropertyType.RLM_PROPERTY_TYPE_INT,
+    RealmPropertyType.RLM_PROPERTY_TYPE_FLOAT,
+    RealmPropertyType.RLM_PROPERTY_TYPE_DOUBLE,
+    RealmPropertyType.RLM_PROPERTY_TYPE_DECIMAL128,
+    RealmPropertyType.RLM_PROPERTY_TYPE_MIXED,
+]
+# Property types converted with `PropertyType.convert_value`, other values are already decoded
+# to the matching Python type by `to_python`
+_CONVERTED_TYPES = [
+    RealmPropertyType.RLM_PROPERTY_TYPE_INT,
+    RealmPropertyType.RLM_PROPERTY_TYPE_FLOAT,
+    RealmPropertyType.RLM_PROPERTY_TYPE_DOUBLE,
+]
+_ZERO_SUM = {
+    RealmPropertyType.RLM_PROPERTY_TYPE_INT: 0,
+    RealmPropertyType.RLM_PROPERTY_TYPE_FLOAT: 0.0,
+    RealmPropertyType.RLM_PROPERTY_TYPE_DOUBLE: 0.0,
+    RealmPropertyType.RLM_PROPERTY_TYPE_DECIMAL128: Decimal(0),
+    RealmPropertyType.RLM_PROPERTY_TYPE_MIXED: 0,
+}
+
+
+class Results():
+    # Lazy view over a native `realm_results_t` - objects are only read from the realm when they
+    # are accessed, `chunk_size` objects at a time, and only the current chunk is kept in memory
+
+    DEFAULT_CHUNK_SIZE = 256
+
+    def __init__(
+        self,
+        realm: 'Realm',
+        class_info: RealmSchemaClass,
+        results: int,
+        chunk_size: int = DEFAULT_CHUNK_SIZE
+    ):
+        if chunk_size < 1:
+            raise ValueError(f"Chunk size must be greater than 0 - got {chunk_size}")
+        self._realm = realm
+        self._lib = realm._lib
+        self._class_info = class_info
+        self._results = results
+        handles.track("results", results)
+        self._chunk_size = chunk_size
+        # Collections and computed properties cannot be read with `realm_get_values`
+        self._columns = [
+            x for x in class_info.properties
+            if x.collection_type == RealmCollectionType.RLM_COLLECTION_TYPE_NONE
+            and x.type != RealmPropertyType.RLM_PROPERTY_TYPE_LINKING_OBJECTS
+        ]
+        self._keys = (ctypes.c_int64 * len(self._columns))(*[x.key for x in self._columns])
+        self._values = (RealmValue * len(self._columns))()
+        self._chunk: List[Dict[str, Any]] = []
+        self._chunk_start = 0
+        self._chunk_change_count = -1
+        self._notification_tokens: List[NotificationToken] = []
+
+    @property
+    def realm(self) -> 'Realm':
+        return self._realm
+
+    @property
+    def class_name(self) -> str:
+        return self._class_info.name
+
+    @property
+    def chunk_size(self) -> int:
+        return self._chunk_size
+
+    @property
+    def closed(self) -> bool:
+        return self._results is None
+
+    def _handle(self) -> int:
+        if self._results is None:
+            raise ValueError("Results have been closed")
+        return self._results
+
+    def __len__(self) -> int:
+        count = ctypes.c_size_t()
+        if not self._lib.realm_results_count(self._handle(), ctypes.byref(count)):
+            throw_last_error(f"Error counting results for class '{self.class_name}'")
+        return count.value
+
+    def _read_object(self, index: int) -> Dict[str, Any]:
+        obj = self._lib.realm_results_get_object(self._handle(), index)
+        if not obj:
+            throw_last_error(f"Error requesting object at index {index}")
+        try:
+            if not self._lib.realm_get_values(obj, len(self._columns), self._keys, self._values):
+                throw_last_error(f"Error reading values of object at index {index}")
+            return {prop.name: to_python(value) for prop, value in zip(self._columns, self._values)}
+        finally:
+            self._lib.realm_release(obj)
+
+    def _load_chunk(self, start: int, count: int):
+        # Replace the current chunk with the objects starting at `start`
+        self._chunk = []
+        self._chunk = [self._read_object(i) for i in range(start, min(start + self._chunk_size, count))]
+        self._chunk_start = start
+        self._chunk_change_count = self._realm._change_count
+
+    def _get(self, index: int, count: int) -> Dict[str, Any]:
+        offset = index - self._chunk_start
+        if self._chunk_change_count != self._realm._change_count or not 0 <= offset < len(self._chunk):
+            self._load_chunk(index - index % self._chunk_size, count)
+            offset = index - self._chunk_start
+        return self._chunk[offset]
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+        count = len(self)
+        if isinstance(index, slice):
+            return [self._get(i, count) for i in range(*index.indices(count))]
+        elif isinstance(index, int):
+            if index < 0:
+                index += count
+            if not 0 <= index < count:
+                raise IndexError(f"Results index out of range: {index}")
+            return self._get(index, count)
+        raise TypeError(f"Results indices must be integers or slices, not {type(index)}")
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        count = len(self)
+        for start in range(0, count, self._chunk_size):
+            self._load_chunk(start, count)
+            yield from self._chunk
+
+    def iter_range(self, start: int, stop: int) -> Iterator[Dict[str, Any]]:
+        # Iterate over the objects from index `start` up to (not including) `stop` - the chunks start
+        # at `start` and end at `stop`, so no object outside of the range is read
+        stop = min(stop, len(self))
+        for chunk_start in range(max(start, 0), stop, self._chunk_size):
+            self._load_chunk(chunk_start, stop)
+            yield from self._chunk
+
+    def count(self) -> int:
+        return len(self)
+
+    def _aggregate_property(self, prop_name: str, supported: List[RealmPropertyType], func: str) -> RealmSchemaProperty:
+        prop = self._class_info.get_property(prop_name)
+        if prop is None:
+            raise ValueError(f"Property '{prop_name}' not found in class '{self.class_name}'")
+        if prop.type not in supported or prop.collection_type != RealmCollectionType.RLM_COLLECTION_TYPE_NONE:
+            raise TypeError(f"Cannot compute {func}() of property '{prop_name}' of type {prop.type.name}")
+        return prop
+
+    def _aggregate(self, func, prop: RealmSchemaProperty, name: str) -> Optional[Any]:
+        # Run the aggregate in the core - returns None if there were no values to aggregate
+        value = RealmValue()
+        found = ctypes.c_bool()
+        if not func(self._handle(), prop.key, ctypes.byref(value), ctypes.byref(found)):
+            throw_last_error(f"Error computing {name}() of property '{prop.name}'")
+        if not found.value:
+            return None
+        return to_python(value)
+
+    def _convert(self, rtype: RealmPropertyType, value: Any) -> Any:
+        if value is not None and rtype in _CONVERTED_TYPES:
+            return PropertyType.convert_value(rtype, value)
+        return value
+
+    def min(self, prop_name: str) -> Optional[Any]:
+        prop = self._aggregate_property(prop_name, _MIN_MAX_TYPES, "min")
+        return self._convert(prop.type, self._aggregate(self._lib.realm_results_min, prop, "min"))
+
+    def max(self, prop_name: str) -> Optional[Any]:
+        prop = self._aggregate_property(prop_name, _MIN_MAX_TYPES, "max")
+        return self._convert(prop.type, self._aggregate(self._lib.realm_results_max, prop, "max"))
+
+    def sum(self, prop_name: str) -> Any:
+        prop = self._aggregate_property(prop_name, _SUM_AVG_TYPES, "sum")
+        value = self._aggregate(self._lib.realm_results_sum, prop, "sum")
+        if value is None:
+            return _ZERO_SUM[prop.type]
+        return self._convert(prop.type, value)
+
+    def avg(self, prop_name: str) -> Optional[Union[float, Decimal]]:
+        # The average of int, float and double properties is always a double
+        prop = self._aggregate_property(prop_name, _SUM_AVG_TYPES, "avg")
+        value = self._aggregate(self._lib.realm_results_average, prop, "avg")
+        if prop.type == RealmPropertyType.RLM_PROPERTY_TYPE_DECIMAL128 or not isinstance(value, (int, float)):
+            return value
+        return self._convert(RealmPropertyType.RLM_PROPERTY_TYPE_DOUBLE, value)
+
+    def _check_key_path(self, key_path: str):
+        name = key_path.split(".", 1)[0]
+        if self._class_info.get_property(name) is None:
+            raise ValueError(f"Property '{name}' not found in class '{self.class_name}'")
+
+    def _derive(self, results: int, error: str) -> 'Results':
+        if not results:
+            throw_last_error(error)
+        return Results(self._realm, self._class_info, results, self._chunk_size)
+
+    def sort(self, key_path: str, ascending: bool = True) -> 'Results':
+        self._check_key_path(key_path)
+        # The core wraps the descriptor in SORT() itself
+        sort_string = f"{key_path} {'ASCENDING' if ascending else 'DESCENDING'}"
+        results = self._lib.realm_results_sort(self._handle(), sort_string.encode('utf-8'))
+        return self._derive(results, f"Error sorting results by '{key_path}'")
+
+    def distinct(self, key_path: str) -> 'Results':
+        self._check_key_path(key_path)
+        results = self._lib.realm_results_distinct(self._handle(), key_path.encode('utf-8'))
+        return self._derive(results, f"Error requesting distinct results for '{key_path}'")
+
+    def limit(self, max_count: int) -> 'Results':
+        if max_count < 0:
+            raise ValueError(f"Limit cannot be negative - got {max_count}")
+        results = self._lib.realm_results_limit(self._handle(), max_count)
+        return self._derive(results, f"Error limiting results to {max_count}")
+
+    def freeze(self, frozen_realm: 'Realm', chunk_size: Optional[int] = None) -> 'Results':
+        # Move the results to a frozen realm - the frozen results never change
+        results = self._lib.realm_results_freeze(self._handle(), frozen_realm._handle())
+        if not results:
+            throw_last_error("Error freezing results")
+        return Results(frozen_realm, self._class_info, results, chunk_size or self._chunk_size)
+
+    def cursor(self, page_size: int = DEFAULT_CHUNK_SIZE) -> 'ResultsCursor':
+        return ResultsCursor(self, page_size)
+
+    def read_columns(self, props: Optional[List[str]] = None, batch_size: int = DEFAULT_BATCH_SIZE) -> Dict[str, 'numpy.ndarray']:
+        columns = get_column_properties(self._class_info, props)
+        return read_results_columns(self._lib, self._handle(), len(self), columns, batch_size)
+
+    def on_change(
+        self,
+        callback: Callable[[CollectionChanges], None],
+        window: float = DEFAULT_CHANGE_WINDOW
+    ) -> NotificationToken:
+        # Call `callback` with the indices of the deleted, inserted and modified objects when the
+        # results change. The changes received within `window` seconds of the first one are merged
+        # into a single call - delivery works as for `Realm.on_change()`.
+        token = add_results_callback(self, callback, window, self._notification_tokens.remove)
+        self._notification_tokens.append(token)
+        return token
+
+    def close(self):
+        for token in list(self._notification_tokens):
+            token.cancel()
+        if self._results is not None:
+            results, self._results = self._results, None
+            handles.release(self._lib, results)
+            self._chunk = []
+
+    def __del__(self):
+        if getattr(self, "_results", None) is not None:
+            self.close()
+
+    def __str__(self):
+        return f"Results: '{self.class_name}'{' - closed' if self.closed else ''}"
+
+    def __repr__(self):
+        return f"<{str(self)}>"
+
+
+class ResultsCursor():
+    # Pages over results pinned to a frozen version of the realm, so the pages stay consistent
+    # while writers commit new versions. Each page is read with a single chunk of `page_size`
+    # objects, independent of the page number.
+
+    def __init__(self, results: Results, page_size: int = Results.DEFAULT_CHUNK_SIZE):
+        if page_size < 1:
+            raise ValueError(f"Page size must be greater than 0 - got {page_size}")
+        self._frozen_realm = results.realm.freeze()
+        try:
+            self._results = results.freeze(self._frozen_realm, chunk_size=page_size)
+        except Exception:
+            self._frozen_realm.close()
+            raise
+        self._page_size = page_size
+        self._position = 0
+        self._count = len(self._results)
+        self._version = self._frozen_realm.transaction_version
+
+    @property
+    def version(self):
+        # Transaction version the cursor is pinned to
+        return self._version
+
+    @property
+    def page_size(self) -> int:
+        return self._page_size
+
+    @property
+    def position(self) -> int:
+        return self._position
+
+    @property
+    def num_pages(self) -> int:
+        return (self._count + self._page_size - 1) // self._page_size
+
+    def __len__(self) -> int:
+        return self._count
+
+    def seek(self, position: int):
+        if not 0 <= position <= self._count:
+            raise IndexError(f"Cursor position out of range: {position}")
+        self._position = position
+
+    def page(self, number: int) -> List[Dict[str, Any]]:
+        # Read page `number` (starting at 0) without moving the cursor
+        if number < 0:
+            raise IndexError(f"Page number cannot be negative: {number}")
+        start = number * self._page_size
+        return self._results[start:start + self._page_size]
+
+    def next_page(self) -> List[Dict[str, Any]]:
+        page = self._results[self._position:self._position + self._page_size]
+        self._position += len(page)
+        return page
+
+    def __iter__(self) -> Iterator[List[Dict[str, Any]]]:
+        while self._position < self._count:
+            yield self.next_page()
+
+    def close(self):
+        self._results.close()
+        if not self._frozen_realm.closed:
+            self._frozen_realm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, _exc_type, _exc_value, _trace):
+        self.close()
@@ -0,0 +1,169 @@
+import os
+
+from collections import Counter
+from concurrent.futures import (ProcessPoolExecutor, ThreadPoolExecutor)
+from numbers import Number
+from typing import (Any, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar)
+
+import pyrealm
+
+from .config import (RealmConfig, RealmSchemaMode)
+from .realm import Realm
+from .results import Results
+
+T = TypeVar("T")
+
+DEFAULT_RANGES_PER_WORKER = 4
+
+
+def split_ranges(count: int, num_ranges: int) -> List[Tuple[int, int]]:
+    # Split the indices [0, count) into at most `num_ranges` contiguous ranges of (almost) equal size
+    num_ranges = max(1, min(num_ranges, count))
+    size, extra = divmod(count, num_ranges)
+    ranges = []
+    start = 0
+    for i in range(num_ranges):
+        stop = start + size + (1 if i < extra else 0)
+        if stop > start:
+            ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+def merge_results(partials: List[Any]) -> Any:
+    # Default merge for the results of each range: lists and tuples are concatenated, numbers
+    # summed, Counters added and dicts updated in range order. Anything else is returned as a list.
+    if not partials:
+        return []
+    if all(isinstance(x, (list, tuple)) for x in partials):
+        return [item for x in partials for item in x]
+    if all(isinstance(x, Number) for x in partials):
+        return sum(partials)
+    if all(isinstance(x, Counter) for x in partials):
+        return sum(partials, Counter())
+    if all(isinstance(x, dict) for x in partials):
+        merged = {}
+        for x in partials:
+            merged.update(x)
+        return merged
+    return list(partials)
+
+
+def _scan_range(frozen: Realm, class_name: str, fn: Callable[[Iterator[Dict[str, Any]]], T], start: int, stop: int, chunk_size: int) -> T:
+    results = frozen.objects(class_name, chunk_size)
+    try:
+        return fn(results.iter_range(start, stop))
+    finally:
+        results.close()
+
+
+def _config_state(config: RealmConfig) -> Dict[str, Any]:
+    # The config settings needed to reopen the realm in another process
+    return {
+        "path": config.path,
+        "encryption_key": config.encryption_key,
+        "schema_version": config.schema_version,
+        "schema_mode": int(config.schema_mode),
+    }
+
+
+def _scan_range_in_process(
+    lib_path: str,
+    state: Dict[str, Any],
+    version: Tuple[int, int],
+    class_name: str,
+    fn: Callable[[Iterator[Dict[str, Any]]], T],
+    start: int,
+    stop: int,
+    chunk_size: int
+) -> T:
+    if not pyrealm.is_initialized():
+        pyrealm.realm_init(lib_path)
+    config = RealmConfig(path=state["path"], schema_version=state["schema_version"])
+    config.schema_mode = RealmSchemaMode(state["schema_mode"])
+    if state["encryption_key"]:
+        config.encryption_key = state["encryption_key"]
+    realm = Realm(config)
+    try:
+        frozen = realm.freeze()
+        try:
+            # Other processes can't pin the version frozen by the caller, so make sure this is the same one
+            if frozen.transaction_version != version:
+                raise RuntimeError(
+                    f"Realm moved from version {version} to {frozen.transaction_version} during the parallel scan"
+                )
+            return _scan_range(frozen, class_name, fn, start, stop, chunk_size)
+        finally:
+            frozen.close()
+    finally:
+        realm.close()
+
+
+def parallel_scan(
+    config: RealmConfig,
+    class_name: str,
+    fn: Callable[[Iterator[Dict[str, Any]]], T],
+    workers: Optional[int] = None,
+    merge: Optional[Callable[[List[T]], Any]] = merge_results,
+    executor: str = "thread",
+    ranges_per_worker: int = DEFAULT_RANGES_PER_WORKER,
+    chunk_size: int = Results.DEFAULT_CHUNK_SIZE
+) -> Any:
+    # Scan every object of `class_name` in parallel against a single frozen version of the realm.
+    # The objects are split into `workers * ranges_per_worker` index ranges, `fn` is called with an
+    # iterator over the objects (dicts) of each range and `merge` combines the results of the ranges,
+    # which are passed in index order.
+    #
+    # With `executor="thread"` every range reads the same frozen realm - the GIL is released during
+    # the native calls. With `executor="process"`, `fn` must be picklable and every process freezes
+    # the realm itself: the scan fails if the realm was written to after the scan started.
+    if executor not in ("thread", "process"):
+        raise ValueError(f"Executor must be 'thread' or 'process' - got '{executor}'")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError(f"Number of workers must be greater than 0 - got {workers}")
+    if ranges_per_worker < 1:
+        raise ValueError(f"Ranges per worker must be greater than 0 - got {ranges_per_worker}")
+    if executor == "process" and config.in_memory:
+        raise ValueError("In-memory realms cannot be scanned from other processes")
+
+    realm = Realm(config)
+    try:
+        frozen = realm.freeze()
+        try:
+            # Load the schema once before it is shared between the threads
+            frozen._find_class(class_name)
+            objects = frozen.objects(class_name)
+            try:
+                count = len(objects)
+            finally:
+                objects.close()
+            # An empty class still calls `fn` once so the merged result has the right type
+            ranges = split_ranges(count, workers * ranges_per_worker) or [(0, 0)]
+
+            if executor == "thread":
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    futures = [
+                        pool.submit(_scan_range, frozen, class_name, fn, start, stop, chunk_size)
+                        for start, stop in ranges
+                    ]
+                    partials = [x.result() for x in futures]
+            else:
+                state = _config_state(config)
+                version = frozen.transaction_version
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    futures = [
+                        pool.submit(
+                            _scan_range_in_process, pyrealm.get_lib_path(), state, version,
+                            class_name, fn, start, stop, chunk_size
+                        )
+                        for start, stop in ranges
+                    ]
+                    partials = [x.result() for x in futures]
+        finally:
+            frozen.close()
+    finally:
+        realm.close()
+
+    return merge(partials) if merge is not None else partials
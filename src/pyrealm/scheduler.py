@@ -0,0 +1,125 @@
+import ctypes
+import itertools
+import threading
+
+from typing import Callable
+
+import pyrealm
+
+from . import handles
+from .error import throw_last_error
+
+
+# C callback types used by the realm-ffi scheduler, async transaction, notification and config functions
+RealmFreeUserdataFunc = ctypes.CFUNCTYPE(None, ctypes.c_void_p)
+RealmSchedulerNotifyFunc = ctypes.CFUNCTYPE(None, ctypes.c_void_p)
+RealmSchedulerIsOnThreadFunc = ctypes.CFUNCTYPE(ctypes.c_bool, ctypes.c_void_p)
+RealmSchedulerIsSameAsFunc = ctypes.CFUNCTYPE(ctypes.c_bool, ctypes.c_void_p, ctypes.c_void_p)
+RealmSchedulerCanDeliverFunc = ctypes.CFUNCTYPE(ctypes.c_bool, ctypes.c_void_p)
+RealmAsyncBeginWriteFunc = ctypes.CFUNCTYPE(None, ctypes.c_void_p)
+RealmAsyncCommitFunc = ctypes.CFUNCTYPE(None, ctypes.c_void_p, ctypes.c_bool, ctypes.c_char_p)
+RealmOnRealmChangeFunc = ctypes.CFUNCTYPE(None, ctypes.c_void_p)
+RealmOnCollectionChangeFunc = ctypes.CFUNCTYPE(None, ctypes.c_void_p, ctypes.c_void_p)
+RealmShouldCompactOnLaunchFunc = ctypes.CFUNCTYPE(ctypes.c_bool, ctypes.c_void_p, ctypes.c_uint64, ctypes.c_uint64)
+
+# The userdata is owned by Python, so there is nothing to free
+_free_userdata = RealmFreeUserdataFunc(lambda _userdata: None)
+
+_scheduler_ids = itertools.count(1)
+# Scheduler id -> scheduler, used to route the C callbacks back to the Python object
+_schedulers = {}
+_schedulers_lock = threading.Lock()
+
+
+def _get_scheduler(userdata) -> 'RealmScheduler':
+    return _schedulers.get(userdata)
+
+
+@RealmSchedulerNotifyFunc
+def _scheduler_notify(userdata):
+    scheduler = _get_scheduler(userdata)
+    if scheduler is not None:
+        scheduler._notify()
+
+
+@RealmSchedulerIsOnThreadFunc
+def _scheduler_is_on_thread(userdata):
+    scheduler = _get_scheduler(userdata)
+    return scheduler is not None and scheduler.is_on_thread()
+
+
+@RealmSchedulerIsSameAsFunc
+def _scheduler_is_same_as(userdata, other):
+    return userdata == other
+
+
+@RealmSchedulerCanDeliverFunc
+def _scheduler_can_deliver(userdata):
+    return _get_scheduler(userdata) is not None
+
+
+class RealmScheduler():
+    # A realm scheduler that runs the work queued by the realm core (async transaction callbacks and
+    # change notifications) on the thread that owns the realm. `submit` is called from any thread
+    # and must run the function it is given on the owning thread, e.g. `executor.submit` for a
+    # single thread executor or `loop.call_soon_threadsafe` for an event loop.
+
+    def __init__(self, submit: Callable[[Callable[[], None]], None], thread_id: int):
+        self._lib = pyrealm.get_bindings()
+        if not self._lib.has_function("realm_scheduler_new"):
+            raise RuntimeError("The realm library does not support custom schedulers")
+        self._submit = submit
+        self._thread_id = thread_id
+        self._id = next(_scheduler_ids)
+        with _schedulers_lock:
+            _schedulers[self._id] = self
+        try:
+            self._scheduler = self._lib.realm_scheduler_new(
+                self._id,
+                _free_userdata,
+                _scheduler_notify,
+                _scheduler_is_on_thread,
+                _scheduler_is_same_as,
+                _scheduler_can_deliver,
+            )
+        except BaseException:
+            self._unregister()
+            raise
+        if not self._scheduler:
+            self._unregister()
+            throw_last_error("Error creating realm scheduler")
+        handles.track("scheduler", self._scheduler)
+
+    @property
+    def handle(self) -> int:
+        return self._scheduler
+
+    @property
+    def thread_id(self) -> int:
+        return self._thread_id
+
+    def is_on_thread(self) -> bool:
+        return threading.get_ident() == self._thread_id
+
+    def _notify(self):
+        # The core has queued work - run it on the owning thread
+        self._submit(self.perform_work)
+
+    def perform_work(self):
+        if self._scheduler:
+            self._lib.realm_scheduler_perform_work(self._scheduler)
+
+    def set_on_config(self, config: 'RealmConfig'):
+        # Realms opened with the config deliver their callbacks through this scheduler
+        self._lib.realm_config_set_scheduler(config._handle(), self._scheduler)
+        config._scheduler = self
+
+    def _unregister(self):
+        with _schedulers_lock:
+            _schedulers.pop(self._id, None)
+
+    def close(self):
+        self._unregister()
+        scheduler, self._scheduler = self._scheduler, None
+        if scheduler:
+            handles.release(self._lib, scheduler)
@@ -3,9 +3,19 @@ import ctypes
 
 from collections import OrderedDict
 from enum import IntFlag
-from typing import (Any, Dict, List,)
+from functools import partial
+from operator import attrgetter
+from types import MappingProxyType
+from typing import (Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple, Union,)
 
-from .property import PropertyType
+from .property import (
+    PropertyType,
+    PropertyWrapper,
+    RealmCollectionType,
+    RealmPropertyFlags,
+    RealmPropertyInfo,
+    RealmPropertyType,
+)
 
 class RealmClassFlags(IntFlag):
     RLM_CLASS_NORMAL = 0
@@ -25,117 +35,256 @@ class RealmClassInfo(ctypes.Structure):
     ]
 
 
+def _decode(value: Optional[bytes]) -> str:
+    return value.decode('utf-8') if value else ""
+
+
+class RealmSchemaProperty(NamedTuple):
+    # Decoded, immutable copy of a RealmPropertyInfo structure
+    name: str
+    public_name: str
+    type: RealmPropertyType
+    collection_type: RealmCollectionType
+    link_target: str
+    link_origin_property_name: str
+    key: int
+    flags: RealmPropertyFlags
+
+    @classmethod
+    def from_property_info(cls, prop_info: RealmPropertyInfo) -> 'RealmSchemaProperty':
+        return cls(
+            name=_decode(prop_info.name),
+            public_name=_decode(prop_info.public_name),
+            type=RealmPropertyType(prop_info.type),
+            collection_type=RealmCollectionType(prop_info.collection_type),
+            link_target=_decode(prop_info.link_target),
+            link_origin_property_name=_decode(prop_info.link_origin_property_name),
+            key=prop_info.key,
+            flags=RealmPropertyFlags(prop_info.flags),
+        )
+
+    @property
+    def is_nullable(self) -> bool:
+        return bool(self.flags & RealmPropertyFlags.RLM_PROPERTY_NULLABLE)
+
+    @property
+    def is_primary_key(self) -> bool:
+        return bool(self.flags & RealmPropertyFlags.RLM_PROPERTY_PRIMARY_KEY)
+
+
+class RealmSchemaClass(NamedTuple):
+    # Decoded, immutable copy of a RealmClassInfo structure and its properties
+    name: str
+    primary_key: str
+    key: int
+    flags: RealmClassFlags
+    properties: Tuple[RealmSchemaProperty, ...]
+    property_types: Tuple[PropertyType, ...] = ()
+
+    @classmethod
+    def from_class_info(cls, class_info: RealmClassInfo, properties: List[RealmPropertyInfo]) -> 'RealmSchemaClass':
+        return cls(
+            name=_decode(class_info.name),
+            primary_key=_decode(class_info.primary_key),
+            key=class_info.key,
+            flags=RealmClassFlags(class_info.flags),
+            properties=tuple(RealmSchemaProperty.from_property_info(x) for x in properties),
+            property_types=tuple(PropertyType.new_from_property_info(x) for x in properties),
+        )
+
+    def get_property(self, name: str) -> Optional[RealmSchemaProperty]:
+        for prop in self.properties:
+            if prop.name == name:
+                return prop
+        return None
+
+
+class RealmSchema():
+    # Immutable snapshot of the schema of a realm at a given (schema version, transaction version)
+
+    def __init__(self, version: Tuple[int, Optional[Tuple[int, int]]], classes: List[RealmSchemaClass]):
+        self._version = version
+        self._classes = tuple(classes)
+        self._by_name = MappingProxyType({x.name: x for x in self._classes})
+        self._by_key = MappingProxyType({x.key: x for x in self._classes})
+
+    @property
+    def version(self) -> Tuple[int, Optional[Tuple[int, int]]]:
+        return self._version
+
+    @property
+    def schema_version(self) -> int:
+        return self._version[0]
+
+    @property
+    def classes(self) -> Tuple[RealmSchemaClass, ...]:
+        return self._classes
+
+    @property
+    def class_names(self) -> List[str]:
+        return list(self._by_name)
+
+    def find_class(self, name: str) -> Optional[RealmSchemaClass]:
+        return self._by_name.get(name)
+
+    def get_class(self, class_key: int) -> Optional[RealmSchemaClass]:
+        return self._by_key.get(class_key)
+
+    def __getitem__(self, name: str) -> RealmSchemaClass:
+        if name in self._by_name:
+            return self._by_name[name]
+        raise KeyError(f"Invalid class name: {name}")
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._by_name
+
+    def __iter__(self) -> Iterator[RealmSchemaClass]:
+        return iter(self._classes)
+
+    def __len__(self) -> int:
+        return len(self._classes)
+
+    def __str__(self):
+        return f"RealmSchema: {len(self)} classes (version {self.schema_version})"
+
+    def __repr__(self):
+        return f"<{str(self)}>"
+
+
+def _property_slot(name: str) -> str:
+    # Instance storage for a property value - kept apart from the property name so the property
+    # descriptor can convert values on assignment
+    return f"_value_{name}"
+
+
+def _property_setter(prop: Union[PropertyType, PropertyWrapper], member) -> Callable[[Any, Any], None]:
+    name = prop.name
+    rtype = prop.rtype
+    nullable = bool(prop.is_nullable)
+    try:
+        convert = PropertyType.get_converter(rtype)
+    except TypeError:
+        # Values of unsupported types are rejected when they are set
+        convert = partial(PropertyType.convert_value, rtype)
+    set_member = member.__set__
+
+    def set_value(obj, value):
+        if value is None:
+            if not nullable:
+                raise ValueError(f"Property '{name}' is not nullable")
+        else:
+            value = convert(value)
+        set_member(obj, value)
+    return set_value
+
+
+def _delete_property(obj):
+    raise RuntimeError("Cannot delete properties")
+
+
 class RealmObjectMeta(type):
+    # Builds a fixed layout for each RealmObject class when the class is created: a slot per
+    # property, a descriptor that converts the value on assignment and the constructor fields
     def __new__(cls, clsname, bases, attrs):
         # Don't process the schema object base class
         if clsname == "RealmObject":
             return super(RealmObjectMeta, cls).__new__(cls, clsname, bases, attrs)
 
-        new_class = super(RealmObjectMeta, cls).__new__(cls, clsname, bases, attrs)
-        setattr(new_class, '__name', clsname)
-        setattr(new_class, '__flags', RealmClassFlags.RLM_CLASS_NORMAL)
-        setattr(new_class, '__properties', OrderedDict())
+        properties = OrderedDict()
+        for base in reversed(bases):
+            properties.update(getattr(base, '_properties', {}))
+        inherited = set(properties)
 
         # Move the class properties into the _properties list
-        for x in attrs:
-            x_obj = getattr(new_class, x, None)
-            if x_obj is not None and PropertyType in x_obj.__class__.__bases__:
+        class_attrs = {}
+        for x, x_obj in attrs.items():
+            if isinstance(x_obj, (PropertyType, PropertyWrapper)):
                 x_obj._set_name(x)
-                new_class._properties[x_obj.name] = x_obj
-                delattr(new_class, x)
+                properties[x_obj.name] = x_obj
+            else:
+                class_attrs[x] = x_obj
+        class_attrs['__slots__'] = tuple(_property_slot(x) for x in properties if x not in inherited)
+
+        new_class = super(RealmObjectMeta, cls).__new__(cls, clsname, bases, class_attrs)
+        new_class._name = clsname
+        new_class._flags = RealmClassFlags.RLM_CLASS_NORMAL
+        new_class._properties = properties
 
+        fields = []
+        for name, prop in properties.items():
+            slot = _property_slot(name)
+            setter = _property_setter(prop, getattr(new_class, slot))
+            setattr(new_class, name, property(attrgetter(slot), setter, _delete_property))
+            fields.append((name, setter, bool(prop.is_nullable)))
+        new_class._fields = tuple(fields)
+        new_class._property_names = tuple(properties)
         return new_class
 
 
 class RealmObject(metaclass=RealmObjectMeta):
+    __slots__ = ()
+
     def __init__(self, *args: List[Any], **kwargs: Dict[str, Any]):
-        # double underscores so it skips the __[get|set]attr__ checking
-        # This also allows property names that start with an underscore
-        self.__property_values = OrderedDict()
-        if (len(args) + len(kwargs)) == 0:
-            for x in self._properties:
-                x_val = x.new()
-                self.__property_values[x_val.name] = x_val
-        else:
-            props = self.property_names
-            # Set the args values
-            for i in range(len(args)):
-                x = props.pop(0)
-                self.__property_values[x] = self.__properties[x].new(args[i])
-
-            while props:
-                x = props.pop(0)
-                if x in kwargs:
-                    self.__property_values[x] = self.__properties[x].new(kwargs[x])
-                elif self.__properties[x].is_nullable:
-                    self.__property_values[x] = self.__properties[x].new(None)
-                else:
-                    raise ValueError("Property '{name}' was not intialized and is not nullable")
+        fields = self._fields
+        num_args = len(args)
+        if num_args > len(fields):
+            raise TypeError(f"{self._name} takes {len(fields)} property values but {num_args} were given")
+        if kwargs:
+            unknown = kwargs.keys() - self._properties.keys()
+            if unknown:
+                raise TypeError(f"{self._name} got unexpected property values: {', '.join(sorted(unknown))}")
+        elif not num_args:
+            # An empty object - the values are set later
+            for name, _, _ in fields:
+                object.__setattr__(self, _property_slot(name), None)
+            return
+
+        for i, (name, set_value, nullable) in enumerate(fields):
+            if i < num_args:
+                set_value(self, args[i])
+            elif name in kwargs:
+                set_value(self, kwargs[name])
+            elif nullable:
+                set_value(self, None)
+            else:
+                raise ValueError(f"Property '{name}' was not intialized and is not nullable")
 
     @property
     def name(self):
-        return self.__name
+        return self._name
 
     @property
     def flags(self):
-        return self.__flags
+        return self._flags
 
     @property
     def num_properties(self):
-        return len(self.__properties)
+        return len(self._property_names)
 
     @property
     def property_names(self):
-        return list(self.__properties)
+        return list(self._property_names)
 
-
-    def __getattr__(self, name):
-        if not name.startswith('__') and name in self.__property_values:
-            return self.__property_values[name].value
-        else:
-            return super().__getattr__(name)
-
-
-    def __setattr__(self, name, value):
-        if not name.startswith('__') and name in self.__property_values:
-            self.__property_values[name].value = value
-        else:
-            super().__setattr__(name, value)
-
-    def __delattr__(self, name):
-        if not name.startswith('__') and name in self.__property_values:
-            raise RuntimeError('Cannot delete properties')
-        elif name not in ["__name", "__flags", "__properties", "__property_values"]:
-            super().__delattr__(name)
-        else:
-            raise AttributeError("Cannot delete property internal attributes")
-
-    def __getitem__(self, key):
+    def _property_name(self, key) -> str:
         if isinstance(key, int):
-            if key >= 0 and key < self.num_properties:
-                return self.__property_values[self.property_names[key]].value
+            if key >= 0 and key < len(self._property_names):
+                return self._property_names[key]
         elif isinstance(key, str):
-            if key in self.__property_values:
-                return self.__property_values[key].value
+            if key in self._properties:
+                return key
             else:
                 raise KeyError(f"Invalid property name: {key}")
         raise IndexError(f"Invalid property index value: {key}")
 
+    def __getitem__(self, key):
+        return getattr(self, self._property_name(key))
+
     def __setitem__(self, key, value):
-        if isinstance(key, int):
-            if key >= 0 and key < self.num_properties:
-                self.__property_values[self.property_names[key]].value = value
-        elif isinstance(key, str):
-            if key in self.__property_values:
-                self.__property_values[key].value = value
-            else:
-                raise KeyError(f"Invalid property name: {key}")
-        raise IndexError(f"Invalid property index value: {key}")
+        setattr(self, self._property_name(key), value)
 
     def __delitem__(self, key, value):
         raise RuntimeError(f"Cannot delete properties")
 
     def describe(self):
-        result= (f"Class: {self.name}\n"
+        result= (f"Class: {self._name}\n"
                 "--------------------------------------------------------")
-
@@ -0,0 +1,272 @@
+import ctypes
+import uuid
+
+from datetime import (datetime, timedelta, timezone)
+from decimal import Decimal
+from enum import IntEnum
+from typing import (Any, Callable, Dict, List, Sequence, Tuple)
+
+from .property import RealmPropertyType
+
+
+class RealmValueType(IntEnum):
+    RLM_TYPE_NULL = 0
+    RLM_TYPE_INT = 1
+    RLM_TYPE_BOOL = 2
+    RLM_TYPE_STRING = 3
+    RLM_TYPE_BINARY = 4
+    RLM_TYPE_TIMESTAMP = 5
+    RLM_TYPE_FLOAT = 6
+    RLM_TYPE_DOUBLE = 7
+    RLM_TYPE_DECIMAL128 = 8
+    RLM_TYPE_OBJECT_ID = 9
+    RLM_TYPE_LINK = 10
+    RLM_TYPE_UUID = 11
+
+
+class RealmStringValue(ctypes.Structure):
+    _fields_ = [
+        ("data", ctypes.POINTER(ctypes.c_char)),
+        ("size", ctypes.c_size_t),
+    ]
+
+
+class RealmBinaryValue(ctypes.Structure):
+    _fields_ = [
+        ("data", ctypes.POINTER(ctypes.c_uint8)),
+        ("size", ctypes.c_size_t),
+    ]
+
+
+class RealmTimestampValue(ctypes.Structure):
+    _fields_ = [
+        ("seconds", ctypes.c_int64),
+        ("nanoseconds", ctypes.c_int32),
+    ]
+
+
+class RealmDecimal128Value(ctypes.Structure):
+    _fields_ = [
+        ("w", ctypes.c_uint64 * 2),
+    ]
+
+
+class RealmObjectIdValue(ctypes.Structure):
+    _fields_ = [
+        ("bytes", ctypes.c_uint8 * 12),
+    ]
+
+
+class RealmUUIDValue(ctypes.Structure):
+    _fields_ = [
+        ("bytes", ctypes.c_uint8 * 16),
+    ]
+
+
+class RealmLinkValue(ctypes.Structure):
+    _fields_ = [
+        ("target_table", ctypes.c_uint32),
+        ("target", ctypes.c_int64),
+    ]
+
+
+class RealmValue(ctypes.Structure):
+    # Mirrors `realm_value_t` - the value union is anonymous so its members are accessed directly
+    class _Value(ctypes.Union):
+        _fields_ = [
+            ("integer", ctypes.c_int64),
+            ("boolean", ctypes.c_bool),
+            ("string", RealmStringValue),
+            ("binary", RealmBinaryValue),
+            ("timestamp", RealmTimestampValue),
+            ("fnum", ctypes.c_float),
+            ("dnum", ctypes.c_double),
+            ("decimal128", RealmDecimal128Value),
+            ("object_id", RealmObjectIdValue),
+            ("uuid", RealmUUIDValue),
+            ("link", RealmLinkValue),
+            ("data", ctypes.c_char * 16),
+        ]
+
+RealmValue._anonymous_ = ("_value",)
+RealmValue._fields_ = [
+    ("_value", RealmValue._Value),
+    ("type", ctypes.c_int),
+]
+
+
+class RealmQueryArg(ctypes.Structure):
+    _fields_ = [
+        ("nb_args", ctypes.c_size_t),
+        ("is_list", ctypes.c_bool),
+        ("arg", ctypes.POINTER(RealmValue)),
+    ]
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_DECIMAL128_EXPONENT_BIAS = 6176
+_DECIMAL128_MAX_BIASED_EXPONENT = 12287
+_DECIMAL128_MAX_COEFFICIENT = 10 ** 34
+
+
+def _string_to_python(value: RealmValue) -> str:
+    return ctypes.string_at(value.string.data, value.string.size).decode('utf-8')
+
+
+def _binary_to_python(value: RealmValue) -> bytes:
+    return ctypes.string_at(value.binary.data, value.binary.size)
+
+
+def _timestamp_to_python(value: RealmValue) -> datetime:
+    # Seconds and nanoseconds always have the same sign - truncate the nanoseconds towards zero
+    nanoseconds = value.timestamp.nanoseconds
+    microseconds = nanoseconds // 1000 if nanoseconds >= 0 else -(-nanoseconds // 1000)
+    return _EPOCH + timedelta(seconds=value.timestamp.seconds, microseconds=microseconds)
+
+
+def _decimal128_to_python(value: RealmValue) -> Decimal:
+    # Decode the IEEE 754-2008 BID encoding used by realm for Decimal128 values
+    low, high = value.decimal128.w[0], value.decimal128.w[1]
+    sign = high >> 63
+    combination = (high >> 58) & 0x1f
+    if combination == 0x1f:
+        return Decimal('NaN')
+    elif combination == 0x1e:
+        return Decimal('-Infinity' if sign else 'Infinity')
+    elif (high >> 61) & 0x3 == 0x3:
+        # The coefficient is larger than the maximum value and is treated as 0
+        exponent = (high >> 47) & 0x3fff
+        coefficient = 0
+    else:
+        exponent = (high >> 49) & 0x3fff
+        coefficient = ((high & 0x1ffffffffffff) << 64) | low
+    digits = tuple(int(x) for x in str(coefficient))
+    return Decimal((sign, digits, exponent - _DECIMAL128_EXPONENT_BIAS))
+
+
+_TO_PYTHON: Dict[int, Callable[[RealmValue], Any]] = {
+    RealmValueType.RLM_TYPE_NULL: lambda value: None,
+    RealmValueType.RLM_TYPE_INT: lambda value: value.integer,
+    RealmValueType.RLM_TYPE_BOOL: lambda value: value.boolean,
+    RealmValueType.RLM_TYPE_STRING: _string_to_python,
+    RealmValueType.RLM_TYPE_BINARY: _binary_to_python,
+    RealmValueType.RLM_TYPE_TIMESTAMP: _timestamp_to_python,
+    RealmValueType.RLM_TYPE_FLOAT: lambda value: value.fnum,
+    RealmValueType.RLM_TYPE_DOUBLE: lambda value: value.dnum,
+    RealmValueType.RLM_TYPE_DECIMAL128: _decimal128_to_python,
+    RealmValueType.RLM_TYPE_OBJECT_ID: lambda value: bytes(value.object_id.bytes),
+    RealmValueType.RLM_TYPE_LINK: lambda value: (value.link.target_table, value.link.target),
+    RealmValueType.RLM_TYPE_UUID: lambda value: uuid.UUID(bytes=bytes(value.uuid.bytes)),
+}
+
+
+def to_python(value: RealmValue) -> Any:
+    converter = _TO_PYTHON.get(value.type)
+    if converter is None:
+        raise TypeError(f"Realm value type {value.type} is not supported")
+    return converter(value)
+
+
+def _set_decimal128(out: RealmValue, value: Decimal):
+    sign, digits, exponent = value.as_tuple()
+    if value.is_nan():
+        high = 0x7c00000000000000
+        low = 0
+    elif value.is_infinite():
+        high = (sign << 63) | 0x7800000000000000
+        low = 0
+    else:
+        coefficient = int(''.join(str(x) for x in digits)) if digits else 0
+        biased = exponent + _DECIMAL128_EXPONENT_BIAS
+        if coefficient >= _DECIMAL128_MAX_COEFFICIENT or not 0 <= biased <= _DECIMAL128_MAX_BIASED_EXPONENT:
+            raise ValueError(f"Value {value} cannot be represented as a Decimal128")
+        high = (sign << 63) | (biased << 49) | (coefficient >> 64)
+        low = coefficient & 0xffffffffffffffff
+    out.decimal128.w[0] = low
+    out.decimal128.w[1] = high
+    out.type = RealmValueType.RLM_TYPE_DECIMAL128
+
+
+def _set_timestamp(out: RealmValue, value: datetime):
+    # Naive datetime values are treated as UTC
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    delta = value - _EPOCH
+    total = (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+    seconds, microseconds = divmod(abs(total), 1_000_000)
+    sign = -1 if total < 0 else 1
+    out.timestamp.seconds = sign * seconds
+    out.timestamp.nanoseconds = sign * microseconds * 1000
+    out.type = RealmValueType.RLM_TYPE_TIMESTAMP
+
+
+def from_python(value: Any, out: RealmValue = None) -> RealmValue:
+    # Convert a Python value to a `realm_value_t` - string and binary data is referenced by the
+    # returned value, which keeps the buffer alive
+    if out is None:
+        out = RealmValue()
+    if value is None:
+        out.type = RealmValueType.RLM_TYPE_NULL
+    elif isinstance(value, bool):
+        out.boolean = value
+        out.type = RealmValueType.RLM_TYPE_BOOL
+    elif isinstance(value, int):
+        out.integer = value
+        out.type = RealmValueType.RLM_TYPE_INT
+    elif isinstance(value, float):
+        out.dnum = value
+        out.type = RealmValueType.RLM_TYPE_DOUBLE
+    elif isinstance(value, str):
+        data = value.encode('utf-8')
+        out.string.data = ctypes.cast(ctypes.create_string_buffer(data, len(data)), ctypes.POINTER(ctypes.c_char))
+        out.string.size = len(data)
+        out.type = RealmValueType.RLM_TYPE_STRING
+    elif isinstance(value, (bytes, bytearray)):
+        data = bytes(value)
+        out.binary.data = ctypes.cast(ctypes.create_string_buffer(data, len(data)), ctypes.POINTER(ctypes.c_uint8))
+        out.binary.size = len(data)
+        out.type = RealmValueType.RLM_TYPE_BINARY
+    elif isinstance(value, datetime):
+        _set_timestamp(out, value)
+    elif isinstance(value, Decimal):
+        _set_decimal128(out, value)
+    elif isinstance(value, uuid.UUID):
+        ctypes.memmove(out.uuid.bytes, value.bytes, 16)
+        out.type = RealmValueType.RLM_TYPE_UUID
+    else:
+        raise TypeError(f"Value of type {type(value)} cannot be converted to a realm value")
+    return out
+
+
+def from_property_value(rtype: RealmPropertyType, value: Any, out: RealmValue = None) -> RealmValue:
+    # Convert a Python value for a property of type `rtype` - float properties need a float value
+    # rather than the double produced for Python floats and object IDs are not binary data
+    if rtype == RealmPropertyType.RLM_PROPERTY_TYPE_OBJECT_ID and isinstance(value, bytes):
+        # Object IDs are held as bytes, which would otherwise be written as binary data
+        if out is None:
+            out = RealmValue()
+        ctypes.memmove(out.object_id.bytes, value, 12)
+        out.type = RealmValueType.RLM_TYPE_OBJECT_ID
+        return out
+    out = from_python(value, out)
+    if rtype == RealmPropertyType.RLM_PROPERTY_TYPE_FLOAT and out.type == RealmValueType.RLM_TYPE_DOUBLE:
+        out.fnum = out.dnum
+        out.type = RealmValueType.RLM_TYPE_FLOAT
+    return out
+
+
+def make_query_args(args: Sequence[Any]) -> Tuple['ctypes.Array[RealmQueryArg]', List[Any]]:
+    # Build the `realm_query_arg_t` array for the query arguments - list and tuple arguments are
+    # passed as list arguments. The second item holds the buffers that must be kept alive.
+    query_args = (RealmQueryArg * len(args))()
+    keepalive = []
+    for i, arg in enumerate(args):
+        items = list(arg) if isinstance(arg, (list, tuple, set)) else [arg]
+        values = (RealmValue * len(items))()
+        for j, item in enumerate(items):
+            values[j] = from_python(item)
+        keepalive.append(values)
+        query_args[i].nb_args = len(items)
+        query_args[i].is_list = isinstance(arg, (list, tuple, set))
+        query_args[i].arg = values
+    return query_args, keepalive